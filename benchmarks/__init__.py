@@ -0,0 +1,8 @@
+"""
+Scheduler benchmarks.
+
+Synthetic days are generated by ``benchmarks.workload`` and solved against a
+deterministic travel provider, so runs need no API keys and are comparable
+between machines and commits. Run ``python -m benchmarks.run`` from the
+project root; see that module for options.
+"""
@@ -0,0 +1,146 @@
+"""
+Run the scheduler benchmarks.
+
+    python -m benchmarks.run                      # compare with baseline.json
+    python -m benchmarks.run --save-baseline      # record a new baseline
+    python -m benchmarks.run -w large -s greedy -s knapsack --repeat 5
+
+For every workload and strategy this reports the best wall time over
+``--repeat`` runs, travel lookups (and distinct pairs), placements, scheduled
+minutes and peak traced memory. Lookups and placements are deterministic, so
+any change there is reported; wall time and memory are flagged when they grow
+past ``--tolerance`` times the baseline (beyond a small noise floor). The exit code is 1 on regressions.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Dict, List
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR / "src") not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR / "src"))
+
+from backend.records import Placement  # noqa: E402
+from backend.scheduler import GAP_STRATEGIES, solve_schedule  # noqa: E402
+
+from benchmarks.workload import DEFAULT_WORKLOADS, Workload, generate  # noqa: E402
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baseline.json"
+EXACT_METRICS = ("lookups", "pairs", "placements", "scheduled_minutes")
+# Timed metrics are only flagged past the tolerance *and* this absolute
+# growth, so sub-millisecond jitter on the small workloads is not a regression.
+NOISE_FLOOR = {"wall_ms": 5.0, "peak_kib": 64.0}
+
+
+def _solve(workload: Workload, strategy: str, top_k: int | None):
+    events, tasks, travel = generate(workload)
+    with contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        plan, _ = solve_schedule(events, tasks, strategy=strategy, travel_cache=travel, top_k=top_k)
+        elapsed = time.perf_counter() - started
+    return plan, travel, elapsed
+
+
+def measure(workload: Workload, strategy: str, repeat: int = 3, top_k: int | None = None) -> Dict:
+    """Metrics for one workload/strategy pair."""
+    best = float("inf")
+    for _ in range(repeat):
+        plan, travel, elapsed = _solve(workload, strategy, top_k)
+        best = min(best, elapsed)
+
+    # Memory is traced in a separate run; tracing slows everything down.
+    tracemalloc.start()
+    _solve(workload, strategy, top_k)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    placements = [entry for entry in plan if isinstance(entry, Placement)]
+    return {
+        "wall_ms": round(best * 1000, 3),
+        "lookups": travel.lookups,
+        "pairs": len(travel.pairs),
+        "placements": len(placements),
+        "scheduled_minutes": sum(p.end - p.start for p in placements),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Human-readable regressions of ``results`` against ``baseline``."""
+    problems = []
+    for key, metrics in results.items():
+        previous = baseline.get(key)
+        if previous is None:
+            continue
+        for name in EXACT_METRICS:
+            if metrics[name] != previous.get(name):
+                problems.append(f"{key}: {name} {previous.get(name)} -> {metrics[name]}")
+        for name, floor in NOISE_FLOOR.items():
+            before = previous.get(name)
+            if before and metrics[name] > max(before * tolerance, before + floor):
+                problems.append(
+                    f"{key}: {name} {before} -> {metrics[name]} ({metrics[name] / before:.2f}x)"
+                )
+    return problems
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the gap scheduler.")
+    parser.add_argument("-w", "--workload", action="append", help="Workload name (repeatable)")
+    parser.add_argument("-s", "--strategy", action="append", help="Strategy name (repeatable)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top-k", type=int, default=None, help="Override every workload's top_k")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=1.5)
+    args = parser.parse_args(argv)
+
+    workloads = [w for w in DEFAULT_WORKLOADS if not args.workload or w.name in args.workload]
+    strategies = args.strategy or list(GAP_STRATEGIES)
+
+    results: Dict[str, Dict] = {}
+    print(f"{'benchmark':<24}{'wall ms':>10}{'lookups':>10}{'pairs':>8}{'placed':>8}{'minutes':>9}{'KiB':>10}")
+    for workload in workloads:
+        for strategy in strategies:
+            key = f"{workload.name}/{strategy}"
+            top_k = args.top_k if args.top_k is not None else workload.top_k
+            metrics = measure(workload, strategy, args.repeat, top_k)
+            results[key] = metrics
+            print(
+                f"{key:<24}{metrics['wall_ms']:>10.2f}{metrics['lookups']:>10}{metrics['pairs']:>8}"
+                f"{metrics['placements']:>8}{metrics['scheduled_minutes']:>9}{metrics['peak_kib']:>10}"
+            )
+
+    if args.save_baseline:
+        payload = {
+            "workloads": {w.name: w.describe() for w in workloads},
+            "results": results,
+        }
+        args.baseline.write_text(json.dumps(payload, indent=2, ensure_ascii=False) + "\n")
+        print(f"\nBaseline saved to {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print("\nNo baseline yet; run with --save-baseline to record one.")
+        return 0
+
+    problems = compare(results, json.loads(args.baseline.read_text())["results"], args.tolerance)
+    if problems:
+        print("\nRegressions against baseline:")
+        for problem in problems:
+            print(f"   - {problem}")
+        return 1
+    print("\nNo regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+"""
+Microbenchmark for rendering and encoding ``OptimizeResponse`` payloads.
+
+    python -m benchmarks.serialization
+    python -m benchmarks.serialization -n 200 -n 5000 --repeat 7
+
+A synthetic solved plan of N events and N placements is rendered two ways:
+
+``models``  the previous path: placements become ``ScheduleItem`` models,
+            every item is copied to attach coordinates, and FastAPI then
+            dumps the response model, validates it again and encodes it with
+            the standard library.
+``direct``  ``api._build_response`` renders JSON-ready dicts once and
+            ``serialization.dumps`` encodes them (orjson when installed).
+
+Both must produce the same JSON; the best time over ``--repeat`` runs is
+reported per rendered schedule item, along with the size of the full body,
+the ``view=lean`` body and the lean body gzipped at ``GZIP_LEVEL``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+import zlib
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Dict, List
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR / "src") not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR / "src"))
+
+from backend import api  # noqa: E402
+from backend.config import Config  # noqa: E402
+from backend.records import Event, Placement, Task, format_minutes  # noqa: E402
+from backend.serialization import dumps, fast_json_available  # noqa: E402
+
+DEFAULT_SIZES = (100, 1000, 5000)
+LOCATIONS = 20
+
+
+def synthetic_plan(n: int):
+    """``n`` events, each followed by one placed todo, over ``LOCATIONS`` places."""
+    coord_cache = {
+        f"Campus {i}": api.Coordinates(lat=37.5 + i / 1000, lng=127.0 + i / 1000)
+        for i in range(LOCATIONS)
+    }
+    schedule: List[api.ScheduleItem] = []
+    todos: List[api.TodoItem] = []
+    plan: List[Event | Placement] = []
+    for i in range(n):
+        location = f"Campus {i % LOCATIONS}"
+        start = (i * 10) % 1380
+        item = api.ScheduleItem(
+            name=f"Lecture {i}",
+            location=location,
+            start_time=format_minutes(start),
+            end_time=format_minutes(start + 5),
+            type="class",
+        )
+        todo = api.TodoItem(task=f"Todo {i}", estimated_time=5, location=location, course="CS101")
+        schedule.append(item)
+        todos.append(todo)
+        plan.append(Event(item.name, start, start + 5, location, item))
+        plan.append(Placement(Task(todo.task, 5, location, todo), start + 5, start + 10, location))
+    meta = api.SchedulerMeta(config_ready=True, travel_time_buffer=10, solver="greedy")
+    return schedule, todos, plan, meta, coord_cache
+
+
+def _legacy_response(schedule, todos, plan, meta, coord_cache) -> api.OptimizeResponse:
+    def attach(items):
+        return [
+            item.model_copy(update={"coordinates": item.coordinates or coord_cache.get(item.location)})
+            for item in items
+        ]
+
+    optimized = [
+        api.ScheduleItem(
+            name=entry.name,
+            start_time=format_minutes(entry.start),
+            end_time=format_minutes(entry.end),
+            location=entry.location,
+            type="task",
+        )
+        if isinstance(entry, Placement)
+        else entry.source
+        for entry in plan
+    ]
+    counts = Counter(todo.location or "위치 미정" for todo in todos)
+    insights = api.ScheduleInsights(
+        total_tasks=len(todos),
+        scheduled_tasks=len(todos),
+        remaining_tasks=0,
+        campus_breakdown=[
+            api.CampusBreakdown(location=loc, count=count) for loc, count in sorted(counts.items())
+        ],
+    )
+    return api.OptimizeResponse(
+        schedule=attach(schedule),
+        todos=todos,
+        optimized_schedule=attach(optimized),
+        remaining_todos=[],
+        meta=meta,
+        insights=insights,
+    )
+
+
+def render_models(schedule, todos, plan, meta, coord_cache) -> bytes:
+    response = _legacy_response(schedule, todos, plan, meta, coord_cache)
+    # What FastAPI does with a returned model and ``response_model``.
+    validated = api.OptimizeResponse.model_validate(response.model_dump())
+    return json.dumps(
+        validated.model_dump(mode="json"),
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def render_direct(schedule, todos, plan, meta, coord_cache) -> bytes:
+    return dumps(api._build_response(schedule, todos, plan, [], meta, coord_cache=coord_cache))
+
+
+def render_lean(schedule, todos, plan, meta, coord_cache) -> bytes:
+    shape = api.ResponseShape(lean=True, fields=api.LEAN_FIELDS)
+    return dumps(
+        api._build_response(schedule, todos, plan, [], meta, coord_cache=coord_cache, shape=shape)
+    )
+
+
+def _gzip(body: bytes) -> bytes:
+    compressor = zlib.compressobj(Config.GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(body) + compressor.flush()
+
+
+def _best(fn: Callable[..., bytes], args, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def measure(n: int, repeat: int) -> Dict[str, float]:
+    args = synthetic_plan(n)
+    if json.loads(render_models(*args)) != json.loads(render_direct(*args)):
+        raise SystemExit(f"n={n}: the two paths render different JSON")
+    items = 3 * n  # schedule + optimized_schedule (events and placements)
+    models = _best(render_models, args, repeat)
+    direct = _best(render_direct, args, repeat)
+    lean = render_lean(*args)
+    return {
+        "models_us_per_item": models / items * 1e6,
+        "direct_us_per_item": direct / items * 1e6,
+        "speedup": models / direct if direct else float("inf"),
+        "bytes": len(render_direct(*args)),
+        "lean_bytes": len(lean),
+        "gzip_bytes": len(_gzip(lean)),
+    }
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("-n", "--items", type=int, action="append", help="events in the plan")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print(f"encoder: {'orjson' if fast_json_available() else 'json (stdlib)'}")
+    print(
+        f"{'events':>8} {'models µs/item':>15} {'direct µs/item':>15} {'speedup':>8}"
+        f" {'bytes':>10} {'lean':>10} {'lean+gzip':>10}"
+    )
+    for n in args.items or DEFAULT_SIZES:
+        row = measure(n, args.repeat)
+        print(
+            f"{n:>8} {row['models_us_per_item']:>15.2f} {row['direct_us_per_item']:>15.2f}"
+            f" {row['speedup']:>7.1f}x {row['bytes']:>10} {row['lean_bytes']:>10}"
+            f" {row['gzip_bytes']:>10}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
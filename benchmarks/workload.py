@@ -0,0 +1,109 @@
+"""
+Synthetic workloads for the scheduler benchmarks.
+"""
+
+from __future__ import annotations
+
+import math
+import random
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from backend.records import Event, Task
+
+DAY_START = 8 * 60
+MIN_GAP = 30
+
+
+@dataclass(frozen=True)
+class Workload:
+    """Shape of one synthetic day.
+
+    ``tightness`` is total task minutes divided by total free minutes between
+    events: below 1 everything could fit, above 1 the packer has to choose.
+    ``top_k`` is the candidate prefilter the API would apply to a list this
+    long (None offers every task to every gap).
+    """
+
+    name: str
+    events: int
+    tasks: int
+    locations: int
+    tightness: float = 1.0
+    seed: int = 0
+    top_k: Optional[int] = None
+
+    def describe(self) -> Dict:
+        return asdict(self)
+
+
+class DeterministicTravel:
+    """
+    Travel-time mapping for the scheduler's ``travel_cache`` argument.
+
+    Every location sits on a fixed point of a 10 km square (seeded), and the
+    minutes between two points are derived from their distance, so no key is
+    ever missing and no API is called. Lookups and distinct pairs are counted.
+    """
+
+    def __init__(self, locations: List[str], seed: int = 0, buffer: int = 10):
+        rng = random.Random(seed)
+        self.points = {name: (rng.uniform(0, 10), rng.uniform(0, 10)) for name in locations}
+        self.buffer = buffer
+        self.lookups = 0
+        self.pairs = set()
+
+    def minutes(self, start: str, end: str, include_buffer: bool = True) -> int:
+        if start == end or start not in self.points or end not in self.points:
+            return 0
+        (x1, y1), (x2, y2) = self.points[start], self.points[end]
+        # ~4 minutes per km on campus transit, plus the planner's buffer
+        travel = round(math.hypot(x2 - x1, y2 - y1) * 4)
+        return travel + (self.buffer if include_buffer else 0)
+
+    def __contains__(self, key: Tuple[str, str, bool]) -> bool:
+        return True
+
+    def __getitem__(self, key: Tuple[str, str, bool]) -> int:
+        self.lookups += 1
+        self.pairs.add(key)
+        return self.minutes(*key)
+
+    def __setitem__(self, key: Tuple[str, str, bool], minutes: int) -> None:
+        pass
+
+    def __iter__(self) -> Iterator[Tuple[str, str, bool]]:
+        return iter(self.pairs)
+
+
+def generate(workload: Workload) -> Tuple[List[Event], List[Task], DeterministicTravel]:
+    """Build the events, tasks and travel provider for ``workload``."""
+    rng = random.Random(workload.seed)
+    locations = [f"장소 {i}" for i in range(max(workload.locations, 1))]
+
+    events: List[Event] = []
+    clock = DAY_START
+    for i in range(workload.events):
+        if i:
+            clock += rng.randint(MIN_GAP, 180)
+        length = rng.choice((50, 75, 90, 120))
+        events.append(Event(f"일정 {i}", clock, clock + length, rng.choice(locations)))
+        clock += length
+
+    free_minutes = sum(b.start - a.end for a, b in zip(events, events[1:]))
+    raw = [rng.uniform(0.5, 2.0) for _ in range(workload.tasks)]
+    scale = workload.tightness * free_minutes / sum(raw) if raw else 0
+    tasks = [
+        Task(f"작업 {i}", max(10, round(weight * scale)), rng.choice(locations))
+        for i, weight in enumerate(raw)
+    ]
+    return events, tasks, DeterministicTravel(locations, seed=workload.seed)
+
+
+DEFAULT_WORKLOADS = [
+    Workload("small", events=4, tasks=10, locations=3),
+    Workload("medium", events=8, tasks=50, locations=8),
+    Workload("tight", events=6, tasks=60, locations=6, tightness=3.0),
+    Workload("large", events=10, tasks=200, locations=15, top_k=40),
+    Workload("huge", events=12, tasks=1000, locations=25, tightness=4.0, top_k=40),
+]
@@ -5,6 +5,7 @@ Optimizing your daily tasks with travel time consideration
 
 from __future__ import annotations
 
+import logging
 import re
 from datetime import datetime, timedelta
 from typing import Dict, List, Tuple
@@ -15,6 +16,14 @@ from config import YONSEI_USERNAME, YONSEI_PASSWORD
 
 DEFAULT_TASK_DURATION = 60
 
+# Part of the backend's "ycc" event hierarchy; silent unless configured.
+logger = logging.getLogger("ycc.daystack")
+
+
+def _log(level: int, event: str, **fields) -> None:
+    if logger.isEnabledFor(level):
+        logger.log(level, event, extra={"fields": fields})
+
 FALLBACK_SCHEDULE = [
     {
         "name": "오전 수업",
@@ -232,7 +241,7 @@ def convert_lms_tasks(lms_tasks):
     Scheduler expects: 'task', 'estimated_time', and 'location'
     """
     formatted_tasks = []
-    print(f"\n📥 Converting {len(lms_tasks)} LMS tasks...")
+    _log(logging.INFO, "lms.convert", tasks=len(lms_tasks))
     
     for t in lms_tasks:
         course_name = t.get('course', '')
@@ -262,11 +271,15 @@ def convert_lms_tasks(lms_tasks):
             "deadline": deadline,  # Due date stored separately
         })
         
-        college_code = parse_course_id(course_name)
-        if college_code:
-            print(f"  ✓ {course_name} → {college_code} → {location} ({estimated_time}분)")
-        else:
-            print(f"  ⚠ {course_name} → (no course ID found) → {location} ({estimated_time}분)")
+        if logger.isEnabledFor(logging.DEBUG):
+            _log(
+                logging.DEBUG,
+                "lms.task_converted",
+                course=course_name,
+                college=parse_course_id(course_name),
+                location=location,
+                estimated_time=estimated_time,
+            )
     
     return formatted_tasks
 
@@ -276,12 +289,12 @@ def fetch_raw_lms_tasks(username: str | None = None, password: str | None = None
     password = password or YONSEI_PASSWORD
 
     if not username or not password:
-        print("⚠️  Missing LMS credentials. Set YONSEI_USERNAME and YONSEI_PASSWORD.")
+        _log(logging.WARNING, "lms.missing_credentials")
         return []
 
     crawler = LMSCrawler(username, password)
     if not crawler.login():
-        print("❌ Login failed. Please check your credentials.")
+        _log(logging.ERROR, "lms.login_failed")
         return []
 
     return crawler.fetch_tasks() or []
@@ -291,7 +304,7 @@ def get_crawler_tasks(username: str | None = None, password: str | None = None)
     """Fetch and convert tasks from the LMS crawler."""
     raw_tasks = fetch_raw_lms_tasks(username, password)
     if not raw_tasks:
-        print("⚠️  Login successful, but no incomplete tasks found.")
+        _log(logging.INFO, "lms.no_tasks")
         return []
     return convert_lms_tasks(raw_tasks)
 
@@ -314,13 +327,14 @@ def build_schedule_from_lms(raw_tasks: List[Dict]) -> List[Dict]:
         events.append(
             {
                 "name": title,
+                "date": start_dt.strftime("%Y-%m-%d"),
                 "start_time": start_dt.strftime("%H:%M"),
                 "end_time": due_dt.strftime("%H:%M"),
                 "location": location,
             }
         )
 
-    return sorted(events, key=lambda e: e["start_time"])
+    return sorted(events, key=lambda e: (e["date"], e["start_time"]))
 
 
 def get_daystack_data(source: str = "crawler") -> Tuple[List[Dict], List[Dict]]:
@@ -6,9 +6,29 @@ interfaces so they can be imported using the ``backend`` namespace.
 """
 
 __all__ = [
+    "batch",
+    "candidates",
+    "clustering",
+    "common_time",
     "config",
+    "cost_planner",
     "coursemos_crawler",
     "directions",
+    "gap_memo",
     "geocoding",
+    "horizon",
+    "incremental",
+    "jobs",
+    "live",
+    "logs",
+    "metrics",
+    "portfolio",
+    "records",
+    "result_cache",
+    "robustness",
+    "schedule_db",
     "scheduler",
+    "serialization",
+    "swr_cache",
+    "travel_cache",
 ]
@@ -5,31 +5,77 @@ FastAPI application exposing the YCC scheduler over HTTP.
 from __future__ import annotations
 
 from collections import defaultdict
-from datetime import datetime
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timezone
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, Iterator, List, Literal, Optional, Tuple, Union
+import asyncio
+import json
+import logging
+import threading
 import uuid
 
 import sys
 
-from fastapi import APIRouter, FastAPI, HTTPException
+from fastapi import APIRouter, Depends, FastAPI, Header, HTTPException, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel, Field
 
+from .batch import solve_batch
+from .clustering import solve_clustered
+from .common_time import find_common_windows
 from .config import Config
-from .geocoding import get_location_coords
-from .sample_data import get_sample_schedule, get_sample_todos
-from .scheduler import allocate_tasks
+from .cost_planner import PREFETCH, REJECT, CostPlan, PlannedTravel, plan_external_calls
+from .gap_memo import shared_gap_memo
+from .logs import configure_logging, get_logger, log_event
+from .geocoding import format_coordinates, get_location_coords
+from .horizon import horizon_date, parse_horizon_minutes, plan_horizon
+from .incremental import PlanSnapshot, plan_incrementally
+from .jobs import FAILED, QUEUED, RUNNING, Job, JobQueueFull, shared_job_queue
+from .live import plan_from_now
+from .metrics import (
+    CACHE_ENTRIES,
+    CACHE_EVICTIONS,
+    CACHE_HITS,
+    CACHE_MISSES,
+    CACHE_STALE,
+    COUNTER,
+    GAUGE,
+    PHASE_LATENCY,
+    QUEUE_DEPTH,
+    MetricsMiddleware,
+    shared_metrics,
+)
+from .portfolio import score_plan, shutdown_executor, solve_portfolio
+from .sample_data import LmsSnapshot, crawl_lms, get_sample_schedule, sample_from_snapshot
+from .schedule_db import ScheduleConflict, SqliteScheduleStore
+from .records import (
+    MINUTES_PER_DAY,
+    Event,
+    Placement,
+    Task,
+    decode_plan,
+    encode_plan,
+    format_minutes,
+    parse_minutes,
+)
+from .result_cache import request_digest, shared_result_cache
+from .robustness import RobustnessReport, analyze_plan, choose_robust_plan, robustness_available
+from .scheduler import build_travel_matrix, iter_schedule, solve_schedule
+from .serialization import FastJSONResponse
+from .swr_cache import CachedValue, SwrCache
+from .travel_cache import shared_travel_cache
+
+# Server mode: events stay off unless LOG_LEVEL is set.
+configure_logging()
+logger = get_logger("api")
 
 ROOT_DIR = Path(__file__).resolve().parents[2]
 if str(ROOT_DIR) not in sys.path:
     sys.path.append(str(ROOT_DIR))
 
-try:
-    from daystack import get_crawler_tasks
-except Exception:
-    get_crawler_tasks = None
-
 
 def _config_ready() -> bool:
     """Return True if the required Naver credentials are configured."""
@@ -51,6 +97,8 @@ class ScheduleItem(BaseModel):
     location: Optional[str] = None
     start_time: Optional[str] = None
     end_time: Optional[str] = None
+    date: Optional[str] = Field(None, description="YYYY-MM-DD; used by the week planner")
+    user: Optional[str] = Field(None, description="Owner, for group scheduling")
     type: Optional[str] = None
     coordinates: Optional[Coordinates] = None
 
@@ -66,9 +114,79 @@ class TodoItem(BaseModel):
     source: Optional[str] = None
 
 
+StrategyName = Literal["greedy", "knapsack", "exact", "local_search"]
+SolverName = Literal[StrategyName, "portfolio"]
+
+
+class StrategyOutcome(BaseModel):
+    strategy: str
+    status: str
+    scheduled_minutes: int = 0
+    scheduled_tasks: int = 0
+
+
+class CacheStats(BaseModel):
+    hits: int
+    misses: int
+    evictions: int = 0
+    size: int
+    hit_rate: float
+
+
+class EventRisk(BaseModel):
+    name: str
+    start_time: Optional[str] = None
+    late_probability: float
+
+
+class RobustnessSummary(BaseModel):
+    on_time_probability: float
+    samples: int
+    events: List[EventRisk]
+
+
+class CostEstimate(BaseModel):
+    strategy: Literal["prefetch", "lazy", "estimate", "reject"]
+    locations: int
+    geocode_calls: int
+    directions_worst: int
+    directions_expected: int
+    calls_worst: int
+    calls_expected: int
+    latency_ms_worst: int
+    latency_ms_expected: int
+    budget: int
+
+
+class JobQueueStats(BaseModel):
+    queued: int
+    running: int
+    done: int
+    failed: int
+    workers: int
+    max_queued: int
+
+
 class SchedulerMeta(BaseModel):
     config_ready: bool
     travel_time_buffer: int
+    solver: Optional[str] = None
+    portfolio: Optional[List[StrategyOutcome]] = None
+    schedule_version: Optional[int] = None
+    reused_gaps: Optional[int] = None
+    replanned_gaps: Optional[int] = None
+    planned_from: Optional[str] = None
+    horizon_start: Optional[str] = None
+    horizon_days: Optional[int] = None
+    clusters: Optional[int] = None
+    gap_memo: Optional[CacheStats] = None
+    result_cache: Optional[CacheStats] = None
+    cached: Optional[bool] = None
+    robustness: Optional[RobustnessSummary] = None
+    cost: Optional[CostEstimate] = None
+    jobs: Optional[JobQueueStats] = None
+    fetched_at: Optional[datetime] = None
+    stale: Optional[bool] = None
 
 
 class CampusBreakdown(BaseModel):
@@ -81,11 +199,107 @@ class ScheduleInsights(BaseModel):
     scheduled_tasks: int
     remaining_tasks: int
     campus_breakdown: List[CampusBreakdown]
+    candidate_top_k: Optional[int] = None
 
 
 class OptimizeRequest(BaseModel):
     schedule: List[ScheduleItem]
     todos: List[TodoItem]
+    solver: SolverName = "greedy"
+    deadline_ms: Optional[int] = Field(
+        None, gt=0, description="Portfolio deadline; defaults to PORTFOLIO_DEADLINE_MS"
+    )
+    top_k: Optional[int] = Field(
+        None, ge=0, description="Tasks offered per gap; defaults to CANDIDATE_TOP_K, 0 disables"
+    )
+    cluster: bool = Field(
+        False, description="Only offer each gap the tasks in areas near its endpoints"
+    )
+    robustness: bool = Field(
+        False,
+        description="Estimate late probabilities; the portfolio then prefers the safest plan",
+    )
+    call_budget: Optional[int] = Field(
+        None, ge=0, description="Geocoding + Directions calls allowed; defaults to EXTERNAL_CALL_BUDGET"
+    )
+
+
+class BatchUser(BaseModel):
+    user: str
+    schedule: List[ScheduleItem]
+    todos: List[TodoItem]
+
+
+class BatchOptimizeRequest(BaseModel):
+    users: List[BatchUser] = Field(..., min_length=1)
+    solver: StrategyName = "greedy"
+    top_k: Optional[int] = Field(
+        None, ge=0, description="Tasks offered per gap; defaults to CANDIDATE_TOP_K, 0 disables"
+    )
+
+
+class PlanRequest(BaseModel):
+    todos: List[TodoItem]
+    solver: StrategyName = "greedy"
+    user: Optional[str] = Field(None, description="Plan this user's stored schedule")
+
+
+class LiveReplanRequest(BaseModel):
+    schedule: List[ScheduleItem]
+    todos: List[TodoItem]
+    now: str = Field(..., pattern=r"^\d{1,2}:\d{2}(:\d{2})?$", description="Current time, HH:MM")
+    position: Optional[Coordinates] = None
+    location: Optional[str] = Field(None, description="Used when no position is given")
+    solver: StrategyName = "greedy"
+
+
+class HorizonRequest(BaseModel):
+    schedule: List[ScheduleItem] = Field(
+        ..., description="Items without a date repeat on every day of the horizon"
+    )
+    todos: List[TodoItem]
+    start_date: Optional[date] = None
+    days: int = Field(7, gt=0, le=31)
+
+
+class ScheduleDelta(BaseModel):
+    version: int
+    full: bool = Field(False, description="Too old to diff: items is the whole schedule")
+    items: List[ScheduleItem]
+    deleted: List[str]
+
+
+class FreeSlot(BaseModel):
+    start_time: str
+    end_time: str
+    minutes: int
+
+
+class CommonFreeTimeRequest(BaseModel):
+    users: List[str] = Field(..., min_length=2)
+    location: Optional[str] = Field(None, description="Meeting point; travel to it is subtracted")
+    start_date: Optional[date] = None
+    days: int = Field(7, gt=0, le=31)
+    day_start: str = Field("08:00", pattern=r"^\d{1,2}:\d{2}$")
+    day_end: str = Field("22:00", pattern=r"^\d{1,2}:\d{2}$")
+    min_minutes: int = Field(30, gt=0)
+    max_absent: int = Field(0, ge=0, description="Also return windows where this many members are busy")
+    limit: int = Field(10, gt=0, le=100)
+
+
+class CommonWindowItem(BaseModel):
+    date: str
+    start_time: str
+    end_time: str
+    minutes: int
+    available: List[str]
+    absent: List[str]
+
+
+class CommonFreeTimeResponse(BaseModel):
+    users: List[str]
+    location: Optional[str] = None
+    windows: List[CommonWindowItem]
 
 
 class OptimizeResponse(BaseModel):
@@ -97,16 +311,78 @@ class OptimizeResponse(BaseModel):
     insights: ScheduleInsights
 
 
+RESPONSE_FIELDS = tuple(OptimizeResponse.model_fields)
+# ``view=lean`` leaves out the request's own schedule and todos.
+LEAN_FIELDS = ("optimized_schedule", "remaining_todos", "meta", "insights")
+
+
+class ResponseShape(BaseModel):
+    """Which ``OptimizeResponse`` keys to render, and whether todos are request indices."""
+
+    lean: bool = False
+    fields: Tuple[str, ...] = RESPONSE_FIELDS
+
+
+class LeanScheduleItem(ScheduleItem):
+    todo_index: Optional[int] = Field(None, description="Index of the placed todo in the request")
+
+
+class LeanOptimizeResponse(BaseModel):
+    """``view=lean`` and/or ``fields=``: only the selected keys are present."""
+
+    schedule: Optional[List[ScheduleItem]] = None
+    todos: Optional[List[TodoItem]] = None
+    optimized_schedule: Optional[List[LeanScheduleItem]] = None
+    remaining_todos: Optional[List[int]] = Field(
+        None, description="Indices into the request's todos (lists of todos with view=full)"
+    )
+    meta: Optional[SchedulerMeta] = None
+    insights: Optional[ScheduleInsights] = None
+
+
+class JobStatus(BaseModel):
+    id: str
+    status: Literal["queued", "running", "done", "failed"]
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    result: Optional[Union[OptimizeResponse, LeanOptimizeResponse]] = None
+    error: Optional[str] = None
+    error_status: Optional[int] = None
+
+
 class LiveTaskResponse(BaseModel):
     tasks: List[TodoItem]
     count: int
     campus_breakdown: List[CampusBreakdown]
+    fetched_at: Optional[datetime] = None
+    stale: Optional[bool] = None
+
+
+class SampleRefresh(BaseModel):
+    fetched_at: datetime
+    crawler_available: bool
+    schedule_items: int
+    tasks: int
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    """Start the metrics writer; release worker pools when the server shuts down."""
+    shared_metrics.start()
+    yield
+    shared_metrics.stop()
+    shared_job_queue.shutdown()
+    _sample_cache.shutdown()
+    shutdown_executor()
+    _schedule_store.close()
 
 
 app = FastAPI(
     title="YCC Scheduler API",
     version="0.1.0",
     description="HTTP interface for schedule optimization and Coursemos data.",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -120,11 +396,30 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Plans are repetitive JSON; compress them for clients that accept gzip.
+app.add_middleware(
+    GZipMiddleware, minimum_size=Config.GZIP_MINIMUM_SIZE, compresslevel=Config.GZIP_LEVEL
+)
+# Outermost, so request latency includes compression.
+app.add_middleware(MetricsMiddleware)
 
 router = APIRouter(prefix="/api", tags=["scheduler"])
 
-# In-memory schedule storage (in production, use a database)
-_schedule_store: List[dict] = []
+# Schedule items live in SQLite so every worker (and restart) sees the same
+# schedule; its version is bumped on every write, so the stored plan knows
+# when it is stale.
+_schedule_store = SqliteScheduleStore(Config.SCHEDULE_DB_PATH)
+# Last plan for each user's stored schedule, with the todos it was built for.
+# Unlike the schedule this is per process: with several workers, each keeps
+# (and incrementally re-plans) the plans last POSTed to it. The lock keeps a
+# snapshot and its todos consistent between concurrent plan requests.
+_plan_snapshots: Dict[str, Tuple[PlanSnapshot, List[TodoItem]]] = {}
+_plan_lock = threading.Lock()
+# One LMS crawl per account feeds both /api/sample and /api/tasks/live; the
+# crawl and its optimized sample plan are cached together.
+_sample_cache = SwrCache(Config.SAMPLE_FRESH_SECONDS, Config.SAMPLE_MAX_STALE_SECONDS)
+# The crawler logs in with the server's configured LMS account.
+_SAMPLE_ACCOUNT = "default"
 
 
 @app.get("/health")
@@ -139,64 +434,222 @@ async def health():
     return SchedulerMeta(config_ready=True, travel_time_buffer=1)
 
 
+def _collect_metrics():
+    """Cache and queue counters read when this worker's metrics are snapshotted."""
+    caches = {
+        "travel": shared_travel_cache.stats(),
+        "gap_memo": shared_gap_memo.stats(),
+        "result": shared_result_cache.stats(),
+        "sample": _sample_cache.stats(),
+    }
+    for name, stats in caches.items():
+        labels = {"cache": name}
+        yield COUNTER, CACHE_HITS, labels, stats["hits"]
+        yield COUNTER, CACHE_MISSES, labels, stats["misses"]
+        yield COUNTER, CACHE_EVICTIONS, labels, stats.get("evictions", 0)
+        yield GAUGE, CACHE_ENTRIES, labels, stats["size"]
+    yield COUNTER, CACHE_STALE, {"cache": "sample"}, caches["sample"]["stale_hits"]
+    jobs = shared_job_queue.stats()
+    for state in (QUEUED, RUNNING):
+        yield GAUGE, QUEUE_DEPTH, {"queue": "jobs", "state": state}, jobs[state]
+
+
+shared_metrics.add_collector(_collect_metrics)
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics() -> PlainTextResponse:
+    """Prometheus text format, summed over every worker writing to METRICS_DIR."""
+    return PlainTextResponse(
+        shared_metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
 @router.get("/status", response_model=SchedulerMeta)
 async def status() -> SchedulerMeta:
     """Report configuration readiness and other metadata."""
     return SchedulerMeta(
         config_ready=_config_ready(),
         travel_time_buffer=Config.TRAVEL_TIME_BUFFER,
+        gap_memo=CacheStats(**shared_gap_memo.stats()),
+        result_cache=CacheStats(**shared_result_cache.stats()),
+        jobs=JobQueueStats(**shared_job_queue.stats()),
     )
 
 
-def _run_optimization(
-    schedule: List[ScheduleItem],
-    todos: List[TodoItem],
-) -> OptimizeResponse:
-    def _parse_coordinates(raw: Optional[str]) -> Optional[Coordinates]:
-        if not raw:
-            return None
-        try:
-            lng_str, lat_str = raw.split(",", maxsplit=1)
-            return Coordinates(lat=float(lat_str), lng=float(lng_str))
-        except (ValueError, TypeError):
-            return None
-
-    def _attach_coordinates(
-        items: List[ScheduleItem],
-        cache: dict[str, Coordinates | None],
-    ) -> List[ScheduleItem]:
-        enhanced: List[ScheduleItem] = []
-        for item in items:
-            coords = item.coordinates
-            if not coords and item.location:
-                if item.location not in cache:
-                    cache[item.location] = _parse_coordinates(
-                        get_location_coords(item.location)
-                    )
-                coords = cache[item.location]
-            enhanced.append(
-                item.model_copy(update={"coordinates": coords})
-            )
-        return enhanced
+def _to_events(schedule: List[ScheduleItem]) -> List[Event]:
+    """Convert schedule models into integer-minute records (once per request).
 
-    coord_cache: dict[str, Coordinates | None] = {}
+    The models ride along as ``source`` so nothing is dumped and re-validated
+    on the way back.
+    """
+    if not schedule:
+        raise HTTPException(status_code=400, detail="Schedule cannot be empty")
 
-    schedule_payload = [
-        item.model_dump(exclude_none=True, exclude={"coordinates"})
+    return [
+        Event(
+            item.name,
+            parse_minutes(item.start_time),
+            parse_minutes(item.end_time),
+            item.location,
+            item,
+        )
         for item in schedule
     ]
-    todo_payload = [item.model_dump(exclude_none=True) for item in todos]
 
-    if not schedule_payload:
-        raise HTTPException(status_code=400, detail="Schedule cannot be empty")
 
-    optimized_schedule, remaining = allocate_tasks(
-        schedule_payload,
-        todo_payload,
-        return_summary=True,
-    )
+def _to_horizon_events(schedule: List[ScheduleItem], epoch: date, days: int) -> List[Event]:
+    """Events in horizon minutes; items without a date repeat on every day."""
+    events: List[Event] = []
+    for day in range(days):
+        day_str = horizon_date(day * MINUTES_PER_DAY, epoch)
+        offset = day * MINUTES_PER_DAY
+        for item in schedule:
+            if item.date and item.date != day_str:
+                continue
+            start = parse_minutes(item.start_time)
+            end = parse_minutes(item.end_time)
+            events.append(
+                Event(
+                    item.name,
+                    None if start is None else start + offset,
+                    None if end is None else end + offset,
+                    item.location,
+                    item if item.date else item.model_copy(update={"date": day_str}),
+                )
+            )
+    return events
+
+
+def _to_tasks(todos: List[TodoItem], epoch: Optional[date] = None) -> List[Task]:
+    """Convert todo models into task records, with deadlines relative to ``epoch``."""
+    epoch = epoch or date.today()
+    return [
+        Task(
+            todo.task,
+            todo.estimated_time,
+            todo.location,
+            todo,
+            parse_horizon_minutes(todo.deadline, epoch),
+        )
+        for todo in todos
+    ]
+
+
+def _candidate_top_k(todos: List[TodoItem], top_k: Optional[int] = None) -> Optional[int]:
+    """The prefilter size to use, or None when the todo list is small enough."""
+    if top_k is None:
+        top_k = Config.CANDIDATE_TOP_K
+    return top_k if top_k and len(todos) > top_k else None
+
+
+def _parse_coordinates(raw: Optional[str]) -> Optional[Coordinates]:
+    if not raw:
+        return None
+    try:
+        lng_str, lat_str = raw.split(",", maxsplit=1)
+        return Coordinates(lat=float(lat_str), lng=float(lng_str))
+    except (ValueError, TypeError):
+        return None
+
+
+# Key order of a rendered schedule item; placements start from this template.
+_ITEM_TEMPLATE = dict.fromkeys(ScheduleItem.model_fields)
 
-    optimized_models = [ScheduleItem(**entry) for entry in optimized_schedule]
+
+class _PlanRenderer:
+    """
+    Renders schedule items, placements and todos to JSON-ready dicts once.
+
+    Input models are dumped once each (an event shows up in both ``schedule``
+    and ``optimized_schedule``), placements are built as dicts directly, and
+    coordinates are resolved once per location through ``coord_cache``.
+    """
+
+    def __init__(
+        self,
+        coord_cache: Optional[dict[str, Coordinates | None]] = None,
+        epoch: Optional[date] = None,
+    ):
+        self.coord_cache = {} if coord_cache is None else coord_cache
+        self.epoch = epoch
+        self._coords: dict[str, Optional[dict]] = {}
+        self._dumped: dict[int, dict] = {}
+
+    def coordinates(self, location: Optional[str]) -> Optional[dict]:
+        if not location:
+            return None
+        if location not in self._coords:
+            if location not in self.coord_cache:
+                self.coord_cache[location] = _parse_coordinates(get_location_coords(location))
+            coords = self.coord_cache[location]
+            self._coords[location] = coords.model_dump() if coords else None
+        return self._coords[location]
+
+    def item(self, item: ScheduleItem) -> dict:
+        key = id(item)
+        if key not in self._dumped:
+            data = item.model_dump(mode="json")
+            if not data["coordinates"]:
+                data["coordinates"] = self.coordinates(item.location)
+            self._dumped[key] = data
+        return self._dumped[key]
+
+    def placement(self, placement: Placement) -> dict:
+        return {
+            **_ITEM_TEMPLATE,
+            "name": placement.name,
+            "location": placement.location,
+            "start_time": format_minutes(placement.start),
+            "end_time": format_minutes(placement.end),
+            "date": horizon_date(placement.start, self.epoch) if self.epoch else None,
+            "type": "task",
+            "coordinates": self.coordinates(placement.location),
+        }
+
+    def entry(self, entry: Event | Placement) -> dict:
+        return self.placement(entry) if isinstance(entry, Placement) else self.item(entry.source)
+
+    def todo(self, todo: TodoItem) -> dict:
+        key = id(todo)
+        if key not in self._dumped:
+            self._dumped[key] = todo.model_dump(mode="json")
+        return self._dumped[key]
+
+
+def _build_response(
+    schedule: List[ScheduleItem],
+    todos: List[TodoItem],
+    plan: List[Event | Placement],
+    remaining: List[Task],
+    meta: SchedulerMeta,
+    epoch: Optional[date] = None,
+    top_k: Optional[int] = None,
+    coord_cache: Optional[dict[str, Coordinates | None]] = None,
+    shape: Optional[ResponseShape] = None,
+) -> dict:
+    """Render a solved plan as an ``OptimizeResponse`` payload (a plain dict).
+
+    The payload is built once from the internal plan and is not validated
+    again: return it through ``FastJSONResponse``. ``epoch`` marks multi-day
+    minutes and adds dates. ``coord_cache`` collects the coordinates looked
+    up per location; passing the same dict again skips those lookups.
+    ``shape`` limits the keys rendered; when lean, placements carry a
+    ``todo_index`` and ``remaining_todos`` lists indices into ``todos``.
+    """
+    shape = shape or ResponseShape()
+    render = _PlanRenderer(coord_cache, epoch)
+    todo_index = {id(todo): i for i, todo in enumerate(todos)} if shape.lean else None
+
+    def optimized(entry: Event | Placement) -> dict:
+        if todo_index is None or not isinstance(entry, Placement):
+            return render.entry(entry)
+        return dict(render.placement(entry), todo_index=todo_index[id(entry.task.source)])
+
+    def remaining_todo(task: Task) -> dict | int:
+        if todo_index is None:
+            return render.todo(task.source)
+        return todo_index[id(task.source)]
 
     campus_counter = defaultdict(int)
     for todo in todos:
@@ -211,54 +664,570 @@ def _run_optimization(
             CampusBreakdown(location=loc, count=count)
             for loc, count in sorted(campus_counter.items())
         ],
+        candidate_top_k=top_k,
     )
 
-    return OptimizeResponse(
-        schedule=_attach_coordinates(schedule, coord_cache),
-        todos=todos,
-        optimized_schedule=_attach_coordinates(
-            optimized_models, coord_cache
-        ),
-        remaining_todos=[TodoItem(**todo) for todo in remaining],
-        meta=SchedulerMeta(
-            config_ready=_config_ready(),
-            travel_time_buffer=Config.TRAVEL_TIME_BUFFER,
-        ),
-        insights=insights,
+    renderers = {
+        "schedule": lambda: [render.item(item) for item in schedule],
+        "todos": lambda: [render.todo(todo) for todo in todos],
+        "optimized_schedule": lambda: [optimized(entry) for entry in plan],
+        "remaining_todos": lambda: [remaining_todo(task) for task in remaining],
+        "meta": lambda: meta.model_dump(mode="json"),
+        "insights": lambda: insights.model_dump(mode="json"),
+    }
+    return {key: renderers[key]() for key in RESPONSE_FIELDS if key in shape.fields}
+
+
+def _response_shape(
+    view: Literal["full", "lean"] = Query(
+        "full", description="lean: leave out the echoed inputs and refer to todos by index"
+    ),
+    fields: Optional[str] = Query(
+        None, description="Comma-separated top-level keys to return (default depends on view)"
+    ),
+) -> ResponseShape:
+    lean = view == "lean"
+    if fields is None:
+        return ResponseShape(lean=lean, fields=LEAN_FIELDS if lean else RESPONSE_FIELDS)
+    selected = tuple(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    unknown = [name for name in selected if name not in RESPONSE_FIELDS]
+    if unknown or not selected:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields {unknown}; choose from {list(RESPONSE_FIELDS)}",
+        )
+    return ResponseShape(lean=lean, fields=selected)
+
+
+def _scheduler_meta(**extra) -> SchedulerMeta:
+    return SchedulerMeta(
+        config_ready=_config_ready(),
+        travel_time_buffer=Config.TRAVEL_TIME_BUFFER,
+        **extra,
+    )
+
+
+def _robustness_summary(report: RobustnessReport) -> RobustnessSummary:
+    return RobustnessSummary(
+        on_time_probability=report.on_time_probability,
+        samples=report.samples,
+        events=[
+            EventRisk(
+                name=risk.event.name,
+                start_time=format_minutes(risk.event.start),
+                late_probability=risk.late_probability,
+            )
+            for risk in report.events
+        ],
     )
 
 
+def _plan_travel(
+    events: List[Event],
+    tasks: List[Task],
+    solver: str,
+    top_k: Optional[int],
+    call_budget: Optional[int],
+    prefetch: bool = True,
+) -> Tuple[CostPlan, object]:
+    """
+    Decide up front how many external calls a request may spend; returns the
+    plan and the travel mapping to solve with (413 when over budget). With
+    ``prefetch`` False the full matrix is not built even when it would fit,
+    so the first gap is not held up by lookups it doesn't need.
+    """
+    cost = plan_external_calls(
+        events, tasks, shared_travel_cache, solver=solver, top_k=top_k, budget=call_budget
+    )
+    if cost.strategy == REJECT:
+        raise HTTPException(
+            status_code=413,
+            detail=(
+                f"Request needs about {cost.calls_expected} external calls "
+                f"(worst case {cost.calls_worst}); the budget is {cost.budget}."
+            ),
+        )
+    if cost.strategy != PREFETCH:
+        return cost, PlannedTravel(shared_travel_cache, cost.directions_allowance)
+    if prefetch:
+        build_travel_matrix(
+            [event.location for event in events] + [task.location for task in tasks],
+            shared_travel_cache,
+        )
+    return cost, shared_travel_cache
+
+
+def _run_optimization(
+    schedule: List[ScheduleItem],
+    todos: List[TodoItem],
+    solver: str = "greedy",
+    deadline_ms: Optional[int] = None,
+    top_k: Optional[int] = None,
+    cluster: bool = False,
+    robustness: bool = False,
+    call_budget: Optional[int] = None,
+    shape: Optional[ResponseShape] = None,
+) -> dict:
+    if robustness and not robustness_available():
+        raise HTTPException(status_code=503, detail="Robustness analysis requires numpy.")
+    events = _to_events(schedule)
+    tasks = _to_tasks(todos)
+    cluster = cluster and solver != "portfolio"
+    top_k = None if cluster else _candidate_top_k(todos, top_k)
+
+    # Identical requests (up to ordering and generated ids) replay the cached
+    # plan onto this request's records instead of solving again.
+    with shared_metrics.timer(PHASE_LATENCY, phase="cache_lookup"):
+        key, schedule_order, todo_order = request_digest(
+            schedule,
+            todos,
+            solver=solver,
+            deadline_ms=deadline_ms,
+            top_k=top_k,
+            cluster=cluster,
+            robustness=robustness,
+            call_budget=call_budget,
+            travel_time_buffer=Config.TRAVEL_TIME_BUFFER,
+            travel_version=shared_travel_cache.version,
+            today=date.today(),
+        )
+        cached = shared_result_cache.get(key)
+    canonical_events = [events[i] for i in schedule_order]
+    canonical_tasks = [tasks[i] for i in todo_order]
+    if cached is not None:
+        encoded, meta, coord_cache = cached
+        plan, remaining = decode_plan(encoded, canonical_events, canonical_tasks)
+        with shared_metrics.timer(PHASE_LATENCY, phase="render"):
+            return _build_response(
+                schedule,
+                todos,
+                plan,
+                remaining,
+                _scheduler_meta(cached=True, **meta),
+                top_k=top_k,
+                coord_cache=dict(coord_cache),
+                shape=shape,
+            )
+
+    failures = shared_travel_cache.failures
+    with shared_metrics.timer(PHASE_LATENCY, phase="travel"):
+        cost, travel = _plan_travel(events, tasks, solver, top_k, call_budget)
+    meta = {"solver": solver, "cost": CostEstimate(**cost.as_dict())}
+    with shared_metrics.timer(PHASE_LATENCY, phase="solve"):
+        plan, remaining = _solve_request(
+            events, tasks, solver, travel, meta, deadline_ms, top_k, cluster, robustness
+        )
+
+    if robustness and "robustness" not in meta:
+        with shared_metrics.timer(PHASE_LATENCY, phase="robustness"):
+            meta["robustness"] = _robustness_summary(analyze_plan(plan, travel))
+
+    coord_cache: dict[str, Coordinates | None] = {}
+    with shared_metrics.timer(PHASE_LATENCY, phase="render"):
+        response = _build_response(
+            schedule,
+            todos,
+            plan,
+            remaining,
+            _scheduler_meta(**meta),
+            top_k=top_k,
+            coord_cache=coord_cache,
+            shape=shape,
+        )
+    # Plans built on estimated minutes, or on failed lookups counted as 0,
+    # are not worth replaying.
+    if getattr(travel, "estimated", 0) == 0 and shared_travel_cache.failures == failures:
+        shared_result_cache.put(
+            key, (encode_plan(plan, remaining, canonical_events, canonical_tasks), meta, coord_cache)
+        )
+    return response
+
+
+def _solve_request(
+    events: List[Event],
+    tasks: List[Task],
+    solver: str,
+    travel,
+    meta: dict,
+    deadline_ms: Optional[int],
+    top_k: Optional[int],
+    cluster: bool,
+    robustness: bool,
+) -> Tuple[List[Event | Placement], List[Task]]:
+    """Solve with the requested strategy, recording solver details in ``meta``."""
+    if cluster:
+        plan, remaining, meta["clusters"] = solve_clustered(
+            events, tasks, strategy=solver, travel_cache=travel
+        )
+    elif solver == "portfolio":
+        result = solve_portfolio(
+            events, tasks, deadline_ms=deadline_ms, top_k=top_k, travel_cache=travel
+        )
+        plan, remaining = result.plan, result.remaining
+        meta["solver"] = result.winner
+        meta["portfolio"] = [
+            StrategyOutcome(**vars(outcome)) for outcome in result.outcomes
+        ]
+        if robustness:
+            # Among plans close to the best score, keep the one most likely
+            # to be on time everywhere (the winner on ties).
+            floor = score_plan(plan)[0] * Config.ROBUST_MIN_SCORE_RATIO
+            names = [result.winner] + [
+                name
+                for name, (candidate, _) in result.candidates.items()
+                if name != result.winner and score_plan(candidate)[0] >= floor
+            ]
+            best, reports = choose_robust_plan(
+                [result.candidates[name][0] for name in names], travel
+            )
+            plan, remaining = result.candidates[names[best]]
+            meta["solver"] = names[best]
+            meta["robustness"] = _robustness_summary(reports[best])
+    else:
+        plan, remaining = solve_schedule(
+            events, tasks, strategy=solver, travel_cache=travel, top_k=top_k
+        )
+    return plan, remaining
+
+
 @router.get("/sample", response_model=OptimizeResponse)
-async def sample_data() -> OptimizeResponse:
-    """Return sample schedule, tasks, and the optimized output."""
-    sample_schedule = get_sample_schedule()
-    # Add IDs to sample schedule items if not present
-    schedule = []
-    for item in sample_schedule:
-        item_dict = dict(item)
-        if "id" not in item_dict:
-            item_dict["id"] = str(uuid.uuid4())
-        schedule.append(ScheduleItem(**item_dict))
-    todos = [TodoItem(**item) for item in get_sample_todos()]
-    return _run_optimization(schedule, todos)
-
-
-@router.post("/optimize", response_model=OptimizeResponse)
-async def optimize(payload: OptimizeRequest) -> OptimizeResponse:
-    """Optimize an arbitrary schedule/task payload."""
-    return _run_optimization(payload.schedule, payload.todos)
+def sample_data() -> FastJSONResponse:
+    """
+    Return sample schedule, tasks, and the optimized output. Served from the
+    crawl cache; ``meta.stale`` marks a copy being refreshed in the background.
+    """
+    cached = _sample(refresh=False)
+    _, response = cached.value
+    meta = dict(
+        response["meta"],
+        fetched_at=_timestamp(cached.fetched_at).isoformat(),
+        stale=cached.stale,
+    )
+    return FastJSONResponse(dict(response, meta=meta))
+
+
+def _load_sample() -> Tuple[Optional[LmsSnapshot], dict]:
+    """Crawl once and optimize the resulting sample (fallback data if the crawl is empty)."""
+    snapshot = crawl_lms()
+    sample_schedule, sample_todos = sample_from_snapshot(snapshot)
+    schedule = [
+        ScheduleItem(**dict(item, id=item.get("id") or str(uuid.uuid4())))
+        for item in sample_schedule
+    ]
+    todos = [TodoItem(**item) for item in sample_todos]
+    return snapshot, _run_optimization(schedule, todos)
+
+
+def _sample(refresh: bool) -> CachedValue:
+    if refresh:
+        return _sample_cache.refresh(_SAMPLE_ACCOUNT, _load_sample)
+    return _sample_cache.get(_SAMPLE_ACCOUNT, _load_sample)
+
+
+@router.post("/sample/refresh", response_model=SampleRefresh)
+def refresh_sample() -> SampleRefresh:
+    """Crawl the LMS and rebuild the sample plan now, replacing the cached copy."""
+    cached = _sample(refresh=True)
+    snapshot, response = cached.value
+    return SampleRefresh(
+        fetched_at=_timestamp(cached.fetched_at),
+        crawler_available=snapshot is not None,
+        schedule_items=len(response["schedule"]),
+        tasks=len(snapshot.tasks) if snapshot else 0,
+    )
+
+
+def _optimize_payload(payload: OptimizeRequest, shape: Optional[ResponseShape] = None) -> dict:
+    return _run_optimization(
+        payload.schedule,
+        payload.todos,
+        solver=payload.solver,
+        deadline_ms=payload.deadline_ms,
+        top_k=payload.top_k,
+        cluster=payload.cluster,
+        robustness=payload.robustness,
+        call_budget=payload.call_budget,
+        shape=shape,
+    )
+
+
+@router.post("/optimize", response_model=Union[OptimizeResponse, LeanOptimizeResponse])
+def optimize(
+    payload: OptimizeRequest, shape: ResponseShape = Depends(_response_shape)
+) -> FastJSONResponse:
+    """
+    Optimize an arbitrary schedule/task payload. ``?view=lean`` leaves out
+    the echoed ``schedule``/``todos`` and refers to todos by their index in
+    the request; ``?fields=`` picks the top-level keys to return.
+    """
+    return FastJSONResponse(_optimize_payload(payload, shape))
+
+
+def _timestamp(seconds: Optional[float]) -> Optional[datetime]:
+    return datetime.fromtimestamp(seconds, timezone.utc) if seconds is not None else None
+
+
+def _job_status(job: Job, status_code: int = 200) -> FastJSONResponse:
+    status = JobStatus(
+        id=job.id,
+        status=job.status,
+        created_at=_timestamp(job.created_at),
+        started_at=_timestamp(job.started_at),
+        finished_at=_timestamp(job.finished_at),
+    )
+    if job.status == FAILED:
+        if isinstance(job.error, HTTPException):
+            status.error, status.error_status = str(job.error.detail), job.error.status_code
+        else:
+            status.error, status.error_status = str(job.error) or type(job.error).__name__, 500
+    # The result is an already rendered payload; embed it as is.
+    return FastJSONResponse(
+        dict(status.model_dump(mode="json"), result=job.result), status_code=status_code
+    )
+
+
+@router.post("/jobs/optimize", response_model=JobStatus, status_code=202)
+def submit_optimize_job(
+    payload: OptimizeRequest, shape: ResponseShape = Depends(_response_shape)
+) -> FastJSONResponse:
+    """
+    Queue an optimization and return its job id at once; poll
+    ``GET /api/jobs/{id}`` for the result (shaped by ``view``/``fields`` as
+    for ``/api/optimize``). 429 when the queue is full.
+    """
+    try:
+        job = shared_job_queue.submit(_optimize_payload, payload, shape)
+    except JobQueueFull as exc:
+        raise HTTPException(status_code=429, detail=str(exc), headers={"Retry-After": "1"})
+    return _job_status(job, status_code=202)
+
+
+@router.get("/jobs/{job_id}", response_model=JobStatus)
+async def get_job(
+    job_id: str,
+    wait: float = Query(0, ge=0, description="Seconds to wait for the job to finish (long poll)"),
+) -> FastJSONResponse:
+    """Status of a job, with its result once done. ``wait`` long-polls up to JOB_MAX_WAIT."""
+    job = shared_job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    timeout = min(wait, Config.JOB_MAX_WAIT)
+    if timeout and not job.finished:
+        await asyncio.wait([asyncio.wrap_future(job.future)], timeout=timeout)
+    return _job_status(job)
+
+
+class StreamOptimizeRequest(BaseModel):
+    schedule: List[ScheduleItem]
+    todos: List[TodoItem]
+    solver: StrategyName = "greedy"
+    top_k: Optional[int] = Field(
+        None, ge=0, description="Tasks offered per gap; defaults to CANDIDATE_TOP_K, 0 disables"
+    )
+    call_budget: Optional[int] = Field(
+        None, ge=0, description="Geocoding + Directions calls allowed; defaults to EXTERNAL_CALL_BUDGET"
+    )
+
+
+def _stream_message(kind: str, data: dict, sse: bool) -> str:
+    body = json.dumps(dict(data, type=kind), ensure_ascii=False)
+    return f"event: {kind}\ndata: {body}\n\n" if sse else body + "\n"
+
+
+@router.post("/optimize/stream")
+def optimize_stream(
+    payload: StreamOptimizeRequest,
+    stream_format: Literal["ndjson", "sse"] = Query("ndjson", alias="format"),
+) -> StreamingResponse:
+    """
+    ``/api/optimize``, streamed as NDJSON (or Server-Sent Events with
+    ``?format=sse``) while it is solved:
+
+    - ``locations``: coordinates for every location in the request
+    - ``gap``: each event in time order with the tasks placed right after it,
+      sent as soon as that gap is solved
+    - ``summary``: remaining todos, insights and meta once the day is done
+    - ``error``: if solving fails part-way
+    """
+    events = _to_events(payload.schedule)
+    tasks = _to_tasks(payload.todos)
+    top_k = _candidate_top_k(payload.todos, payload.top_k)
+    cost, travel = _plan_travel(
+        events, tasks, payload.solver, top_k, payload.call_budget, prefetch=False
+    )
+    sse = stream_format == "sse"
+
+    def messages() -> Iterator[str]:
+        coord_cache: dict[str, Coordinates | None] = {}
+        for item in [*payload.schedule, *payload.todos]:
+            if item.location and item.location not in coord_cache:
+                coord_cache[item.location] = _parse_coordinates(get_location_coords(item.location))
+        yield _stream_message(
+            "locations",
+            {"locations": {loc: c.model_dump() if c else None for loc, c in coord_cache.items()}},
+            sse,
+        )
+
+        render = _PlanRenderer(coord_cache)
+        plan: List[Event | Placement] = []
+        remaining = list(tasks)
+        try:
+            gaps = iter_schedule(events, remaining, payload.solver, travel, top_k=top_k)
+            for index, (event, placements) in enumerate(gaps):
+                plan.append(event)
+                plan.extend(placements)
+                yield _stream_message(
+                    "gap",
+                    {
+                        "index": index,
+                        "event": render.entry(event),
+                        "placements": [render.placement(p) for p in placements],
+                    },
+                    sse,
+                )
+        except Exception as exc:
+            log_event(logger, logging.ERROR, "stream.failed", error=str(exc))
+            yield _stream_message("error", {"detail": str(exc) or type(exc).__name__}, sse)
+            return
+
+        response = _build_response(
+            payload.schedule,
+            payload.todos,
+            plan,
+            remaining,
+            _scheduler_meta(solver=payload.solver, cost=CostEstimate(**cost.as_dict())),
+            top_k=top_k,
+            coord_cache=coord_cache,
+        )
+        yield _stream_message(
+            "summary",
+            {key: response[key] for key in ("remaining_todos", "meta", "insights")},
+            sse,
+        )
+
+    return StreamingResponse(
+        messages(), media_type="text/event-stream" if sse else "application/x-ndjson"
+    )
+
+
+@router.post("/optimize/batch")
+def optimize_batch(payload: BatchOptimizeRequest) -> StreamingResponse:
+    """
+    Plan many users at once. Locations are resolved into one shared travel
+    matrix, plans are solved on worker processes, and each user's result is
+    streamed back as one NDJSON line as soon as it is ready:
+    ``{"user", "status": "ok", "result"}`` or ``{"user", "status": "error", "detail"}``.
+    """
+    failed: List[dict] = []
+    accepted: List[BatchUser] = []
+    jobs = []
+    for entry in payload.users:
+        try:
+            events = _to_events(entry.schedule)
+        except HTTPException as exc:
+            failed.append({"user": entry.user, "status": "error", "detail": exc.detail})
+            continue
+        accepted.append(entry)
+        jobs.append((events, _to_tasks(entry.todos)))
+
+    def lines():
+        for line in failed:
+            yield json.dumps(line, ensure_ascii=False) + "\n"
+        if not jobs:
+            return
+        top_k = Config.CANDIDATE_TOP_K if payload.top_k is None else payload.top_k
+        for result in solve_batch(jobs, strategy=payload.solver, top_k=top_k or None):
+            entry = accepted[result.index]
+            if result.error is not None:
+                line = {"user": entry.user, "status": "error", "detail": result.error}
+            else:
+                response = _build_response(
+                    entry.schedule,
+                    entry.todos,
+                    result.plan,
+                    result.remaining,
+                    _scheduler_meta(solver=payload.solver),
+                    top_k=_candidate_top_k(entry.todos, payload.top_k),
+                )
+                line = {"user": entry.user, "status": "ok", "result": response}
+            yield json.dumps(line, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@router.post("/replan/live", response_model=OptimizeResponse)
+def replan_live(payload: LiveReplanRequest) -> FastJSONResponse:
+    """
+    Re-plan the rest of the day from the user's current time and position.
+    Past events are frozen; only gaps from now on are solved.
+    """
+    events = _to_events(payload.schedule)
+    position = payload.location
+    if payload.position is not None:
+        position = format_coordinates(payload.position.lat, payload.position.lng)
+
+    top_k = _candidate_top_k(payload.todos)
+    live = plan_from_now(
+        events,
+        _to_tasks(payload.todos),
+        now=parse_minutes(payload.now),
+        position=position,
+        strategy=payload.solver,
+        top_k=top_k,
+    )
+    return FastJSONResponse(_build_response(
+        payload.schedule,
+        payload.todos,
+        live.frozen + live.plan,
+        live.remaining,
+        _scheduler_meta(
+            solver=payload.solver,
+            replanned_gaps=live.replanned_gaps,
+            planned_from=format_minutes(parse_minutes(payload.now)),
+        ),
+        top_k=top_k,
+    ))
+
+
+@router.post("/optimize/week", response_model=OptimizeResponse)
+def optimize_week(payload: HorizonRequest) -> FastJSONResponse:
+    """
+    Plan todos across a multi-day horizon, earliest deadline first, with one
+    travel matrix shared by every day.
+    """
+    epoch = payload.start_date or date.today()
+    if not payload.schedule:
+        raise HTTPException(status_code=400, detail="Schedule cannot be empty")
+
+    events = _to_horizon_events(payload.schedule, epoch, payload.days)
+    plan, remaining = plan_horizon(events, _to_tasks(payload.todos, epoch))
+
+    return FastJSONResponse(_build_response(
+        [event.source for event in sorted(events, key=lambda event: event.sort_key)],
+        payload.todos,
+        plan,
+        remaining,
+        _scheduler_meta(
+            solver="edf",
+            horizon_start=epoch.isoformat(),
+            horizon_days=payload.days,
+        ),
+        epoch=epoch,
+    ))
 
 
 @router.get("/tasks/live", response_model=LiveTaskResponse)
-async def live_tasks() -> LiveTaskResponse:
-    """Fetch real LMS assignments using daystack crawler."""
-    if not callable(get_crawler_tasks):
+def live_tasks() -> LiveTaskResponse:
+    """Real LMS assignments from the daystack crawler (cached with the sample plan)."""
+    cached = _sample(refresh=False)
+    snapshot, _ = cached.value
+    if snapshot is None:
         raise HTTPException(
             status_code=503,
             detail="LMS crawler not available on this server.",
         )
 
-    tasks = get_crawler_tasks()
+    tasks = snapshot.tasks
     if not tasks:
         raise HTTPException(
             status_code=502,
@@ -280,47 +1249,129 @@ async def live_tasks() -> LiveTaskResponse:
             CampusBreakdown(location=loc, count=count)
             for loc, count in sorted(campus_counter.items())
         ],
+        fetched_at=_timestamp(cached.fetched_at),
+        stale=cached.stale,
     )
 
 
+def _owner(user: Optional[str]) -> str:
+    """Store scope of ``user``; items without an owner form the default schedule."""
+    return user or ""
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
 # Schedule Management Endpoints
-@router.get("/schedule", response_model=List[ScheduleItem])
-async def get_schedule() -> List[ScheduleItem]:
-    """Get all schedule items."""
+@router.get("/schedule", response_model=Union[List[ScheduleItem], ScheduleDelta])
+def get_schedule(
+    user: Optional[str] = None,
+    since: Optional[int] = Query(
+        None, ge=0, description="Only items changed and ids deleted after this version"
+    ),
+    if_none_match: Optional[str] = Header(None),
+):
+    """
+    Get the schedule items owned by ``user`` (items without an owner when
+    not given).
+
+    The ``ETag`` is the store version: send it back in ``If-None-Match`` to
+    get an empty 304 while nothing changed, or pass it as ``since`` to get a
+    ``ScheduleDelta`` with just the changes (to ``user``'s items, if given).
+    """
+    if user is not None or since is not None or _schedule_store:
+        version = _schedule_store.version
+        etag = f'"{version}"'
+        if _etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        if since is not None:
+            changes = _schedule_store.changes_since(since, _owner(user))
+            return JSONResponse(
+                {
+                    "version": changes.version,
+                    "full": changes.full,
+                    "items": changes.items,
+                    "deleted": changes.deleted,
+                },
+                headers={"ETag": f'"{changes.version}"'},
+            )
+        # Rows are stored as validated JSON; serve them without rebuilding models.
+        version, body = _schedule_store.dump_json(_owner(user))
+        return Response(body, media_type="application/json", headers={"ETag": f'"{version}"'})
     try:
-        # If store is empty, return sample schedule with IDs
-        if not _schedule_store:
-            sample = get_sample_schedule()
-            schedule_items = []
-            for item in sample:
-                item_dict = dict(item)
-                # Ensure ID is present
-                if "id" not in item_dict:
-                    item_dict["id"] = str(uuid.uuid4())
-                # Ensure all required fields are present
-                if "name" not in item_dict:
-                    continue  # Skip invalid items
-                try:
-                    schedule_items.append(ScheduleItem(**item_dict))
-                except Exception as e:
-                    print(f"Warning: Skipping invalid schedule item: {e}")
-                    continue
-            return schedule_items
-        return [ScheduleItem(**item) for item in _schedule_store]
+        # The store is empty here: return the sample schedule with IDs
+        sample = get_sample_schedule()
+        schedule_items = []
+        for item in sample:
+            item_dict = dict(item)
+            # Ensure ID is present
+            if "id" not in item_dict:
+                item_dict["id"] = str(uuid.uuid4())
+            # Ensure all required fields are present
+            if "name" not in item_dict:
+                continue  # Skip invalid items
+            try:
+                schedule_items.append(ScheduleItem(**item_dict))
+            except Exception as e:
+                log_event(logger, logging.WARNING, "schedule.invalid_item", error=str(e))
+                continue
+        return schedule_items
     except Exception as e:
         # Log error and return empty list instead of crashing
-        print(f"Error in get_schedule: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.error("schedule.list_failed", exc_info=True, extra={"fields": {"error": str(e)}})
         return []
 
 
+def _store_write(write, *args, allow_overlap: bool) -> dict:
+    """Run a store write, turning overlaps into a 409 that names the conflicts."""
+    try:
+        return write(*args, allow_overlap=allow_overlap)
+    except ScheduleConflict as exc:
+        raise HTTPException(
+            status_code=409,
+            detail={
+                "message": "Schedule item overlaps existing items",
+                "conflicts": [item["id"] for item in exc.conflicts],
+            },
+        )
+
+
+@router.get("/schedule/free-slots", response_model=List[FreeSlot])
+def free_slots(
+    start: str = Query("08:00", pattern=r"^\d{1,2}:\d{2}$"),
+    end: str = Query("22:00", pattern=r"^\d{1,2}:\d{2}$"),
+    min_minutes: int = Query(30, gt=0),
+    user: Optional[str] = None,
+    date: Optional[str] = None,
+) -> List[FreeSlot]:
+    """Free slots of at least ``min_minutes`` between ``start`` and ``end``, without solving."""
+    window_start, window_end = parse_minutes(start), parse_minutes(end)
+    if window_end <= window_start:
+        raise HTTPException(status_code=400, detail="end must be after start")
+    return [
+        FreeSlot(
+            start_time=format_minutes(slot_start),
+            end_time=format_minutes(slot_end),
+            minutes=slot_end - slot_start,
+        )
+        for slot_start, slot_end in _schedule_store.free_slots(
+            window_start, window_end, min_minutes, user=_owner(user), date=date
+        )
+    ]
+
+
 @router.post("/schedule", response_model=ScheduleItem)
-async def add_schedule_item(item: ScheduleItem) -> ScheduleItem:
-    """Add a new schedule item."""
+def add_schedule_item(item: ScheduleItem, allow_overlap: bool = False) -> ScheduleItem:
+    """Add a new schedule item. Overlaps are rejected unless ``allow_overlap``."""
     # Generate ID if not provided
     if not item.id:
         item.id = str(uuid.uuid4())
+    elif item.id in _schedule_store:
+        raise HTTPException(status_code=409, detail="Schedule item already exists")
     
     # Validate time format (only if provided and not empty)
     if item.start_time and item.start_time.strip():
@@ -364,25 +1415,17 @@ async def add_schedule_item(item: ScheduleItem) -> ScheduleItem:
             raise HTTPException(status_code=400, detail="end_time must be after start_time")
     
     item_dict = item.model_dump(exclude_none=True)
-    _schedule_store.append(item_dict)
-    
-    # Sort by start_time
-    _schedule_store.sort(key=lambda x: x.get("start_time", x.get("end_time", "")))
+    _store_write(_schedule_store.add, item_dict, allow_overlap=allow_overlap)
     
     return ScheduleItem(**item_dict)
 
 
 @router.put("/schedule/{item_id}", response_model=ScheduleItem)
-async def update_schedule_item(item_id: str, item: ScheduleItem) -> ScheduleItem:
-    """Update an existing schedule item."""
-    # Find item by ID
-    index = None
-    for i, stored_item in enumerate(_schedule_store):
-        if stored_item.get("id") == item_id:
-            index = i
-            break
-    
-    if index is None:
+def update_schedule_item(
+    item_id: str, item: ScheduleItem, allow_overlap: bool = False
+) -> ScheduleItem:
+    """Update an existing schedule item. Overlaps are rejected unless ``allow_overlap``."""
+    if item_id not in _schedule_store:
         raise HTTPException(status_code=404, detail="Schedule item not found")
     
     # Validate time format (only if provided and not empty)
@@ -429,42 +1472,146 @@ async def update_schedule_item(item_id: str, item: ScheduleItem) -> ScheduleItem
     # Update item (preserve ID)
     item_dict = item.model_dump(exclude_none=True)
     item_dict["id"] = item_id
-    _schedule_store[index] = item_dict
-    
-    # Sort by start_time
-    _schedule_store.sort(key=lambda x: x.get("start_time", x.get("end_time", "")))
+    _store_write(_schedule_store.replace, item_id, item_dict, allow_overlap=allow_overlap)
     
     return ScheduleItem(**item_dict)
 
 
 @router.delete("/schedule/{item_id}")
-async def delete_schedule_item(item_id: str) -> dict:
+def delete_schedule_item(item_id: str) -> dict:
     """Delete a schedule item."""
-    # Find item by ID
-    index = None
-    for i, stored_item in enumerate(_schedule_store):
-        if stored_item.get("id") == item_id:
-            index = i
-            break
-    
-    if index is None:
+    if _schedule_store.remove(item_id) is None:
         raise HTTPException(status_code=404, detail="Schedule item not found")
     
-    _schedule_store.pop(index)
     return {"message": "Schedule item deleted", "id": item_id}
 
 
 @router.post("/schedule/reset")
-async def reset_schedule() -> dict:
+def reset_schedule() -> dict:
     """Reset schedule to sample data."""
-    global _schedule_store
     sample = get_sample_schedule()
-    _schedule_store = []
+    _schedule_store.clear()
     for item in sample:
-        item_dict = dict(item)
-        item_dict["id"] = str(uuid.uuid4())
-        _schedule_store.append(item_dict)
+        item_dict = ScheduleItem(**dict(item, id=str(uuid.uuid4()))).model_dump(exclude_none=True)
+        _schedule_store.add(item_dict, allow_overlap=True)
     return {"message": "Schedule reset to sample data", "count": len(_schedule_store)}
 
 
+@router.post("/schedule/common-free-time", response_model=CommonFreeTimeResponse)
+def common_free_time(payload: CommonFreeTimeRequest) -> CommonFreeTimeResponse:
+    """
+    Rank the windows when every listed user (or all but ``max_absent``) is
+    free and can reach ``location``, using their stored schedules.
+    """
+    schedules = {
+        user: [ScheduleItem(**item) for item in _schedule_store.for_user(user)]
+        for user in payload.users
+    }
+    unknown = [user for user, items in schedules.items() if not items]
+    if unknown:
+        raise HTTPException(status_code=404, detail=f"No schedule for users: {', '.join(unknown)}")
+
+    epoch = payload.start_date or date.today()
+    windows = find_common_windows(
+        {user: _to_horizon_events(items, epoch, payload.days) for user, items in schedules.items()},
+        days=payload.days,
+        day_start=parse_minutes(payload.day_start),
+        day_end=parse_minutes(payload.day_end),
+        min_minutes=payload.min_minutes,
+        max_absent=payload.max_absent,
+        meeting_point=payload.location,
+        limit=payload.limit,
+    )
+    return CommonFreeTimeResponse(
+        users=list(schedules),
+        location=payload.location,
+        windows=[
+            CommonWindowItem(
+                date=horizon_date(window.start, epoch),
+                start_time=format_minutes(window.start),
+                end_time=format_minutes(window.end),
+                minutes=window.minutes,
+                available=window.available,
+                absent=window.absent,
+            )
+            for window in windows
+        ],
+    )
+
+
+def _respond_with_plan(
+    schedule: List[ScheduleItem],
+    todos: List[TodoItem],
+    snapshot: PlanSnapshot,
+    reused_gaps: int,
+    replanned_gaps: int,
+) -> FastJSONResponse:
+    return FastJSONResponse(_build_response(
+        schedule,
+        todos,
+        snapshot.plan,
+        snapshot.remaining,
+        _scheduler_meta(
+            solver=snapshot.strategy,
+            schedule_version=snapshot.schedule_version,
+            reused_gaps=reused_gaps,
+            replanned_gaps=replanned_gaps,
+        ),
+    ))
+
+
+@router.post("/schedule/plan", response_model=OptimizeResponse)
+def create_schedule_plan(payload: PlanRequest) -> FastJSONResponse:
+    """
+    Plan todos against ``user``'s stored schedule and keep the plan for later
+    edits (in this worker process; see ``_plan_snapshots``).
+    """
+    owner = _owner(payload.user)
+    version, items = _schedule_store.listing(owner)
+    schedule = [ScheduleItem(**item) for item in items]
+    events = _to_events(schedule)
+    with _plan_lock:
+        snapshot, stats = plan_incrementally(
+            events,
+            _to_tasks(payload.todos),
+            schedule_version=version,
+            strategy=payload.solver,
+            top_k=_candidate_top_k(payload.todos),
+        )
+        _plan_snapshots[owner] = (snapshot, payload.todos)
+    return _respond_with_plan(
+        schedule, payload.todos, snapshot, stats.reused_gaps, stats.replanned_gaps
+    )
+
+
+@router.get("/schedule/plan", response_model=OptimizeResponse)
+def get_schedule_plan(user: Optional[str] = None) -> FastJSONResponse:
+    """
+    Return the plan for ``user``'s stored schedule. If the schedule changed
+    since the last plan, only the gaps around the edited items are solved again.
+    """
+    owner = _owner(user)
+    version, items = _schedule_store.listing(owner)
+    schedule = [ScheduleItem(**item) for item in items]
+    with _plan_lock:
+        if owner not in _plan_snapshots:
+            raise HTTPException(
+                status_code=404, detail="No plan yet. POST todos to /api/schedule/plan first."
+            )
+        previous, todos = _plan_snapshots[owner]
+        if previous.schedule_version == version:
+            return _respond_with_plan(schedule, todos, previous, len(previous.gaps), 0)
+
+        snapshot, stats = plan_incrementally(
+            _to_events(schedule),
+            previous.tasks,
+            schedule_version=version,
+            strategy=previous.strategy,
+            previous=previous,
+            top_k=_candidate_top_k(todos),
+        )
+        _plan_snapshots[owner] = (snapshot, todos)
+    return _respond_with_plan(schedule, todos, snapshot, stats.reused_gaps, stats.replanned_gaps)
+
+
 app.include_router(router)
@@ -0,0 +1,72 @@
+"""
+Batch planning for many users against one travel matrix.
+
+A cohort shares a handful of campus buildings, so the union of everyone's
+locations is resolved once into a single travel matrix (through the shared
+cache). Each user's plan is then solved on the portfolio's worker processes
+with just the slice of the matrix it needs, and results are yielded in
+completion order so callers can stream them back.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import as_completed
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .portfolio import _get_executor, _solve
+from .records import Event, Placement, Task, decode_plan
+from .scheduler import GAP_STRATEGIES, build_travel_matrix
+from .travel_cache import shared_travel_cache
+
+BatchJob = Tuple[List[Event], List[Task]]
+
+
+@dataclass
+class BatchResult:
+    index: int
+    plan: Optional[List[Event | Placement]] = None
+    remaining: Optional[List[Task]] = None
+    error: Optional[str] = None
+
+
+def _locations(job: BatchJob) -> List[str]:
+    events, tasks = job
+    return [event.location for event in events] + [task.location for task in tasks]
+
+
+def solve_batch(
+    jobs: Sequence[BatchJob],
+    strategy: str = "greedy",
+    top_k: Optional[int] = None,
+) -> Iterator[BatchResult]:
+    """
+    Solve every (events, tasks) job and yield a ``BatchResult`` per job as
+    soon as its worker finishes. ``BatchResult.index`` is the job's position.
+    """
+    if strategy not in GAP_STRATEGIES:
+        raise ValueError(f"Unknown strategy: {strategy}")
+
+    union = [location for job in jobs for location in _locations(job)]
+    matrix = build_travel_matrix(union, shared_travel_cache)
+
+    executor = _get_executor()
+    futures = {}
+    for index, (events, tasks) in enumerate(jobs):
+        shipped_events = [Event(e.name, e.start, e.end, e.location) for e in events]
+        shipped_tasks = [Task(t.name, t.duration, t.location, deadline=t.deadline) for t in tasks]
+        travel: Dict = build_travel_matrix(_locations((events, tasks)), matrix)
+        future = executor.submit(
+            _solve, strategy, shipped_events, shipped_tasks, travel, None, top_k
+        )
+        futures[future] = index
+
+    for future in as_completed(futures):
+        index = futures[future]
+        events, tasks = jobs[index]
+        try:
+            plan, remaining = decode_plan(future.result(), events, tasks)
+        except Exception as exc:
+            yield BatchResult(index=index, error=str(exc) or type(exc).__name__)
+            continue
+        yield BatchResult(index=index, plan=plan, remaining=remaining)
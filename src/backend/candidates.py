@@ -0,0 +1,121 @@
+"""
+Top-K candidate selection for very large todo lists.
+
+Gap strategies compare every remaining task against every gap, which gets
+expensive (and costs travel lookups) once the LMS returns hundreds of items.
+``CandidateIndex`` keeps the tasks in sorted indexes so each gap can be offered
+only the K most plausible tasks: the most urgent ones that fit, then the
+undated ones whose duration fills the gap best.
+
+Each sorted list is backed by a min-tree over the task durations (placed
+tasks hold infinity), so finding the next task that fits skips whole runs of
+too-long or already placed tasks: a query costs O(K log n) however large the
+backlog is.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+from typing import Dict, List, Tuple
+
+from .records import Task
+
+_GONE = float("inf")
+
+
+class _MinTree:
+    """Segment tree of minimum durations over one sorted task list."""
+
+    def __init__(self, durations: List[int]):
+        size = 1
+        while size < len(durations):
+            size *= 2
+        self._size = size
+        self._tree: List[float] = [_GONE] * (2 * size)
+        self._tree[size:size + len(durations)] = durations
+        for node in range(size - 1, 0, -1):
+            self._tree[node] = min(self._tree[2 * node], self._tree[2 * node + 1])
+
+    def remove(self, position: int) -> None:
+        node = position + self._size
+        self._tree[node] = _GONE
+        node //= 2
+        while node:
+            self._tree[node] = min(self._tree[2 * node], self._tree[2 * node + 1])
+            node //= 2
+
+    def first_at_most(self, start: int, limit: int) -> int:
+        """First position >= ``start`` holding a duration <= ``limit`` (-1 if none)."""
+        return self._first(1, 0, self._size, start, limit)
+
+    def last_at_most(self, end: int, limit: int) -> int:
+        """Last position < ``end`` holding a duration <= ``limit`` (-1 if none)."""
+        return self._last(1, 0, self._size, end, limit)
+
+    def _first(self, node: int, low: int, high: int, start: int, limit: int) -> int:
+        if high <= start or self._tree[node] > limit:
+            return -1
+        if high - low == 1:
+            return low
+        middle = (low + high) // 2
+        found = self._first(2 * node, low, middle, start, limit)
+        return found if found >= 0 else self._first(2 * node + 1, middle, high, start, limit)
+
+    def _last(self, node: int, low: int, high: int, end: int, limit: int) -> int:
+        if low >= end or self._tree[node] > limit:
+            return -1
+        if high - low == 1:
+            return low
+        middle = (low + high) // 2
+        found = self._last(2 * node + 1, middle, high, end, limit)
+        return found if found >= 0 else self._last(2 * node, low, middle, end, limit)
+
+
+class CandidateIndex:
+    """Sorted views over a task list with indexed removal."""
+
+    def __init__(self, tasks: List[Task]):
+        self._by_deadline = sorted(
+            (task for task in tasks if task.deadline is not None),
+            key=lambda task: (task.deadline, -task.duration),
+        )
+        self._undated = sorted(
+            (task for task in tasks if task.deadline is None),
+            key=lambda task: task.duration,
+        )
+        self._undated_durations = [task.duration for task in self._undated]
+        self._dated_tree = _MinTree([task.duration for task in self._by_deadline])
+        self._undated_tree = _MinTree(self._undated_durations)
+        self._positions: Dict[int, Tuple[_MinTree, int]] = {}
+        for tree, ordered in (
+            (self._dated_tree, self._by_deadline),
+            (self._undated_tree, self._undated),
+        ):
+            for position, task in enumerate(ordered):
+                self._positions[id(task)] = (tree, position)
+
+    def discard(self, task: Task) -> None:
+        """Mark ``task`` as placed so it is never offered again."""
+        entry = self._positions.pop(id(task), None)
+        if entry is not None:
+            tree, position = entry
+            tree.remove(position)
+
+    def top(self, minutes: int, k: int) -> List[Task]:
+        """
+        Up to ``k`` tasks no longer than ``minutes``: dated tasks by earliest
+        deadline first, then undated tasks from the longest that still fits.
+        """
+        picked: List[Task] = []
+        position = self._dated_tree.first_at_most(0, minutes)
+        while position >= 0 and len(picked) < k:
+            picked.append(self._by_deadline[position])
+            position = self._dated_tree.first_at_most(position + 1, minutes)
+
+        position = bisect_right(self._undated_durations, minutes)
+        while len(picked) < k:
+            position = self._undated_tree.last_at_most(position, minutes)
+            if position < 0:
+                break
+            picked.append(self._undated[position])
+        return picked
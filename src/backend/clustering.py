@@ -0,0 +1,180 @@
+"""
+Location-clustered decomposition of the task set.
+
+Task locations are grouped by area with k-medoids over a haversine distance
+matrix, and each gap is only offered the clusters whose medoid lies near one
+of its endpoints. Routing then happens inside a cluster, so the gap packers
+see smaller candidate sets and far fewer distinct travel pairs are fetched.
+Tasks whose location cannot be resolved stay available to every gap.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .config import Config
+from .location_utils import coordinates_for
+from .records import Event, Placement, Task
+from .scheduler import GAP_STRATEGIES, _check_deadline, solve_gap
+
+Point = Tuple[float, float]
+
+EARTH_RADIUS_KM = 6371.0
+MAX_ITERATIONS = 20
+
+
+def haversine_km(a: Point, b: Point) -> float:
+    """Great-circle distance between two (lat, lng) points in kilometres."""
+    lat1, lng1 = map(math.radians, a)
+    lat2, lng2 = map(math.radians, b)
+    h = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(h))
+
+
+def _point(location: Optional[str]) -> Optional[Point]:
+    coords = coordinates_for(location)
+    return (coords["lat"], coords["lng"]) if coords else None
+
+
+def k_medoids(distances: Sequence[Sequence[float]], k: int) -> Tuple[List[int], List[int]]:
+    """
+    Cluster points given their pairwise distance matrix.
+
+    Medoids start from a farthest-first sweep (deterministic, starting at
+    point 0) and are refined by alternating assignment and per-cluster medoid
+    updates until nothing changes. Returns (medoid indices, label per point).
+    """
+    n = len(distances)
+    k = max(1, min(k, n))
+
+    medoids = [0]
+    while len(medoids) < k:
+        medoids.append(max(range(n), key=lambda i: min(distances[i][m] for m in medoids)))
+
+    labels: List[int] = []
+    for _ in range(MAX_ITERATIONS):
+        labels = [min(range(k), key=lambda c: distances[i][medoids[c]]) for i in range(n)]
+        updated = []
+        for c in range(k):
+            members = [i for i in range(n) if labels[i] == c] or [medoids[c]]
+            updated.append(min(members, key=lambda m: sum(distances[m][j] for j in members)))
+        if updated == medoids:
+            break
+        medoids = updated
+    return medoids, labels
+
+
+@dataclass
+class TaskClusters:
+    medoids: List[Point]
+    members: List[List[Task]]
+    unlocated: List[Task]
+
+
+def cluster_tasks(tasks: List[Task], k: Optional[int] = None) -> TaskClusters:
+    """
+    Group tasks by area. Clustering runs over distinct locations, not tasks,
+    so ten assignments at the same library cost one point. ``k`` defaults to
+    ``Config.CLUSTER_COUNT`` or, when that is 0, to sqrt(locations / 2).
+    """
+    points: Dict[str, Point] = {}
+    unlocated: List[Task] = []
+    for task in tasks:
+        if task.location not in points:
+            points[task.location] = _point(task.location)
+        if points[task.location] is None:
+            unlocated.append(task)
+    points = {name: point for name, point in points.items() if point is not None}
+    if not points:
+        return TaskClusters([], [], unlocated)
+
+    names = list(points)
+    coords = [points[name] for name in names]
+    distances = [[haversine_km(a, b) for b in coords] for a in coords]
+    if not k:
+        k = Config.CLUSTER_COUNT or max(1, round(math.sqrt(len(names) / 2)))
+    medoids, labels = k_medoids(distances, k)
+
+    label_of = dict(zip(names, labels))
+    members: List[List[Task]] = [[] for _ in medoids]
+    for task in tasks:
+        if task.location in label_of:
+            members[label_of[task.location]].append(task)
+    return TaskClusters([coords[m] for m in medoids], members, unlocated)
+
+
+def clusters_near(
+    clusters: TaskClusters, *endpoints: Optional[str], radius_km: Optional[float] = None
+) -> List[int]:
+    """
+    Clusters whose medoid is within ``radius_km`` of an endpoint, always
+    including the nearest cluster to each endpoint. If an endpoint cannot be
+    located every cluster is returned.
+    """
+    if not clusters.medoids:
+        return []
+    if radius_km is None:
+        radius_km = Config.CLUSTER_RADIUS_KM
+    chosen = set()
+    for endpoint in endpoints:
+        point = _point(endpoint)
+        if point is None:
+            return list(range(len(clusters.medoids)))
+        distances = [haversine_km(point, medoid) for medoid in clusters.medoids]
+        chosen.add(min(range(len(distances)), key=distances.__getitem__))
+        chosen.update(c for c, distance in enumerate(distances) if distance <= radius_km)
+    return sorted(chosen)
+
+
+def solve_clustered(
+    events: List[Event],
+    tasks: List[Task],
+    strategy: str = "greedy",
+    travel_cache: Optional[Dict[Tuple[str, str, bool], int]] = None,
+    deadline: Optional[float] = None,
+    k: Optional[int] = None,
+) -> Tuple[List[Event | Placement], List[Task], int]:
+    """
+    Like ``solve_schedule``, but each gap only considers the tasks in the
+    clusters near its endpoints (plus unlocated tasks). Returns the plan, the
+    unplaced tasks and the number of clusters used.
+    """
+    if strategy not in GAP_STRATEGIES:
+        raise ValueError(f"Unknown strategy: {strategy}")
+    if travel_cache is None:
+        travel_cache = {}
+
+    clusters = cluster_tasks(tasks, k)
+    placed: set[int] = set()
+
+    plan: List[Event | Placement] = []
+    sorted_events = sorted(events, key=lambda event: event.sort_key)
+    for i, current_item in enumerate(sorted_events):
+        plan.append(current_item)
+        if i >= len(sorted_events) - 1:
+            continue
+        next_item = sorted_events[i + 1]
+        if current_item.end is None or next_item.start is None:
+            continue
+
+        _check_deadline(deadline)
+        candidates = [
+            task
+            for c in clusters_near(clusters, current_item.location, next_item.location)
+            for task in clusters.members[c]
+            if id(task) not in placed
+        ] + [task for task in clusters.unlocated if id(task) not in placed]
+
+        placements = solve_gap(
+            strategy, current_item, next_item, candidates, travel_cache, deadline
+        )
+        placed.update(id(placement.task) for placement in placements)
+        plan.extend(placements)
+
+    remaining = [task for task in tasks if id(task) not in placed]
+    return plan, remaining, len(clusters.medoids)
@@ -0,0 +1,138 @@
+"""
+Common free time across several users' schedules.
+
+Every member's events become busy intervals in horizon minutes, widened by
+the travel time between the event's location and the meeting point (you
+cannot be at the meeting until you have got there from class, and you must
+leave in time for the next one). A single sweep over all interval endpoints
+then yields the segments where at most ``max_absent`` members are busy,
+clipped to the allowed hours of each day and ranked.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .records import MINUTES_PER_DAY, Event
+from .scheduler import _get_travel_minutes_cached
+from .travel_cache import shared_travel_cache
+
+
+@dataclass
+class CommonWindow:
+    start: int
+    end: int
+    available: List[str]
+    absent: List[str]
+
+    @property
+    def minutes(self) -> int:
+        return self.end - self.start
+
+
+def _travel(
+    start: Optional[str],
+    end: Optional[str],
+    travel_cache: Dict[Tuple[str, str, bool], int],
+) -> int:
+    if not start or not end or start == end:
+        return 0
+    return _get_travel_minutes_cached(start, end, travel_cache)
+
+
+def busy_intervals(
+    events: List[Event],
+    meeting_point: Optional[str],
+    travel_cache: Dict[Tuple[str, str, bool], int],
+) -> Iterator[Tuple[int, int]]:
+    """Each timed event as (start, end), widened by travel to and from ``meeting_point``."""
+    for event in events:
+        if event.start is None or event.end is None:
+            continue
+        yield (
+            event.start - _travel(meeting_point, event.location, travel_cache),
+            event.end + _travel(event.location, meeting_point, travel_cache),
+        )
+
+
+def _clip_to_days(start: int, end: int, day_start: int, day_end: int) -> Iterator[Tuple[int, int]]:
+    for day in range(start // MINUTES_PER_DAY, (end - 1) // MINUTES_PER_DAY + 1):
+        offset = day * MINUTES_PER_DAY
+        clipped_start = max(start, offset + day_start)
+        clipped_end = min(end, offset + day_end)
+        if clipped_start < clipped_end:
+            yield clipped_start, clipped_end
+
+
+def find_common_windows(
+    schedules: Dict[str, List[Event]],
+    days: int,
+    day_start: int = 8 * 60,
+    day_end: int = 22 * 60,
+    min_minutes: int = 30,
+    max_absent: int = 0,
+    meeting_point: Optional[str] = None,
+    travel_cache: Optional[Dict[Tuple[str, str, bool], int]] = None,
+    limit: Optional[int] = 10,
+) -> List[CommonWindow]:
+    """
+    Windows of at least ``min_minutes`` within ``day_start``..``day_end`` of
+    each of ``days`` days where no more than ``max_absent`` users are busy.
+
+    Ranked by fewest absentees, then longest window, then earliest start.
+    """
+    if travel_cache is None:
+        travel_cache = shared_travel_cache
+    users = list(schedules)
+
+    deltas: Dict[int, List[Tuple[str, int]]] = defaultdict(list)
+    for user, events in schedules.items():
+        for start, end in busy_intervals(events, meeting_point, travel_cache):
+            if start < end:
+                deltas[start].append((user, 1))
+                deltas[end].append((user, -1))
+
+    horizon_end = days * MINUTES_PER_DAY
+    busy_count: Dict[str, int] = defaultdict(int)
+    busy: set[str] = set()
+    segments: List[Tuple[int, int, frozenset]] = []
+    cursor = 0
+
+    def close_segment(until: int) -> None:
+        nonlocal cursor
+        until = min(max(until, 0), horizon_end)
+        if until <= cursor:
+            return
+        if len(busy) <= max_absent:
+            absent = frozenset(busy)
+            if segments and segments[-1][1] == cursor and segments[-1][2] == absent:
+                segments[-1] = (segments[-1][0], until, absent)
+            else:
+                segments.append((cursor, until, absent))
+        cursor = until
+
+    for moment in sorted(deltas):
+        close_segment(moment)
+        for user, change in deltas[moment]:
+            busy_count[user] += change
+            if busy_count[user]:
+                busy.add(user)
+            else:
+                busy.discard(user)
+    close_segment(horizon_end)
+
+    windows = [
+        CommonWindow(
+            start=start,
+            end=end,
+            available=[user for user in users if user not in absent],
+            absent=[user for user in users if user in absent],
+        )
+        for segment_start, segment_end, absent in segments
+        for start, end in _clip_to_days(segment_start, segment_end, day_start, day_end)
+        if end - start >= min_minutes
+    ]
+    windows.sort(key=lambda window: (len(window.absent), -window.minutes, window.start))
+    return windows[:limit] if limit else windows
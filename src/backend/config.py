@@ -21,6 +21,83 @@ class Config:
     # Travel time buffer (in minutes) - adds safety margin to travel time estimates
     TRAVEL_TIME_BUFFER = int(os.getenv('TRAVEL_TIME_BUFFER', 15))
     
+    # Portfolio solver - worker processes and default per-request deadline
+    PORTFOLIO_WORKERS = int(os.getenv('PORTFOLIO_WORKERS', os.cpu_count() or 2))
+    PORTFOLIO_DEADLINE_MS = int(os.getenv('PORTFOLIO_DEADLINE_MS', 2000))
+    
+    # Shared travel-time cache size (entries) kept warm across requests
+    TRAVEL_CACHE_SIZE = int(os.getenv('TRAVEL_CACHE_SIZE', 20000))
+    
+    # Geocoded addresses kept in memory (least recently used dropped first)
+    GEOCODE_CACHE_SIZE = int(os.getenv('GEOCODE_CACHE_SIZE', 5000))
+    
+    # Seconds a failed Directions lookup is answered from memory before retrying
+    TRAVEL_FAILURE_TTL = float(os.getenv('TRAVEL_FAILURE_TTL', 60))
+    
+    # Candidate prefilter - each gap only sees this many tasks (0 disables)
+    CANDIDATE_TOP_K = int(os.getenv('CANDIDATE_TOP_K', 40))
+    
+    # Location clustering - 0 picks the cluster count from the number of places
+    CLUSTER_COUNT = int(os.getenv('CLUSTER_COUNT', 0))
+    CLUSTER_RADIUS_KM = float(os.getenv('CLUSTER_RADIUS_KM', 3.0))
+    
+    # Structured event logging - OFF by default in the server; CLI uses INFO
+    LOG_LEVEL = os.getenv('LOG_LEVEL')
+    LOG_FORMAT = os.getenv('LOG_FORMAT', 'json')
+    
+    # Solved-gap memo shared across requests (0 disables)
+    GAP_MEMO_SIZE = int(os.getenv('GAP_MEMO_SIZE', 5000))
+    
+    # Whole-request result cache for /api/optimize and /api/sample
+    RESULT_CACHE_SIZE = int(os.getenv('RESULT_CACHE_SIZE', 256))
+    RESULT_CACHE_TTL = float(os.getenv('RESULT_CACHE_TTL', 300))
+    
+    # Robustness analysis - Monte Carlo samples and log-normal spread of
+    # task durations / travel times; plans scoring below the ratio of the
+    # best portfolio plan are not considered when picking the safest one
+    ROBUST_SAMPLES = int(os.getenv('ROBUST_SAMPLES', 2000))
+    ROBUST_DURATION_SIGMA = float(os.getenv('ROBUST_DURATION_SIGMA', 0.25))
+    ROBUST_TRAVEL_SIGMA = float(os.getenv('ROBUST_TRAVEL_SIGMA', 0.2))
+    ROBUST_MIN_SCORE_RATIO = float(os.getenv('ROBUST_MIN_SCORE_RATIO', 0.9))
+    
+    # External call planning - per-request budget for Geocoding + Directions
+    # calls and their latency, the assumed cost of each call, and the
+    # straight-line model used when travel times are only estimated
+    EXTERNAL_CALL_BUDGET = int(os.getenv('EXTERNAL_CALL_BUDGET', 300))
+    EXTERNAL_LATENCY_BUDGET_MS = int(os.getenv('EXTERNAL_LATENCY_BUDGET_MS', 30000))
+    GEOCODE_CALL_MS = int(os.getenv('GEOCODE_CALL_MS', 150))
+    DIRECTIONS_CALL_MS = int(os.getenv('DIRECTIONS_CALL_MS', 300))
+    ESTIMATE_SPEED_KMH = float(os.getenv('ESTIMATE_SPEED_KMH', 25))
+    ESTIMATE_DETOUR_FACTOR = float(os.getenv('ESTIMATE_DETOUR_FACTOR', 1.3))
+    
+    # Background optimize jobs - concurrent jobs, jobs allowed to wait,
+    # seconds finished jobs are kept, and the longest long-poll allowed
+    JOB_WORKERS = int(os.getenv('JOB_WORKERS', 4))
+    JOB_QUEUE_LIMIT = int(os.getenv('JOB_QUEUE_LIMIT', 32))
+    JOB_RETENTION = float(os.getenv('JOB_RETENTION', 600))
+    JOB_MAX_WAIT = float(os.getenv('JOB_MAX_WAIT', 30))
+    
+    # Schedule storage - SQLite file shared by every worker process
+    SCHEDULE_DB_PATH = os.getenv('SCHEDULE_DB_PATH', 'data/schedule.db')
+    # Versions of deletions remembered for ?since= delta sync
+    SCHEDULE_TOMBSTONE_KEEP = int(os.getenv('SCHEDULE_TOMBSTONE_KEEP', 10000))
+    
+    # LMS crawl + sample plan cache - served as is while fresh, served stale
+    # (with a background refresh) up to the second limit
+    SAMPLE_FRESH_SECONDS = float(os.getenv('SAMPLE_FRESH_SECONDS', 300))
+    SAMPLE_MAX_STALE_SECONDS = float(os.getenv('SAMPLE_MAX_STALE_SECONDS', 86400))
+
+    # Response compression - gzip bodies of at least this many bytes when the
+    # client accepts it, at this zlib level (1 fastest .. 9 smallest)
+    GZIP_MINIMUM_SIZE = int(os.getenv('GZIP_MINIMUM_SIZE', 1024))
+    GZIP_LEVEL = int(os.getenv('GZIP_LEVEL', 5))
+
+    # Metrics - each worker writes its samples to this directory (shared by
+    # every uvicorn worker) every few seconds and /metrics sums them; empty
+    # keeps them in the answering process only
+    METRICS_DIR = os.getenv('METRICS_DIR', 'data/metrics')
+    METRICS_FLUSH_SECONDS = float(os.getenv('METRICS_FLUSH_SECONDS', 5))
+    
     # Location aliases - Map common names to full addresses
     LOCATION_ALIASES = {
         "학교": "분당구 불정로 6",
@@ -0,0 +1,196 @@
+"""
+Cost-based planning of external API calls.
+
+Before a request is optimized, ``plan_external_calls`` looks at its
+locations and at what the geocode and travel caches already hold, estimates
+how many Geocoding/Directions calls (and how much latency) solving it would
+take, and picks how travel times are obtained within the request's budget:
+
+``prefetch``  build the full travel matrix up front (every call is known).
+``lazy``      let the solver look pairs up as it needs them; the expected
+              count fits the budget, and ``PlannedTravel`` stops calling the
+              API once the budget is spent.
+``estimate``  no Directions calls at all: cached minutes where present,
+              straight-line estimates from coordinates elsewhere.
+``reject``    even geocoding the locations would blow the budget.
+"""
+
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from .clustering import haversine_km
+from .config import Config
+from .geocoding import needs_geocoding
+from .location_utils import coordinates_for
+from .records import Event, Task
+
+TravelKey = Tuple[str, str, bool]
+
+PREFETCH = "prefetch"
+LAZY = "lazy"
+ESTIMATE = "estimate"
+REJECT = "reject"
+
+
+@dataclass
+class CostPlan:
+    strategy: str
+    locations: int
+    geocode_calls: int
+    directions_worst: int
+    directions_expected: int
+    latency_ms_worst: int
+    latency_ms_expected: int
+    budget: int
+
+    @property
+    def calls_worst(self) -> int:
+        return self.geocode_calls + self.directions_worst
+
+    @property
+    def calls_expected(self) -> int:
+        return self.geocode_calls + self.directions_expected
+
+    @property
+    def directions_allowance(self) -> Optional[int]:
+        """Directions calls the solver may still make (None: no limit needed)."""
+        if self.strategy == PREFETCH:
+            return None
+        if self.strategy == LAZY:
+            return max(0, self.budget - self.geocode_calls)
+        return 0
+
+    def as_dict(self) -> Dict:
+        return dict(asdict(self), calls_worst=self.calls_worst, calls_expected=self.calls_expected)
+
+
+def _latency_ms(geocode_calls: int, directions_calls: int) -> int:
+    return geocode_calls * Config.GEOCODE_CALL_MS + directions_calls * Config.DIRECTIONS_CALL_MS
+
+
+def _touched_pairs(events: List[Event], tasks: List[Task], top_k: Optional[int]) -> int:
+    """Rough count of location pairs the solver looks at across all gaps."""
+    offered = min(top_k or len(tasks), len(tasks))
+    task_locations = min(offered, len({task.location for task in tasks if task.location}))
+    gaps = max(0, len(events) - 1)
+    return gaps * (task_locations + 2) ** 2
+
+
+def plan_external_calls(
+    events: List[Event],
+    tasks: List[Task],
+    travel_cache,
+    solver: str = "greedy",
+    top_k: Optional[int] = None,
+    budget: Optional[int] = None,
+) -> CostPlan:
+    """
+    Estimate the external calls needed to solve ``events``/``tasks`` against
+    ``travel_cache`` and choose the cheapest way to stay within ``budget``
+    calls (default ``EXTERNAL_CALL_BUDGET``) and ``EXTERNAL_LATENCY_BUDGET_MS``.
+    Nothing is looked up here; only cache membership is checked.
+    """
+    if budget is None:
+        budget = Config.EXTERNAL_CALL_BUDGET
+    locations = [loc for loc in dict.fromkeys(
+        [event.location for event in events] + [task.location for task in tasks]
+    ) if loc]
+
+    geocode_calls = len({Config.resolve_location(loc) for loc in locations if needs_geocoding(loc)})
+    missing = sum(
+        (start, end, True) not in travel_cache
+        for start in locations for end in locations if start != end
+    )
+    pairs = len(locations) * (len(locations) - 1)
+    touched = min(1.0, _touched_pairs(events, tasks, top_k) / pairs) if pairs else 0.0
+    expected = round(missing * touched)
+
+    def fits(directions_calls: int) -> bool:
+        return (
+            geocode_calls + directions_calls <= budget
+            and _latency_ms(geocode_calls, directions_calls) <= Config.EXTERNAL_LATENCY_BUDGET_MS
+        )
+
+    if fits(missing):
+        strategy = PREFETCH
+    elif solver != "portfolio" and fits(expected):
+        # The portfolio ships a complete matrix to its workers, so it can't go lazy.
+        strategy = LAZY
+    elif fits(0):
+        strategy = ESTIMATE
+    else:
+        strategy = REJECT
+
+    return CostPlan(
+        strategy=strategy,
+        locations=len(locations),
+        geocode_calls=geocode_calls,
+        directions_worst=missing,
+        directions_expected=expected,
+        latency_ms_worst=_latency_ms(geocode_calls, missing),
+        latency_ms_expected=_latency_ms(geocode_calls, expected),
+        budget=budget,
+    )
+
+
+def estimate_minutes(start: str, end: str, include_buffer: bool = True) -> int:
+    """Straight-line travel estimate (detour factor, average speed) plus buffer."""
+    if start == end:
+        return 0
+    a, b = coordinates_for(start), coordinates_for(end)
+    minutes = 0
+    if a and b:
+        km = haversine_km((a["lat"], a["lng"]), (b["lat"], b["lng"]))
+        km *= Config.ESTIMATE_DETOUR_FACTOR
+        minutes = round(km / Config.ESTIMATE_SPEED_KMH * 60)
+    return minutes + (Config.TRAVEL_TIME_BUFFER if include_buffer else 0)
+
+
+class PlannedTravel:
+    """
+    Travel mapping that spends at most ``allowance`` Directions calls.
+
+    Cached minutes are always used. While calls remain, misses are fetched
+    through ``cache.get_or_fetch`` (and written through to it); afterwards
+    misses are answered with ``estimate_minutes``, which are never stored. It
+    deliberately has no ``version``, so gaps solved on estimates are not
+    memoized.
+    """
+
+    def __init__(self, cache, allowance: int):
+        self.cache = cache
+        self.allowance = allowance
+        self.calls = 0
+        self.estimated = 0
+
+    def __contains__(self, key: TravelKey) -> bool:
+        return key in self.cache or self.calls >= self.allowance
+
+    def __getitem__(self, key: TravelKey) -> int:
+        minutes = self.cache.get(key)
+        if minutes is not None:
+            return minutes
+        self.estimated += 1
+        return estimate_minutes(*key)
+
+    def get_or_fetch(
+        self, key: TravelKey, fetch: Callable[[TravelKey], Optional[int]]
+    ) -> Optional[int]:
+        """Look ``key`` up through ``cache`` while calls remain, else estimate it."""
+        if self.calls >= self.allowance:
+            return self[key]
+
+        def counted(key: TravelKey) -> Optional[int]:
+            self.calls += 1
+            return fetch(key)
+
+        return self.cache.get_or_fetch(key, counted)
+
+    def __setitem__(self, key: TravelKey, minutes: int) -> None:
+        self.calls += 1
+        self.cache[key] = minutes
+
+    def __iter__(self) -> Iterator[TravelKey]:
+        return iter(self.cache)
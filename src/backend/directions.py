@@ -3,15 +3,22 @@ Directions module for calculating travel time between locations
 Uses Naver Maps Directions 5 API
 """
 
+import logging
+
 import requests
 
 from .config import Config
 from .geocoding import get_location_coords
+from .logs import get_logger, log_event
+from .metrics import EXTERNAL_LATENCY, NAVER_ERRORS, shared_metrics
+
+logger = get_logger("directions")
 
 
 def get_travel_time(start_coords, end_coords, include_buffer=True):
     """
     Calculate travel time using Naver Maps API (aligned with valid curl request).
+    Returns None when the call fails, so callers can tell failure from 0 minutes.
     """
     # UPDATED: Domain changed from 'naveropenapi' to 'maps' to match your curl command
     url = "https://maps.apigw.ntruss.com/map-direction/v1/driving"
@@ -28,15 +35,20 @@ def get_travel_time(start_coords, end_coords, include_buffer=True):
     }
     
     try:
-        response = requests.get(url, headers=headers, params=params)
+        with shared_metrics.timer(EXTERNAL_LATENCY, call="directions"):
+            response = requests.get(url, headers=headers, params=params)
         
         if response.status_code == 200:
             data = response.json()
             
             # Check if the API returned code 0 (Success) inside the JSON body
             if data.get('code') != 0:
-                print(f"API Logical Error: {data.get('message')}")
-                return 0
+                shared_metrics.inc(NAVER_ERRORS, api="directions", status=f"code_{data.get('code')}")
+                log_event(
+                    logger, logging.ERROR, "directions.api_error",
+                    code=data.get('code'), message=data.get('message'),
+                )
+                return None
 
             try:
                 # Path data is usually under route -> trafast (or traoptimal) -> 0 -> summary
@@ -51,18 +63,23 @@ def get_travel_time(start_coords, end_coords, include_buffer=True):
                 return duration_min
                 
             except (KeyError, IndexError) as e:
-                print(f"Error parsing directions response structure: {e}")
-                # Debug: Print keys to see what was returned
-                print(f"Available keys: {data.get('route', {}).keys()}")
-                return 0
+                log_event(
+                    logger, logging.ERROR, "directions.bad_response",
+                    error=str(e), route_keys=list(data.get('route', {}).keys()),
+                )
+                return None
         else:
-            print(f"HTTP Error: {response.status_code}")
-            print(f"Response: {response.text}")
-            return 0
+            shared_metrics.inc(NAVER_ERRORS, api="directions", status=response.status_code)
+            log_event(
+                logger, logging.ERROR, "directions.http_error",
+                status=response.status_code, body=response.text[:500],
+            )
+            return None
             
     except requests.exceptions.RequestException as e:
-        print(f"Error making directions request: {e}")
-        return 0
+        shared_metrics.inc(NAVER_ERRORS, api="directions", status="network")
+        log_event(logger, logging.ERROR, "directions.request_failed", error=str(e))
+        return None
 
 def get_travel_time_from_addresses(start_address, end_address, include_buffer=True):
     """
@@ -74,15 +91,18 @@ def get_travel_time_from_addresses(start_address, end_address, include_buffer=Tr
         include_buffer (bool): Whether to include safety buffer time
     
     Returns:
-        int: Travel time in minutes, or 0 if geocoding fails
+        int | None: Travel time in minutes, or None if geocoding or the API call fails
     """
     # Geocode both addresses
     start_coords = get_location_coords(start_address)
     end_coords = get_location_coords(end_address)
     
     if not start_coords or not end_coords:
-        print(f"Failed to geocode addresses: {start_address} -> {end_address}")
-        return 0
+        log_event(
+            logger, logging.WARNING, "directions.geocode_failed",
+            start=start_address, end=end_address,
+        )
+        return None
     
     return get_travel_time(start_coords, end_coords, include_buffer)
 
@@ -100,7 +120,7 @@ def test_directions():
     
     for start, end in test_routes:
         travel_time = get_travel_time_from_addresses(start, end)
-        if travel_time > 0:
+        if travel_time is not None:
             print(f"✓ {start} → {end}: {travel_time}분")
         else:
             print(f"✗ {start} → {end}: Failed to calculate")
@@ -0,0 +1,150 @@
+"""
+Memoized gap subproblems shared across requests.
+
+A gap's placements depend only on its endpoints (time and location), the
+strategy, the candidate tasks and the travel minutes between them. The memo
+keys each gap on a digest of exactly that: candidates are reduced to
+(duration, location, deadline) and sorted, so the same recurring gap with the
+same kind of todos hits no matter how the request was ordered or named.
+
+Travel minutes are not part of the key. Each entry records the travel
+entries its strategy looked up, and a hit is only served while the travel
+cache still holds those same minutes. A changed or evicted entry therefore
+only invalidates the gaps that used it. Gaps solved while a lookup failed
+(and was counted as 0 minutes) are not stored.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .config import Config
+from .records import Event, Placement, Task
+
+# (candidate position in canonical order, start, end, location)
+StoredPlacement = Tuple[int, int, int, Optional[str]]
+TravelKey = Tuple[str, str, bool]
+# Placements plus the (travel key, minutes) they were solved with.
+StoredGap = Tuple[Tuple[StoredPlacement, ...], Tuple[Tuple[TravelKey, int], ...]]
+
+
+def _task_signature(task: Task) -> Tuple:
+    return (task.duration, task.location or "", -1 if task.deadline is None else task.deadline)
+
+
+def gap_digest(
+    strategy: str,
+    current: Event,
+    following: Event,
+    candidates: List[Task],
+) -> bytes:
+    """Canonical hash of one gap subproblem (candidates must already be sorted)."""
+    canonical = (
+        strategy,
+        current.end,
+        current.location,
+        following.start,
+        following.location,
+        tuple(_task_signature(task) for task in candidates),
+    )
+    return hashlib.blake2b(repr(canonical).encode(), digest_size=16).digest()
+
+
+class _RecordingTravel:
+    """Travel mapping that remembers the minutes every lookup returned."""
+
+    def __init__(self, travel):
+        self.travel = travel
+        self.seen: Dict[TravelKey, Optional[int]] = {}
+
+    def get_or_fetch(
+        self, key: TravelKey, fetch: Callable[[TravelKey], Optional[int]]
+    ) -> Optional[int]:
+        minutes = self.travel.get_or_fetch(key, fetch)
+        # A key that answered differently within one solve can't be validated.
+        self.seen[key] = minutes if self.seen.get(key, minutes) == minutes else None
+        return minutes
+
+
+class GapMemo:
+    """Bounded LRU of solved gaps with hit/miss counters."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[bytes, StoredGap]" = OrderedDict()
+        self._lock = Lock()
+
+    def solve(
+        self,
+        strategy: str,
+        current: Event,
+        following: Event,
+        candidates: List[Task],
+        travel,
+        pick_tasks: Callable[[List[Task], object], List[Placement]],
+    ) -> List[Placement]:
+        """
+        Return the stored placements for this gap, or solve it with
+        ``pick_tasks(pool, travel)`` (called on a copy, so ``candidates`` is
+        never mutated) and remember the result. ``travel`` is the shared
+        travel cache; hits are checked against its current minutes.
+        """
+        order = sorted(range(len(candidates)), key=lambda i: _task_signature(candidates[i]))
+        key = gap_digest(strategy, current, following, [candidates[i] for i in order])
+
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and all(travel.get(dep) == minutes for dep, minutes in entry[1]):
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                self.hits += 1
+            return [
+                Placement(candidates[order[position]], start, end, location)
+                for position, start, end, location in entry[0]
+            ]
+        with self._lock:
+            self.misses += 1
+
+        recording = _RecordingTravel(travel)
+        placements = pick_tasks(list(candidates), recording)
+        if None in recording.seen.values():
+            return placements
+        rank = {id(candidates[i]): position for position, i in enumerate(order)}
+        stored = tuple(
+            (rank[id(placement.task)], placement.start, placement.end, placement.location)
+            for placement in placements
+        )
+        with self._lock:
+            self._entries[key] = (stored, tuple(recording.seen.items()))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return placements
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+
+shared_gap_memo = GapMemo(Config.GAP_MEMO_SIZE)
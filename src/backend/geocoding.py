@@ -3,9 +3,62 @@ Geocoding module for converting addresses to coordinates
 Uses Naver Maps Geocoding API
 """
 
+import logging
+import re
+from collections import OrderedDict
+from threading import Lock
+
 import requests
 
 from .config import Config
+from .logs import get_logger, log_event
+from .metrics import (
+    CACHE_EVICTIONS,
+    CACHE_HITS,
+    CACHE_MISSES,
+    EXTERNAL_LATENCY,
+    NAVER_ERRORS,
+    shared_metrics,
+)
+
+logger = get_logger("geocoding")
+
+# "longitude,latitude" literals (e.g. a phone's current position) need no lookup
+COORDINATE_PATTERN = re.compile(r"^\s*-?\d+(\.\d+)?\s*,\s*-?\d+(\.\d+)?\s*$")
+
+# Successful lookups are kept (addresses don't move), up to GEOCODE_CACHE_SIZE
+# addresses; the least recently used ones are dropped first.
+_geocode_cache = OrderedDict()
+_geocode_lock = Lock()
+
+
+def format_coordinates(lat, lng):
+    """Build the "longitude,latitude" string used as a location for a raw position."""
+    return f"{lng},{lat}"
+
+
+def _cached_coords(address):
+    with _geocode_lock:
+        coords = _geocode_cache.get(address)
+        if coords is not None:
+            _geocode_cache.move_to_end(address)
+        return coords
+
+
+def _remember_coords(address, coords):
+    with _geocode_lock:
+        _geocode_cache[address] = coords
+        _geocode_cache.move_to_end(address)
+        while len(_geocode_cache) > Config.GEOCODE_CACHE_SIZE:
+            _geocode_cache.popitem(last=False)
+            shared_metrics.inc(CACHE_EVICTIONS, cache="geocode")
+    return coords
+
+
+def needs_geocoding(address):
+    """Whether resolving ``address`` would call the Geocoding API right now."""
+    address = Config.resolve_location(address)
+    return bool(address) and not COORDINATE_PATTERN.match(address) and address not in _geocode_cache
 
 
 def get_location_coords(address):
@@ -14,6 +67,7 @@ def get_location_coords(address):
     
     Args:
         address (str): Address to geocode (e.g., "분당구 불정로 6" or "강남역")
+            or an already resolved "longitude,latitude" string
     
     Returns:
         str: Coordinates in "longitude,latitude" format, or None if not found
@@ -22,8 +76,17 @@ def get_location_coords(address):
     address = Config.resolve_location(address)
     
     if not address:
-        print(f"Error: Empty address provided")
+        log_event(logger, logging.WARNING, "geocode.empty_address")
         return None
+
+    if COORDINATE_PATTERN.match(address):
+        return address.replace(" ", "")
+
+    coords = _cached_coords(address)
+    if coords is not None:
+        shared_metrics.inc(CACHE_HITS, cache="geocode")
+        return coords
+    shared_metrics.inc(CACHE_MISSES, cache="geocode")
     
     url = f"https://maps.apigw.ntruss.com/map-geocode/v2/geocode"
     headers = {
@@ -33,11 +96,10 @@ def get_location_coords(address):
     params = {
         "query": address
     }
-
-    print(headers)
     
     try:
-        response = requests.get(url, headers=headers, params=params)
+        with shared_metrics.timer(EXTERNAL_LATENCY, call="geocode"):
+            response = requests.get(url, headers=headers, params=params)
         
         if response.status_code == 200:
             data = response.json()
@@ -46,21 +108,28 @@ def get_location_coords(address):
                 # x: 경도(longitude), y: 위도(latitude)
                 x = data['addresses'][0]['x']
                 y = data['addresses'][0]['y']
-                return f"{x},{y}"
+                return _remember_coords(address, f"{x},{y}")
             else:
-                print(f"Warning: No results found for address: {address}")
+                log_event(logger, logging.WARNING, "geocode.no_results", address=address)
                 return None
         else:
-            print(f'URL: {url}')
-            print(f"Error: API returned status code {response.status_code}")
-            print(f"Response: {response.text}")
+            shared_metrics.inc(NAVER_ERRORS, api="geocode", status=response.status_code)
+            log_event(
+                logger,
+                logging.ERROR,
+                "geocode.http_error",
+                address=address,
+                status=response.status_code,
+                body=response.text[:500],
+            )
             return None
             
     except requests.exceptions.RequestException as e:
-        print(f"Error making geocoding request: {e}")
+        shared_metrics.inc(NAVER_ERRORS, api="geocode", status="network")
+        log_event(logger, logging.ERROR, "geocode.request_failed", address=address, error=str(e))
         return None
     except (KeyError, IndexError) as e:
-        print(f"Error parsing geocoding response: {e}")
+        log_event(logger, logging.ERROR, "geocode.bad_response", address=address, error=str(e))
         return None
 
 
@@ -0,0 +1,113 @@
+"""
+Multi-day horizon planner.
+
+Events and deadlines are expressed in minutes since the start of the horizon
+(midnight of its first day), so a week is just a longer integer timeline.
+Tasks wait in one queue ordered by deadline (earliest deadline first), with
+ties broken by the least slack, and every gap of every day draws from it. A
+min-tree over the queued durations lets each gap jump to the next task short
+enough to fit and stop once none is left, so travel minutes are only looked
+up for the pairs those candidates need.
+"""
+
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from .candidates import _MinTree
+from .records import MINUTES_PER_DAY, Event, Placement, Task
+from .scheduler import _get_travel_minutes_cached
+from .travel_cache import shared_travel_cache
+
+DATETIME_FORMATS = ("%Y-%m-%d %H:%M", "%Y-%m-%dT%H:%M", "%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S")
+
+
+def parse_horizon_minutes(value: Optional[str], epoch: date) -> Optional[int]:
+    """Convert "YYYY-MM-DD HH:MM" to minutes since midnight of ``epoch``."""
+    if not value:
+        return None
+    for fmt in DATETIME_FORMATS:
+        try:
+            moment = datetime.strptime(value.strip(), fmt)
+        except ValueError:
+            continue
+        return (moment.date() - epoch).days * MINUTES_PER_DAY + moment.hour * 60 + moment.minute
+    return None
+
+
+def horizon_date(minutes: int, epoch: date) -> str:
+    """The calendar date ("YYYY-MM-DD") a horizon minute falls on."""
+    return (epoch + timedelta(days=minutes // MINUTES_PER_DAY)).isoformat()
+
+
+def plan_horizon(
+    events: List[Event],
+    tasks: List[Task],
+    travel_cache: Optional[Dict[Tuple[str, str, bool], int]] = None,
+) -> Tuple[List[Event | Placement], List[Task]]:
+    """
+    Fill the gaps between same-day events across the whole horizon.
+
+    Each gap walks the queue in (deadline, slack) order, skipping straight
+    past tasks longer than the time left, and places every task that still
+    reaches the next event and finishes before its own deadline; the rest
+    wait for later gaps. Returns the plan in time order and the tasks that
+    could not be placed in time.
+    """
+    if travel_cache is None:
+        travel_cache = shared_travel_cache
+    sorted_events = sorted(events, key=lambda event: event.sort_key)
+
+    def deadline_of(task: Task) -> float:
+        return task.deadline if task.deadline is not None else float("inf")
+
+    # EDF, then least slack (longer work first); ties keep the input order.
+    queue = sorted(tasks, key=lambda task: (deadline_of(task), -task.duration))
+    waiting = _MinTree([task.duration for task in queue])
+    done = [False] * len(queue)
+    left = len(queue)
+    expired = 0  # every task before this position is placed or missed
+
+    plan: List[Event | Placement] = []
+    missed: List[Task] = []
+    for i, current in enumerate(sorted_events):
+        plan.append(current)
+        if i + 1 >= len(sorted_events) or not left:
+            continue
+        following = sorted_events[i + 1]
+        if current.end is None or following.start is None:
+            continue
+        if current.end // MINUTES_PER_DAY != following.start // MINUTES_PER_DAY:
+            continue  # no overnight gaps
+
+        clock = current.end
+        location = current.location
+        position = waiting.first_at_most(0, following.start - clock)
+        while position >= 0:
+            task = queue[position]
+            task_location = task.location or location
+            travel_to_task = _get_travel_minutes_cached(location, task_location, travel_cache)
+            finish = clock + travel_to_task + task.duration
+            travel_to_next = _get_travel_minutes_cached(
+                task_location, following.location, travel_cache
+            )
+            if finish + travel_to_next <= following.start and finish <= deadline_of(task):
+                plan.append(Placement(task, clock + travel_to_task, finish, task_location))
+                clock = finish
+                location = task_location
+                waiting.remove(position)
+                done[position] = True
+                left -= 1
+            position = waiting.first_at_most(position + 1, following.start - clock)
+
+        # Tasks whose deadline is already behind us can never be placed.
+        while expired < len(queue) and deadline_of(queue[expired]) <= following.start:
+            if not done[expired]:
+                missed.append(queue[expired])
+                waiting.remove(expired)
+                done[expired] = True
+                left -= 1
+            expired += 1
+
+    return plan, missed + [task for position, task in enumerate(queue) if not done[position]]
@@ -0,0 +1,117 @@
+"""
+Incremental re-planning for the stored schedule.
+
+A gap's placements depend only on its endpoints (time and location of the
+surrounding events) and on which tasks are still unplaced. After an edit we
+therefore keep every gap whose endpoints did not change, release the tasks of
+the gaps that did, and solve only those gaps again.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from .records import Event, Placement, Task
+from .candidates import CandidateIndex
+from .scheduler import GAP_STRATEGIES, solve_gap
+from .travel_cache import shared_travel_cache
+
+GapKey = Tuple[Optional[int], Optional[str], Optional[int], Optional[str]]
+
+
+@dataclass
+class PlanSnapshot:
+    """The last plan computed for one version of the stored schedule."""
+
+    schedule_version: int
+    strategy: str
+    tasks: List[Task]
+    plan: List[Event | Placement]
+    remaining: List[Task]
+    gaps: Dict[GapKey, List[Placement]] = field(default_factory=dict)
+
+
+@dataclass
+class ReplanStats:
+    reused_gaps: int = 0
+    replanned_gaps: int = 0
+
+
+def gap_key(current: Event, following: Event) -> GapKey:
+    """Everything a gap's placements depend on besides the task pool."""
+    return (current.end, current.location, following.start, following.location)
+
+
+def plan_incrementally(
+    events: List[Event],
+    tasks: List[Task],
+    schedule_version: int,
+    strategy: str = "greedy",
+    previous: Optional[PlanSnapshot] = None,
+    top_k: Optional[int] = None,
+) -> Tuple[PlanSnapshot, ReplanStats]:
+    """
+    Plan ``events``/``tasks``, reusing the gaps of ``previous`` that are
+    unchanged. ``previous`` is ignored unless it was built from the same
+    ``tasks`` list with the same strategy.
+    """
+    if strategy not in GAP_STRATEGIES:
+        raise ValueError(f"Unknown strategy: {strategy}")
+    if previous is not None and (previous.tasks is not tasks or previous.strategy != strategy):
+        previous = None
+
+    reusable = dict(previous.gaps) if previous else {}
+    sorted_events = sorted(events, key=lambda event: event.sort_key)
+    pairs = [
+        (current, following)
+        for current, following in zip(sorted_events, sorted_events[1:])
+        if current.end is not None and following.start is not None
+    ]
+
+    # First claim the unchanged gaps so their tasks stay where they were.
+    pool = list(tasks)
+    pool_ids = {id(task) for task in pool}
+    gaps: Dict[GapKey, List[Placement]] = {}
+    stats = ReplanStats()
+    for current, following in pairs:
+        key = gap_key(current, following)
+        placements = reusable.pop(key, None)
+        if placements is None or any(id(p.task) not in pool_ids for p in placements):
+            continue
+        for placement in placements:
+            pool_ids.discard(id(placement.task))
+        gaps[key] = placements
+        stats.reused_gaps += 1
+    pool = [task for task in pool if id(task) in pool_ids]
+
+    # Then re-solve the gaps that changed, in time order, from what is left.
+    index = CandidateIndex(pool) if top_k and len(pool) > top_k else None
+    for current, following in pairs:
+        key = gap_key(current, following)
+        if key in gaps:
+            continue
+        gaps[key] = solve_gap(
+            strategy, current, following, pool, shared_travel_cache, index=index, top_k=top_k
+        )
+        stats.replanned_gaps += 1
+
+    plan: List[Event | Placement] = []
+    emitted = set()
+    for i, event in enumerate(sorted_events):
+        plan.append(event)
+        if i + 1 < len(sorted_events):
+            key = gap_key(event, sorted_events[i + 1])
+            if key not in emitted:
+                plan.extend(gaps.get(key, []))
+                emitted.add(key)
+
+    snapshot = PlanSnapshot(
+        schedule_version=schedule_version,
+        strategy=strategy,
+        tasks=tasks,
+        plan=plan,
+        remaining=pool,
+        gaps=gaps,
+    )
+    return snapshot, stats
@@ -0,0 +1,117 @@
+"""
+Background jobs for long-running optimizations.
+
+``JobQueue`` runs submitted callables on a bounded thread pool so request
+handlers can return a job id at once. Threads (not processes) are used on
+purpose: the work is mostly waiting on the Geocoding/Directions APIs and
+needs the process-wide travel, gap and result caches; CPU-heavy portfolio
+strategies already fan out to the portfolio's process pool.
+
+``max_workers`` caps how many jobs run at once and ``max_queued`` how many
+may wait behind them; beyond that ``submit`` raises ``JobQueueFull``.
+Finished jobs are kept for ``retention`` seconds so clients can fetch them.
+"""
+
+from __future__ import annotations
+
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Any, Callable, Dict, Optional
+
+from .config import Config
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class JobQueueFull(Exception):
+    """Raised when a job is submitted while the queue is at its limit."""
+
+
+@dataclass
+class Job:
+    id: str
+    future: Future = field(repr=False)
+    status: str = QUEUED
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Any = None
+    error: Optional[BaseException] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED)
+
+
+class JobQueue:
+    """Bounded pool of background jobs, looked up by id."""
+
+    def __init__(self, max_workers: int, max_queued: int, retention: float):
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self.retention = retention
+        self._jobs: Dict[str, Job] = {}
+        self._lock = Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _counts(self) -> Dict[str, int]:
+        counts = {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+        for job in self._jobs.values():
+            counts[job.status] += 1
+        return counts
+
+    def _prune(self) -> None:
+        cutoff = time.time() - self.retention
+        for job_id in [j.id for j in self._jobs.values() if j.finished and j.finished_at < cutoff]:
+            del self._jobs[job_id]
+
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Job:
+        """Queue ``fn(*args, **kwargs)``; raises ``JobQueueFull`` at the limit."""
+        with self._lock:
+            self._prune()
+            if self._counts()[QUEUED] >= self.max_queued:
+                raise JobQueueFull(f"{self.max_queued} jobs already waiting")
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="ycc-job"
+                )
+            job = Job(id=uuid.uuid4().hex, future=Future())
+            self._jobs[job.id] = job
+            job.future = self._executor.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def _run(self, job: Job, fn: Callable[..., Any], args, kwargs) -> Any:
+        job.status, job.started_at = RUNNING, time.time()
+        try:
+            job.result = fn(*args, **kwargs)
+            job.status = DONE
+        except Exception as exc:
+            job.error = exc
+            job.status = FAILED
+        finally:
+            job.finished_at = time.time()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            counts = self._counts()
+        return dict(counts, workers=self.max_workers, max_queued=self.max_queued)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+shared_job_queue = JobQueue(Config.JOB_WORKERS, Config.JOB_QUEUE_LIMIT, Config.JOB_RETENTION)
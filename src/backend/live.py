@@ -0,0 +1,73 @@
+"""
+Live re-planning from the user's current time and position.
+
+Everything that ended before "now" is frozen and returned untouched; only the
+rest of the day is solved, starting from where the user actually is. Travel
+lookups go through the shared cache, so a phone polling every few minutes
+mostly hits warm entries.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List, Optional
+
+from .records import Event, Placement, Task
+from .scheduler import solve_schedule
+from .travel_cache import shared_travel_cache
+
+CURRENT_POSITION_NAME = "📍 현재 위치"
+
+
+@dataclass
+class LivePlan:
+    frozen: List[Event]
+    plan: List[Event | Placement]
+    remaining: List[Task]
+    replanned_gaps: int
+
+
+def _is_past(event: Event, now: int) -> bool:
+    if event.end is not None:
+        return event.end <= now
+    return event.start is not None and event.start < now
+
+
+def plan_from_now(
+    events: List[Event],
+    tasks: List[Task],
+    now: int,
+    position: Optional[str] = None,
+    strategy: str = "greedy",
+    top_k: Optional[int] = None,
+) -> LivePlan:
+    """
+    Re-plan the remainder of the day from ``now`` (minutes since midnight).
+
+    If an event is in progress, its end is where the next gap starts.
+    Otherwise a virtual anchor at ``position`` (falling back to the last
+    finished event's location) opens the current gap at ``now``.
+    """
+    sorted_events = sorted(events, key=lambda event: event.sort_key)
+    frozen = [event for event in sorted_events if _is_past(event, now)]
+    upcoming = [event for event in sorted_events if not _is_past(event, now)]
+
+    in_progress = bool(upcoming) and (upcoming[0].start is None or upcoming[0].start <= now)
+    anchor: Optional[Event] = None
+    if not in_progress and upcoming:
+        location = position or (frozen[-1].location if frozen else upcoming[0].location)
+        anchor = Event(CURRENT_POSITION_NAME, None, now, location)
+
+    timeline = ([anchor] if anchor else []) + upcoming
+    plan, remaining = solve_schedule(
+        timeline, tasks, strategy=strategy, travel_cache=shared_travel_cache, top_k=top_k
+    )
+    if anchor is not None:
+        plan = [entry for entry in plan if entry is not anchor]
+
+    return LivePlan(
+        frozen=frozen,
+        plan=plan,
+        remaining=remaining,
+        replanned_gaps=max(len(timeline) - 1, 0),
+    )
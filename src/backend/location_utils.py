@@ -28,6 +28,22 @@ def _coord_dict(raw: str | None) -> Optional[Dict[str, float]]:
         return None
 
 
+def coordinates_for(location: str | None) -> Optional[Dict[str, float]]:
+    """Coordinates for a location name, geocoding (and remembering) unknown ones."""
+    if not location:
+        return None
+
+    normalized_location = location.strip()
+    coords = _coord_cache.get(normalized_location)
+    if not coords:
+        coords = KNOWN_COORDINATES.get(normalized_location)
+    if not coords:
+        coords = _coord_dict(get_location_coords(normalized_location))
+        if coords:
+            _coord_cache[normalized_location] = coords
+    return coords
+
+
 def ensure_coordinates(entries: List[Dict]) -> List[Dict]:
     """Return a new list where each item has coordinates if a location is known."""
     enriched: List[Dict] = []
@@ -38,20 +54,7 @@ def ensure_coordinates(entries: List[Dict]) -> List[Dict]:
             enriched.append(data)
             continue
 
-        location = data.get("location")
-        if not location:
-            enriched.append(data)
-            continue
-
-        normalized_location = location.strip()
-        coords = _coord_cache.get(normalized_location)
-        if not coords:
-            coords = KNOWN_COORDINATES.get(normalized_location)
-        if not coords:
-            coords = _coord_dict(get_location_coords(normalized_location))
-            if coords:
-                _coord_cache[normalized_location] = coords
-
+        coords = coordinates_for(data.get("location"))
         if coords:
             data["coordinates"] = coords
 
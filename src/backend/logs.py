@@ -0,0 +1,92 @@
+"""
+Structured, level-controlled event logging.
+
+Hot paths report machine-readable events (a name plus key/value fields)
+through ``log_event`` instead of printing. Everything lives under the ``ycc``
+logger, which is silent until ``configure_logging`` is called: the API server
+leaves it off unless ``LOG_LEVEL`` is set, the CLI turns it on at INFO with
+human-readable lines. Diagnostics that cost something to compute should be
+guarded with ``logger.isEnabledFor(level)``.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import sys
+from datetime import datetime, timezone
+from typing import IO, Any, Optional
+
+from .config import Config
+
+LOGGER_NAME = "ycc"
+OFF = "OFF"
+
+_root = logging.getLogger(LOGGER_NAME)
+_root.addHandler(logging.NullHandler())
+_root.setLevel(logging.CRITICAL + 1)
+_root.propagate = False
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: timestamp, level, logger, event and fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "event": record.getMessage(),
+        }
+        payload.update(getattr(record, "fields", {}))
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """``event key=value ...`` lines for terminals."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = " ".join(f"{key}={value}" for key, value in getattr(record, "fields", {}).items())
+        line = f"{record.levelname.lower():7} {record.getMessage()}"
+        return f"{line} {fields}" if fields else line
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger for a backend module, e.g. ``get_logger("scheduler")``."""
+    return logging.getLogger(f"{LOGGER_NAME}.{name}")
+
+
+def log_event(logger: logging.Logger, level: int, event: str, **fields: Any) -> None:
+    """Emit ``event`` with ``fields`` if ``level`` is enabled (cheap no-op otherwise)."""
+    if logger.isEnabledFor(level):
+        logger.log(level, event, extra={"fields": fields})
+
+
+def configure_logging(
+    level: Optional[str] = None,
+    json_format: Optional[bool] = None,
+    stream: Optional[IO[str]] = None,
+) -> None:
+    """
+    Route ``ycc`` events to ``stream`` (stderr by default).
+
+    ``level`` defaults to ``Config.LOG_LEVEL``; "OFF" (the default) disables
+    all events. ``json_format`` defaults to ``Config.LOG_FORMAT == "json"``.
+    """
+    level = (level or Config.LOG_LEVEL or OFF).upper()
+    if json_format is None:
+        json_format = Config.LOG_FORMAT == "json"
+
+    for handler in list(_root.handlers):
+        _root.removeHandler(handler)
+    if level == OFF:
+        _root.addHandler(logging.NullHandler())
+        _root.setLevel(logging.CRITICAL + 1)
+        return
+
+    handler = logging.StreamHandler(stream or sys.stderr)
+    handler.setFormatter(JsonFormatter() if json_format else TextFormatter())
+    _root.addHandler(handler)
+    _root.setLevel(level)
@@ -9,6 +9,7 @@ from .config import Config
 from .coursemos_crawler import CoursemosCrawler
 from .directions import get_travel_time_from_addresses
 from .geocoding import get_location_coords
+from .logs import configure_logging
 from .sample_data import get_sample_schedule, get_sample_todos
 from .scheduler import allocate_tasks, print_schedule
 
@@ -86,6 +87,7 @@ def run_manual_mode():
 
 def main():
     """Main application entry point."""
+    configure_logging(Config.LOG_LEVEL or "INFO", json_format=False)
     print_banner()
 
     # Validate configuration
@@ -167,6 +169,9 @@ def quick_test():
     start = "강남역"
     end = "한양대"
     travel_time = get_travel_time_from_addresses(start, end)
+    if travel_time is None:
+        print(f"   ❌ {start} → {end}: 계산 실패\n")
+        return
     print(f"   ✅ {start} → {end}: {travel_time}분\n")
 
     print("✅ 모든 테스트 통과!\n")
@@ -0,0 +1,319 @@
+"""
+Prometheus-style metrics, summed across worker processes.
+
+Every process records into its own ``MetricsRegistry``. Counters and
+latency histograms are kept per thread, so recording is a dict update with
+no lock; shards are only merged when a snapshot is taken. Values that
+objects already count (cache hits, queue depths) are read at snapshot time
+by collectors instead of being recorded on the hot path. Collected counters
+are kept monotonic: when the source resets (a cache's ``clear()``), the
+count it had reached is carried over.
+
+With a ``directory`` (``METRICS_DIR``), each process writes its snapshot to
+``<host>-<pid>.json`` there every ``flush_seconds``, and ``render`` sums its
+own in-memory snapshot with the other workers' files, so whichever uvicorn
+worker answers ``/metrics`` reports the whole server. A worker removes its
+file when it stops; files not rewritten for ``3 * flush_seconds`` belong to
+a worker that is gone and are deleted by the next render (Prometheus sees
+that worker's counters reset, as it would for a restart).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .config import Config
+
+COUNTER = "counter"
+GAUGE = "gauge"
+HISTOGRAM = "histogram"
+
+HTTP_LATENCY = "ycc_http_request_duration_seconds"
+EXTERNAL_LATENCY = "ycc_external_call_duration_seconds"
+PHASE_LATENCY = "ycc_scheduler_phase_duration_seconds"
+NAVER_ERRORS = "ycc_naver_errors_total"
+CACHE_HITS = "ycc_cache_hits_total"
+CACHE_MISSES = "ycc_cache_misses_total"
+CACHE_EVICTIONS = "ycc_cache_evictions_total"
+CACHE_STALE = "ycc_cache_stale_hits_total"
+CACHE_ENTRIES = "ycc_cache_entries"
+QUEUE_DEPTH = "ycc_queue_depth"
+
+METRICS = {
+    HTTP_LATENCY: (HISTOGRAM, "HTTP request latency by route and status."),
+    EXTERNAL_LATENCY: (HISTOGRAM, "Latency of Naver Maps and LMS calls by call type."),
+    PHASE_LATENCY: (HISTOGRAM, "Time spent in each phase of an optimization."),
+    NAVER_ERRORS: (COUNTER, "Failed Naver Maps calls by API and HTTP status (or API code)."),
+    CACHE_HITS: (COUNTER, "Cache lookups answered from the cache."),
+    CACHE_MISSES: (COUNTER, "Cache lookups that had to compute or fetch the value."),
+    CACHE_EVICTIONS: (COUNTER, "Entries dropped to stay within the cache size."),
+    CACHE_STALE: (COUNTER, "Hits served stale while a refresh runs."),
+    CACHE_ENTRIES: (GAUGE, "Entries currently held by the cache."),
+    QUEUE_DEPTH: (GAUGE, "Work items waiting or running, by queue and state."),
+}
+
+# Seconds; spans a cached response up to a slow LMS crawl.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+SeriesKey = Tuple[str, Labels]
+# Collectors yield (kind, name, labels, value) for counters and gauges.
+Sample = Tuple[str, str, Dict[str, str], float]
+
+
+def _labels(labels: Dict[str, object]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+class _Shard:
+    """One thread's counters and histograms (bucket counts, then sum and count)."""
+
+    def __init__(self):
+        self.counters: Dict[SeriesKey, float] = {}
+        self.histograms: Dict[SeriesKey, List[float]] = {}
+
+
+class MetricsRegistry:
+    """Per-process metrics with optional file-based aggregation across workers."""
+
+    def __init__(self, directory: Optional[str] = None, flush_seconds: float = 5.0):
+        self.directory = directory
+        self.flush_seconds = flush_seconds
+        self.buckets = LATENCY_BUCKETS
+        self._local = threading.local()
+        self._shards: List[_Shard] = []
+        self._shards_lock = threading.Lock()
+        self._collectors: List[Callable[[], Iterable[Sample]]] = []
+        # Collected counter -> (last value read, total carried over resets).
+        self._collected: Dict[SeriesKey, Tuple[float, float]] = {}
+        self._collected_lock = threading.Lock()
+        self._stop: Optional[threading.Event] = None
+
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = _Shard()
+            with self._shards_lock:
+                self._shards.append(shard)
+        return shard
+
+    def inc(self, name: str, amount: float = 1, **labels: object) -> None:
+        counters = self._shard().counters
+        key = (name, _labels(labels))
+        counters[key] = counters.get(key, 0) + amount
+
+    def observe(self, name: str, seconds: float, **labels: object) -> None:
+        histograms = self._shard().histograms
+        key = (name, _labels(labels))
+        series = histograms.get(key)
+        if series is None:
+            series = histograms[key] = [0.0] * (len(self.buckets) + 3)
+        series[bisect_left(self.buckets, seconds)] += 1
+        series[-2] += seconds
+        series[-1] += 1
+
+    @contextmanager
+    def timer(self, name: str, **labels: object) -> Iterator[None]:
+        """Observe the time spent in the ``with`` block (also when it raises)."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def add_collector(self, collector: Callable[[], Iterable[Sample]]) -> None:
+        self._collectors.append(collector)
+
+    def snapshot(self) -> Dict:
+        """This process's samples as JSON-ready lists."""
+        counters: Dict[SeriesKey, float] = {}
+        histograms: Dict[SeriesKey, List[float]] = {}
+        with self._shards_lock:
+            shards = list(self._shards)
+        for shard in shards:
+            # dict.copy() is atomic under the GIL, so writers never block.
+            for key, value in shard.counters.copy().items():
+                counters[key] = counters.get(key, 0) + value
+            for key, series in shard.histograms.copy().items():
+                merged = histograms.setdefault(key, [0.0] * len(series))
+                for i, value in enumerate(list(series)):
+                    merged[i] += value
+        gauges: Dict[SeriesKey, float] = {}
+        collected: Dict[SeriesKey, float] = {}
+        for collector in self._collectors:
+            for kind, name, labels, value in collector():
+                key = (name, _labels(labels))
+                target = gauges if kind == GAUGE else collected
+                target[key] = target.get(key, 0) + value
+        with self._collected_lock:
+            for key, value in collected.items():
+                last, carried = self._collected.get(key, (0.0, 0.0))
+                if value < last:  # the source was reset
+                    carried += last
+                self._collected[key] = (value, carried)
+                counters[key] = counters.get(key, 0) + carried + value
+        return {
+            "written_at": time.time(),
+            "counters": [[name, dict(labels), value] for (name, labels), value in counters.items()],
+            "gauges": [[name, dict(labels), value] for (name, labels), value in gauges.items()],
+            "histograms": [
+                [name, dict(labels), series] for (name, labels), series in histograms.items()
+            ],
+        }
+
+    def _path(self) -> Path:
+        return Path(self.directory) / f"{socket.gethostname()}-{os.getpid()}.json"
+
+    def flush(self) -> Dict:
+        """Take a snapshot and, with a directory, write it for the other workers."""
+        snapshot = self.snapshot()
+        if self.directory:
+            path = self._path()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            partial = path.with_suffix(".tmp")
+            partial.write_text(json.dumps(snapshot), encoding="utf-8")
+            os.replace(partial, path)
+        return snapshot
+
+    def _snapshots(self) -> List[Dict]:
+        """This process's snapshot plus the live snapshot files of other workers."""
+        own = self.snapshot()
+        if not self.directory:
+            return [own]
+        snapshots = [own]
+        own_path = self._path()
+        gone_before = own["written_at"] - 3 * self.flush_seconds
+        for path in Path(self.directory).glob("*.json"):
+            if path == own_path:
+                continue
+            try:
+                snapshot = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                continue  # being replaced or removed right now
+            if snapshot["written_at"] < gone_before:
+                path.unlink(missing_ok=True)  # its writer exited without cleaning up
+                continue
+            snapshots.append(snapshot)
+        return snapshots
+
+    def render(self) -> str:
+        """Every worker's samples, summed, in the Prometheus text format."""
+        counters: Dict[SeriesKey, float] = {}
+        gauges: Dict[SeriesKey, float] = {}
+        histograms: Dict[SeriesKey, List[float]] = {}
+        for snapshot in self._snapshots():
+            for name, labels, value in snapshot["counters"]:
+                key = (name, _labels(labels))
+                counters[key] = counters.get(key, 0) + value
+            for name, labels, value in snapshot["gauges"]:
+                key = (name, _labels(labels))
+                gauges[key] = gauges.get(key, 0) + value
+            for name, labels, series in snapshot["histograms"]:
+                merged = histograms.setdefault((name, _labels(labels)), [0.0] * len(series))
+                for i, value in enumerate(series):
+                    merged[i] += value
+
+        by_name: Dict[str, List[str]] = {}
+        for (name, labels), value in sorted(counters.items()) + sorted(gauges.items()):
+            by_name.setdefault(name, []).append(f"{name}{_format_labels(labels)} {_number(value)}")
+        for (name, labels), series in sorted(histograms.items()):
+            lines = by_name.setdefault(name, [])
+            cumulative = 0.0
+            for bound, count in zip([*self.buckets, float("inf")], series):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(
+                    f"{name}_bucket{_format_labels(labels + (('le', le),))} {_number(cumulative)}"
+                )
+            lines.append(f"{name}_sum{_format_labels(labels)} {_number(series[-2])}")
+            lines.append(f"{name}_count{_format_labels(labels)} {_number(series[-1])}")
+
+        out = []
+        for name in sorted(by_name):
+            kind, help_text = METRICS.get(name, ("untyped", ""))
+            out.append(f"# HELP {name} {help_text}")
+            out.append(f"# TYPE {name} {kind}")
+            out.extend(by_name[name])
+        return "\n".join(out) + "\n"
+
+    def start(self) -> None:
+        """Write this worker's snapshot every ``flush_seconds`` in the background."""
+        if not self.directory or self._stop is not None:
+            return
+        self._stop = stop = threading.Event()
+
+        def run():
+            while not stop.wait(self.flush_seconds):
+                try:
+                    self.flush()
+                except OSError:
+                    pass  # try again next round
+
+        threading.Thread(target=run, name="ycc-metrics", daemon=True).start()
+
+    def stop(self) -> None:
+        """Stop the background writer and remove this worker's snapshot file."""
+        if self._stop is not None:
+            self._stop.set()
+            self._stop = None
+        if self.directory:
+            self._path().unlink(missing_ok=True)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class MetricsMiddleware:
+    """ASGI middleware observing ``HTTP_LATENCY`` per route template and status."""
+
+    def __init__(self, app, registry: Optional[MetricsRegistry] = None):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # The router stores the matched route in the (shared) scope.
+            route = getattr(scope.get("route"), "path", "unmatched")
+            (self.registry or shared_metrics).observe(
+                HTTP_LATENCY,
+                time.perf_counter() - started,
+                method=scope["method"],
+                route=route,
+                status=status,
+            )
+
+
+shared_metrics = MetricsRegistry(Config.METRICS_DIR or None, Config.METRICS_FLUSH_SECONDS)
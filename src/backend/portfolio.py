@@ -0,0 +1,206 @@
+"""
+Portfolio solver: run several gap-packing strategies side by side and keep
+the best feasible plan found before the request deadline.
+
+All strategies share one prefetched travel matrix, so worker processes never
+call the Directions API themselves.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from .config import Config
+from .records import EncodedPlan, Event, Placement, Task, decode_plan, encode_plan
+from .scheduler import GAP_STRATEGIES, SolverTimeout, build_travel_matrix, solve_schedule
+from .travel_cache import shared_travel_cache
+
+# Order matters: on equal scores the earlier strategy wins.
+DEFAULT_STRATEGIES: Tuple[str, ...] = ("greedy", "knapsack", "exact", "local_search")
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+@dataclass
+class StrategyOutcome:
+    """How one strategy fared inside the portfolio."""
+
+    strategy: str
+    status: str  # "ok", "timeout", "cancelled" or "error"
+    scheduled_minutes: int = 0
+    scheduled_tasks: int = 0
+
+
+@dataclass
+class PortfolioResult:
+    plan: List[Event | Placement]
+    remaining: List[Task]
+    winner: str
+    outcomes: List[StrategyOutcome] = field(default_factory=list)
+    # Every plan that finished in time, by strategy (includes the winner).
+    candidates: Dict[str, Tuple[List[Event | Placement], List[Task]]] = field(default_factory=dict)
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    """
+    Lazily create the shared worker pool. Workers come from a forkserver
+    (spawned where there is none): forking the threaded server process
+    directly could copy a lock some other thread holds.
+    """
+    global _executor
+    if _executor is None:
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        _executor = ProcessPoolExecutor(max_workers=Config.PORTFOLIO_WORKERS, mp_context=context)
+    return _executor
+
+
+def shutdown_executor() -> None:
+    """Tear down the worker pool (used on application shutdown)."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def score_plan(plan: List[Event | Placement]) -> Tuple[int, int]:
+    """Rank a plan by scheduled work minutes, then by number of placed tasks."""
+    minutes = 0
+    count = 0
+    for entry in plan:
+        if isinstance(entry, Placement):
+            minutes += entry.end - entry.start
+            count += 1
+    return minutes, count
+
+
+def _solve(
+    strategy: str,
+    events: List[Event],
+    tasks: List[Task],
+    travel_matrix: Dict[Tuple[str, str, bool], int],
+    deadline: Optional[float],
+    top_k: Optional[int] = None,
+) -> EncodedPlan:
+    """Worker entry point: run one strategy against the shared matrix.
+
+    The plan travels back as indices into the caller's events/tasks, so the
+    records (and whatever ``source`` objects they carry) are never pickled.
+    """
+    plan, remaining = solve_schedule(
+        events,
+        tasks,
+        strategy=strategy,
+        travel_cache=dict(travel_matrix),
+        deadline=deadline,
+        top_k=top_k,
+    )
+    return encode_plan(plan, remaining, events, tasks)
+
+
+def solve_portfolio(
+    events: List[Event],
+    tasks: List[Task],
+    strategies: Optional[List[str]] = None,
+    deadline_ms: Optional[int] = None,
+    top_k: Optional[int] = None,
+    travel_cache: Optional[Dict[Tuple[str, str, bool], int]] = None,
+) -> PortfolioResult:
+    """
+    Solve ``events``/``tasks`` with every strategy in ``strategies`` and
+    return the best plan available when ``deadline_ms`` elapses.
+
+    The greedy strategy runs in-process so a feasible plan always exists;
+    the others run on the process pool and are cancelled if still pending
+    at the deadline (running ones stop themselves via ``SolverTimeout``).
+    The travel matrix is read through ``travel_cache`` (the shared cache by
+    default).
+    """
+    strategies = list(strategies or DEFAULT_STRATEGIES)
+    for name in strategies:
+        if name not in GAP_STRATEGIES:
+            raise ValueError(f"Unknown strategy: {name}")
+    if deadline_ms is None:
+        deadline_ms = Config.PORTFOLIO_DEADLINE_MS
+    deadline = time.time() + deadline_ms / 1000
+
+    locations = [event.location for event in events] + [task.location for task in tasks]
+    if travel_cache is None:
+        travel_cache = shared_travel_cache
+    travel_matrix = build_travel_matrix(locations, travel_cache)
+
+    futures: Dict[Future, str] = {}
+    pooled = [name for name in strategies if name != "greedy"]
+    if pooled:
+        executor = _get_executor()
+        shipped_events = [Event(e.name, e.start, e.end, e.location) for e in events]
+        shipped_tasks = [Task(t.name, t.duration, t.location, deadline=t.deadline) for t in tasks]
+        for name in pooled:
+            future = executor.submit(
+                _solve, name, shipped_events, shipped_tasks, travel_matrix, deadline, top_k
+            )
+            futures[future] = name
+
+    plans: Dict[str, Tuple[List[Event | Placement], List[Task]]] = {}
+    outcomes: Dict[str, StrategyOutcome] = {}
+
+    if "greedy" in strategies or not pooled:
+        plans["greedy"] = solve_schedule(
+            events, tasks, travel_cache=dict(travel_matrix), top_k=top_k
+        )
+
+    pending = set(futures)
+    while pending:
+        remaining_s = deadline - time.time()
+        if remaining_s <= 0:
+            break
+        done, pending = wait(pending, timeout=remaining_s, return_when=FIRST_COMPLETED)
+        for future in done:
+            name = futures[future]
+            try:
+                plans[name] = decode_plan(future.result(), events, tasks)
+            except SolverTimeout:
+                outcomes[name] = StrategyOutcome(strategy=name, status="timeout")
+            except Exception:
+                outcomes[name] = StrategyOutcome(strategy=name, status="error")
+
+    for future in pending:
+        name = futures[future]
+        status = "cancelled" if future.cancel() else "timeout"
+        outcomes[name] = StrategyOutcome(strategy=name, status=status)
+
+    best_name = None
+    best_score: Optional[Tuple[int, int]] = None
+    for name in strategies:
+        if name not in plans:
+            continue
+        minutes, count = score_plan(plans[name][0])
+        outcomes[name] = StrategyOutcome(
+            strategy=name, status="ok", scheduled_minutes=minutes, scheduled_tasks=count
+        )
+        if best_score is None or (minutes, count) > best_score:
+            best_name, best_score = name, (minutes, count)
+
+    if best_name is None:
+        # Every pooled strategy missed the deadline; fall back to greedy.
+        plans["greedy"] = solve_schedule(
+            events, tasks, travel_cache=dict(travel_matrix), top_k=top_k
+        )
+        best_name = "greedy"
+        minutes, count = score_plan(plans["greedy"][0])
+        outcomes["greedy"] = StrategyOutcome(
+            strategy="greedy", status="ok", scheduled_minutes=minutes, scheduled_tasks=count
+        )
+
+    plan, remaining = plans[best_name]
+    return PortfolioResult(
+        plan=plan,
+        remaining=remaining,
+        winner=best_name,
+        outcomes=[outcomes[name] for name in strategies if name in outcomes],
+        candidates=plans,
+    )
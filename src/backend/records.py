@@ -0,0 +1,175 @@
+"""
+Compact internal records for the scheduling core.
+
+Times are stored as integer minutes since midnight so the solvers never parse
+or format "HH:MM" strings. Conversion happens once at the API/CLI boundary via
+the helpers below; each record keeps a reference to the object it came from
+(``source``) so callers get their original dicts or models back untouched.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+MINUTES_PER_DAY = 24 * 60
+
+
+def parse_minutes(time_str: Optional[str]) -> Optional[int]:
+    """Convert "HH:MM" (or "HH:MM:SS") to minutes since midnight."""
+    if not time_str:
+        return None
+    hours, minutes = time_str.strip().split(":")[:2]
+    return int(hours) * 60 + int(minutes)
+
+
+def format_minutes(minutes: int) -> str:
+    """Convert minutes since midnight back to "HH:MM" (wrapping past midnight)."""
+    hours, mins = divmod(minutes % MINUTES_PER_DAY, 60)
+    return f"{hours:02d}:{mins:02d}"
+
+
+class Event:
+    """A fixed calendar event."""
+
+    __slots__ = ("name", "start", "end", "location", "source")
+
+    def __init__(
+        self,
+        name: str,
+        start: Optional[int],
+        end: Optional[int],
+        location: Optional[str],
+        source: Any = None,
+    ):
+        self.name = name
+        self.start = start
+        self.end = end
+        self.location = location
+        self.source = source
+
+    @property
+    def sort_key(self) -> int:
+        return self.start if self.start is not None else self.end
+
+    def __repr__(self) -> str:
+        return f"Event({self.name!r}, {self.start}, {self.end}, {self.location!r})"
+
+
+class Task:
+    """A todo that still needs a slot.
+
+    ``deadline`` is in the same minute scale as the events it is planned
+    against (minutes since midnight for a day, since the horizon start for
+    multi-day plans), or None when the task has no due date.
+    """
+
+    __slots__ = ("name", "duration", "location", "source", "deadline")
+
+    def __init__(
+        self,
+        name: str,
+        duration: int,
+        location: Optional[str],
+        source: Any = None,
+        deadline: Optional[int] = None,
+    ):
+        self.name = name
+        self.duration = duration
+        self.location = location
+        self.source = source
+        self.deadline = deadline
+
+    def __repr__(self) -> str:
+        return f"Task({self.name!r}, {self.duration}, {self.location!r})"
+
+
+class Placement:
+    """A task placed into a gap."""
+
+    __slots__ = ("task", "start", "end", "location")
+
+    def __init__(self, task: Task, start: int, end: int, location: Optional[str]):
+        self.task = task
+        self.start = start
+        self.end = end
+        self.location = location
+
+    @property
+    def name(self) -> str:
+        return f"✅ {self.task.name}"
+
+    def __repr__(self) -> str:
+        return f"Placement({self.task.name!r}, {self.start}, {self.end}, {self.location!r})"
+
+
+def events_from_dicts(items: Iterable[Dict]) -> List[Event]:
+    """Build events from schedule dicts (CLI / legacy boundary)."""
+    return [
+        Event(
+            item.get("name", ""),
+            parse_minutes(item.get("start_time")),
+            parse_minutes(item.get("end_time")),
+            item.get("location"),
+            item,
+        )
+        for item in items
+    ]
+
+
+def tasks_from_dicts(items: Iterable[Dict]) -> List[Task]:
+    """Build tasks from todo dicts (CLI / legacy boundary)."""
+    return [
+        Task(item["task"], item["estimated_time"], item.get("location"), item)
+        for item in items
+    ]
+
+
+def placement_to_dict(placement: Placement) -> Dict[str, str]:
+    """Render a placement in the schedule-entry shape used by the CLI and API."""
+    return {
+        "name": placement.name,
+        "start_time": format_minutes(placement.start),
+        "end_time": format_minutes(placement.end),
+        "location": placement.location,
+        "type": "task",
+    }
+
+
+# A plan as indices into the events/tasks it was solved for: ``(event,)`` for
+# an event, ``(task, start, end, location)`` for a placement, plus the indices
+# of the unplaced tasks. Used to ship plans between processes and to replay
+# cached plans onto another request's records.
+EncodedPlan = Tuple[List[Tuple], List[int]]
+
+
+def encode_plan(
+    plan: List[Event | Placement],
+    remaining: List[Task],
+    events: List[Event],
+    tasks: List[Task],
+) -> EncodedPlan:
+    event_index = {id(event): i for i, event in enumerate(events)}
+    task_index = {id(task): i for i, task in enumerate(tasks)}
+    encoded = [
+        (task_index[id(entry.task)], entry.start, entry.end, entry.location)
+        if isinstance(entry, Placement)
+        else (event_index[id(entry)],)
+        for entry in plan
+    ]
+    return encoded, [task_index[id(task)] for task in remaining]
+
+
+def decode_plan(
+    encoded: EncodedPlan,
+    events: List[Event],
+    tasks: List[Task],
+) -> Tuple[List[Event | Placement], List[Task]]:
+    plan_entries, remaining = encoded
+    plan: List[Event | Placement] = []
+    for entry in plan_entries:
+        if len(entry) == 1:
+            plan.append(events[entry[0]])
+        else:
+            index, start, end, location = entry
+            plan.append(Placement(tasks[index], start, end, location))
+    return plan, [tasks[index] for index in remaining]
@@ -0,0 +1,110 @@
+"""
+Whole-request result cache for the optimize endpoints.
+
+Requests are keyed on a canonical digest of their schedule and todos: items
+are serialized without volatile fields (generated ids) and sorted, so the same
+day sent in a different order, or with fresh ids, maps to the same key. The
+caller adds whatever else the result depends on (solver options, travel
+buffer, travel cache version). Entries expire after a TTL and the least
+recently used ones are dropped beyond ``maxsize``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from pydantic import BaseModel
+
+from .config import Config
+
+VOLATILE_FIELDS = {"id"}
+
+
+def canonical_order(items: Sequence[BaseModel]) -> Tuple[List[int], List[str]]:
+    """Indices of ``items`` in canonical order, and their serialized forms in that order."""
+    serialized = [
+        json.dumps(item.model_dump(exclude=VOLATILE_FIELDS), sort_keys=True, ensure_ascii=False)
+        for item in items
+    ]
+    order = sorted(range(len(items)), key=serialized.__getitem__)
+    return order, [serialized[i] for i in order]
+
+
+def request_digest(
+    schedule: Sequence[BaseModel],
+    todos: Sequence[BaseModel],
+    **options: Any,
+) -> Tuple[str, List[int], List[int]]:
+    """
+    Digest of a schedule/todo payload plus ``options``. Also returns the
+    canonical order of the schedule and todos, which cached plans are encoded
+    against.
+    """
+    schedule_order, schedule_keys = canonical_order(schedule)
+    todo_order, todo_keys = canonical_order(todos)
+    canonical = json.dumps(
+        [schedule_keys, todo_keys, options], sort_keys=True, default=str, ensure_ascii=False
+    )
+    digest = hashlib.blake2b(canonical.encode(), digest_size=16).hexdigest()
+    return digest, schedule_order, todo_order
+
+
+class ResultCache:
+    """LRU cache with a per-entry time to live."""
+
+    def __init__(self, maxsize: int, ttl_seconds: float):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < time.monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: str, value: Any) -> None:
+        if not self.maxsize:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+
+shared_result_cache = ResultCache(Config.RESULT_CACHE_SIZE, Config.RESULT_CACHE_TTL)
@@ -0,0 +1,143 @@
+"""
+Monte Carlo robustness scoring for solved plans.
+
+Task durations come from rough estimates and travel times vary, so a plan
+that arrives two minutes before a fixed event is fragile. ``analyze_plan``
+draws thousands of duration and travel perturbations at once (log-normal
+factors with mean 1), replays the plan for every sample as NumPy array
+operations, and reports how often each fixed event would be reached late.
+
+NumPy is a declared dependency. The import is still guarded so the rest of
+the API loads without it; ``np`` is then None and callers should check
+``robustness_available()`` before asking for an analysis.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .config import Config
+from .records import Event, Placement
+from .scheduler import _get_travel_minutes_cached
+from .travel_cache import shared_travel_cache
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy
+    np = None
+
+
+@dataclass
+class EventRisk:
+    event: Event
+    late_probability: float
+
+
+@dataclass
+class RobustnessReport:
+    on_time_probability: float
+    samples: int
+    events: List[EventRisk]
+
+
+def robustness_available() -> bool:
+    return np is not None
+
+
+def _raw_travel(
+    start: Optional[str],
+    end: Optional[str],
+    travel_cache: Dict[Tuple[str, str, bool], int],
+) -> int:
+    """Travel minutes without the planner's safety buffer (reuses buffered entries)."""
+    if not start or not end or start == end:
+        return 0
+    buffered = _get_travel_minutes_cached(start, end, travel_cache)
+    return max(buffered - Config.TRAVEL_TIME_BUFFER, 0)
+
+
+def _lognormal(rng, sigma: float, size: Tuple[int, int]):
+    # mean = -sigma^2 / 2 keeps the expected factor at 1
+    return rng.lognormal(-sigma * sigma / 2, sigma, size=size)
+
+
+def analyze_plan(
+    plan: Sequence[Event | Placement],
+    travel_cache: Optional[Dict[Tuple[str, str, bool], int]] = None,
+    samples: Optional[int] = None,
+    seed: int = 0,
+) -> RobustnessReport:
+    """
+    Simulate ``plan`` under random duration and travel perturbations.
+
+    Tasks start as soon as the user arrives; fixed events keep their times,
+    so arriving after an event's start counts as late for that event and the
+    user leaves at its end (or on arrival, if later still).
+    """
+    if np is None:
+        raise RuntimeError("numpy is required for robustness analysis")
+    if travel_cache is None:
+        travel_cache = shared_travel_cache
+    samples = samples or Config.ROBUST_SAMPLES
+    entries = [
+        entry for entry in plan
+        if isinstance(entry, Placement) or entry.start is not None or entry.end is not None
+    ]
+    if not entries:
+        return RobustnessReport(on_time_probability=1.0, samples=samples, events=[])
+
+    travel = np.array(
+        [0]
+        + [
+            _raw_travel(previous.location, entry.location, travel_cache)
+            for previous, entry in zip(entries, entries[1:])
+        ],
+        dtype=float,
+    )
+    durations = np.array(
+        [entry.task.duration if isinstance(entry, Placement) else 0 for entry in entries],
+        dtype=float,
+    )
+
+    rng = np.random.default_rng(seed)
+    shape = (samples, len(entries))
+    travel_draws = travel * _lognormal(rng, Config.ROBUST_TRAVEL_SIGMA, shape)
+    duration_draws = durations * _lognormal(rng, Config.ROBUST_DURATION_SIGMA, shape)
+
+    first = entries[0]
+    clock = np.full(samples, float(first.end if first.end is not None else first.start))
+    late_columns = []
+    risks: List[EventRisk] = []
+    for column, entry in enumerate(entries[1:], start=1):
+        arrival = clock + travel_draws[:, column]
+        if isinstance(entry, Placement):
+            clock = arrival + duration_draws[:, column]
+            continue
+        if entry.start is not None:
+            late = arrival > entry.start
+            late_columns.append(late)
+            risks.append(EventRisk(entry, float(late.mean())))
+        end = entry.end if entry.end is not None else entry.start
+        clock = np.maximum(arrival, end)
+
+    on_time = 1.0
+    if late_columns:
+        on_time = float(1.0 - np.logical_or.reduce(late_columns).mean())
+    return RobustnessReport(on_time_probability=on_time, samples=samples, events=risks)
+
+
+def choose_robust_plan(
+    plans: Sequence[Sequence[Event | Placement]],
+    travel_cache: Optional[Dict[Tuple[str, str, bool], int]] = None,
+    samples: Optional[int] = None,
+    seed: int = 0,
+) -> Tuple[int, List[RobustnessReport]]:
+    """
+    Index of the plan most likely to reach every event on time (the earliest
+    one on ties), with the report for each plan. All plans are scored with
+    the same seed so they face the same perturbation stream.
+    """
+    reports = [analyze_plan(plan, travel_cache, samples, seed) for plan in plans]
+    best = max(range(len(reports)), key=lambda i: (reports[i].on_time_probability, -i))
+    return best, reports
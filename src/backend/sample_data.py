@@ -5,10 +5,12 @@ Includes locations so routing logic can demonstrate travel-aware packing.
 
 from __future__ import annotations
 
+import logging
 import os
 import sys
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 
 # Add project root to path to import daystack
 # IMPORTANT: Must be at the beginning so root config.py is found before src/backend/config.py
@@ -21,17 +23,21 @@ elif sys.path.index(project_root_str) > 0:
     sys.path.remove(project_root_str)
     sys.path.insert(0, project_root_str)
 
+from .logs import get_logger, log_event
+
+logger = get_logger("sample_data")
+
 # Ensure .env file is loaded from project root
 # This is important because daystack imports config which needs the .env file
 from dotenv import load_dotenv
 env_path = project_root / ".env"
 if env_path.exists():
     load_dotenv(env_path)
-    print(f"✅ Loaded .env from {env_path}")
+    log_event(logger, logging.INFO, "env.loaded", path=str(env_path))
 else:
     # Try loading from current directory as fallback
     load_dotenv()
-    print(f"⚠️  .env not found at {env_path}, trying current directory")
+    log_event(logger, logging.WARNING, "env.missing", path=str(env_path))
 
 # Temporarily remove backend from path to ensure root config is imported
 backend_path = str(Path(__file__).parent)
@@ -41,15 +47,20 @@ if backend_was_in_path:
 
 try:
     # Import daystack - it will import root config.py because project_root is first in path
-    from daystack import get_crawler_tasks, get_schedule
-    print(f"✅ Successfully imported daystack functions: get_crawler_tasks={callable(get_crawler_tasks)}, get_schedule={callable(get_schedule)}")
+    from daystack import (
+        build_schedule_from_lms,
+        convert_lms_tasks,
+        fetch_raw_lms_tasks,
+        get_crawler_tasks,
+        get_schedule,
+    )
+    log_event(logger, logging.INFO, "daystack.imported")
 except Exception as e:
     # If import fails, set to None and use fallback data
-    import traceback
-    print(f"⚠️  Failed to import daystack: {e}")
-    print(f"Traceback: {traceback.format_exc()}")
+    logger.warning("daystack.import_failed", exc_info=True, extra={"fields": {"error": str(e)}})
     get_crawler_tasks = None
     get_schedule = None
+    fetch_raw_lms_tasks = None
 finally:
     # Restore backend path if it was there
     if backend_was_in_path and backend_path not in sys.path:
@@ -90,15 +101,17 @@ def get_sample_schedule() -> List[Dict[str, str]]:
     raw_schedule = None
     if callable(get_schedule):
         try:
-            print("📅 Attempting to fetch schedule from daystack...")
             raw_schedule = get_schedule()
-            print(f"✅ Got schedule from daystack: {len(raw_schedule) if raw_schedule else 0} items")
+            log_event(
+                logger, logging.INFO, "sample.schedule_fetched",
+                items=len(raw_schedule) if raw_schedule else 0,
+            )
         except Exception as e:
-            print(f"⚠️  Error fetching schedule from daystack: {e}")
+            log_event(logger, logging.WARNING, "sample.schedule_failed", error=str(e))
             raw_schedule = None
 
     if not raw_schedule:
-        print("📅 Using fallback schedule")
+        log_event(logger, logging.INFO, "sample.schedule_fallback")
         raw_schedule = FALLBACK_SCHEDULE
 
     return ensure_coordinates(raw_schedule)
@@ -108,21 +121,51 @@ def get_sample_todos() -> List[Dict]:
     """Return demo todo items sourced from the shared DAYSTACK logic."""
     if callable(get_crawler_tasks):
         try:
-            print("🕸️  Attempting to fetch tasks from crawler...")
             tasks = get_crawler_tasks()
-            print(f"📥 Crawler returned {len(tasks) if tasks else 0} tasks")
+            log_event(
+                logger, logging.INFO, "sample.tasks_fetched", tasks=len(tasks) if tasks else 0
+            )
             # Only return tasks if we got actual data (non-empty list)
             if tasks and len(tasks) > 0:
-                print(f"✅ Using {len(tasks)} tasks from crawler")
                 return tasks
-            else:
-                print("⚠️  Crawler returned empty list, using fallback data")
         except Exception as e:
             # Log the error for debugging, but continue to fallback
-            import traceback
-            print(f"❌ Error fetching crawler tasks: {e}")
-            print(f"Traceback: {traceback.format_exc()}")
+            logger.error(
+                "sample.tasks_failed", exc_info=True, extra={"fields": {"error": str(e)}}
+            )
             tasks = None
     else:
-        print("⚠️  get_crawler_tasks is not callable, using fallback data")
+        log_event(logger, logging.INFO, "sample.crawler_unavailable")
+    log_event(logger, logging.INFO, "sample.tasks_fallback")
     return FALLBACK_TASKS.copy()
+
+
+@dataclass
+class LmsSnapshot:
+    """Schedule and todos derived from one LMS login + crawl."""
+
+    schedule: List[Dict]
+    tasks: List[Dict]
+
+
+def crawl_lms(username: Optional[str] = None, password: Optional[str] = None) -> Optional[LmsSnapshot]:
+    """
+    Log in and crawl once, deriving both the schedule and the todos from the
+    same result. None when the crawler is not available on this server.
+    """
+    if not callable(fetch_raw_lms_tasks):
+        log_event(logger, logging.INFO, "sample.crawler_unavailable")
+        return None
+    raw_tasks = fetch_raw_lms_tasks(username, password)
+    log_event(logger, logging.INFO, "sample.crawled", tasks=len(raw_tasks))
+    return LmsSnapshot(
+        schedule=build_schedule_from_lms(raw_tasks),
+        tasks=convert_lms_tasks(raw_tasks) if raw_tasks else [],
+    )
+
+
+def sample_from_snapshot(snapshot: Optional[LmsSnapshot]) -> Tuple[List[Dict], List[Dict]]:
+    """The demo (schedule, todos) for a crawl, falling back to canned data."""
+    schedule = snapshot.schedule if snapshot and snapshot.schedule else FALLBACK_SCHEDULE
+    todos = snapshot.tasks if snapshot and snapshot.tasks else FALLBACK_TASKS
+    return ensure_coordinates(schedule), [dict(todo) for todo in todos]
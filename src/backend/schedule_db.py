@@ -0,0 +1,419 @@
+"""
+SQLite-backed schedule store shared by every worker process.
+
+Items live in one embedded SQLite file in WAL mode, so they survive restarts
+and every uvicorn worker sees the same schedule without a database service.
+Rows are keyed by id; the (user, date, start) index serves per-user listings
+and overlap checks as one range scan each, and a (date, start) index serves
+the full listing.
+
+Writes run in ``BEGIN IMMEDIATE`` transactions: the overlap check and the
+write are atomic across processes, and the schedule ``version`` is bumped
+in the same transaction (writes that change nothing are rolled back and
+leave it alone). Every row remembers the version that last wrote it and
+deletions leave a tombstone naming the owner it was deleted for, so
+``changes_since`` can hand pollers just what changed, also for one user.
+Tombstones older than ``tombstone_keep`` versions are pruned; asking for
+changes from before that returns the full schedule instead.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+from dataclasses import dataclass
+from pathlib import Path
+from threading import RLock
+from typing import Callable, Iterator, List, Optional, Tuple, TypeVar
+
+from .config import Config
+from .records import parse_minutes
+
+T = TypeVar("T")
+
+_TABLES = """
+CREATE TABLE IF NOT EXISTS schedule_items (
+    id TEXT PRIMARY KEY,
+    user TEXT NOT NULL,
+    date TEXT NOT NULL,
+    start_key TEXT NOT NULL,
+    start_minute INTEGER,
+    end_minute INTEGER,
+    data TEXT NOT NULL,
+    version INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS schedule_tombstones (
+    id TEXT NOT NULL,
+    user TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    PRIMARY KEY (id, user)
+);
+CREATE TABLE IF NOT EXISTS schedule_meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO schedule_meta (key, value) VALUES ('version', 0);
+INSERT OR IGNORE INTO schedule_meta (key, value) VALUES ('tombstone_floor', 0);
+CREATE INDEX IF NOT EXISTS schedule_items_user_start
+    ON schedule_items (user, date, start_key, id);
+CREATE INDEX IF NOT EXISTS schedule_items_start
+    ON schedule_items (date, start_key, id);
+CREATE INDEX IF NOT EXISTS schedule_items_version ON schedule_items (version);
+CREATE INDEX IF NOT EXISTS schedule_tombstones_version ON schedule_tombstones (version);
+"""
+
+
+class ScheduleConflict(Exception):
+    """Raised when a write would overlap existing items."""
+
+    def __init__(self, conflicts: List[dict]):
+        super().__init__("Schedule item overlaps existing items")
+        self.conflicts = conflicts
+
+
+def _interval(item: dict) -> Optional[Tuple[int, int]]:
+    start = parse_minutes(item.get("start_time"))
+    end = parse_minutes(item.get("end_time"))
+    if start is None or end is None or end <= start:
+        return None
+    return start, end
+
+
+def _sort_key(item: dict) -> Tuple[str, str, str]:
+    start = item.get("start_time") or item.get("end_time") or ""
+    return (item.get("date") or "", start, item["id"])
+
+
+def _free_between(
+    busy: List[Tuple[int, int]], start: int, end: int, min_minutes: int
+) -> List[Tuple[int, int]]:
+    """Gaps of at least ``min_minutes`` in [start, end) around ``busy`` intervals."""
+    slots: List[Tuple[int, int]] = []
+    cursor = start
+    for busy_start, busy_end in sorted(busy) + [(end, end)]:
+        if busy_start - cursor >= max(min_minutes, 1):
+            slots.append((cursor, min(busy_start, end)))
+        cursor = max(cursor, busy_end)
+    return slots
+
+
+@dataclass
+class ScheduleChanges:
+    """What changed after a version: upserted items and deleted ids.
+
+    ``full`` means the caller's version was too old (or unknown) for a delta,
+    so ``items`` is the whole schedule and it should replace its copy.
+    """
+
+    version: int
+    items: List[dict]
+    deleted: List[str]
+    full: bool = False
+
+
+class SqliteScheduleStore:
+    """Schedule items in SQLite, iterated in (date, start time) order."""
+
+    def __init__(self, path: str, timeout: float = 5.0, tombstone_keep: Optional[int] = None):
+        self.path = path
+        self.timeout = timeout
+        if tombstone_keep is None:
+            tombstone_keep = Config.SCHEDULE_TOMBSTONE_KEEP
+        self.tombstone_keep = tombstone_keep
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = RLock()
+
+    def _connect(self) -> sqlite3.Connection:
+        # Opened on first use so importing the API never touches the disk.
+        if self._conn is None:
+            if self.path != ":memory:":
+                Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(
+                self.path, timeout=self.timeout, isolation_level=None, check_same_thread=False
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_TABLES)
+            self._conn = conn
+        return self._conn
+
+    def _query(self, sql: str, params: Tuple = ()) -> List[Tuple]:
+        with self._lock:
+            return self._connect().execute(sql, params).fetchall()
+
+    def _read(self, fetch: Callable[[sqlite3.Connection], T]) -> T:
+        """Run ``fetch(conn)`` against one consistent snapshot."""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN")
+            try:
+                return fetch(conn)
+            finally:
+                conn.execute("COMMIT")
+
+    def _write(self, apply: Callable[[sqlite3.Connection, int], bool]) -> bool:
+        """
+        Run ``apply(conn, version)`` in one immediate transaction as the next
+        version. ``apply`` returns whether it wrote anything; if not, the
+        transaction is rolled back and the version stays put.
+        """
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                version = self._version(conn) + 1
+                if not apply(conn, version):
+                    conn.execute("ROLLBACK")
+                    return False
+                conn.execute("UPDATE schedule_meta SET value = ? WHERE key = 'version'", (version,))
+                floor = version - self.tombstone_keep
+                if conn.execute(
+                    "DELETE FROM schedule_tombstones WHERE version <= ?", (floor,)
+                ).rowcount:
+                    conn.execute(
+                        "UPDATE schedule_meta SET value = MAX(value, ?)"
+                        " WHERE key = 'tombstone_floor'",
+                        (floor,),
+                    )
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+            return True
+
+    @staticmethod
+    def _version(conn: sqlite3.Connection, key: str = "version") -> int:
+        return conn.execute("SELECT value FROM schedule_meta WHERE key = ?", (key,)).fetchone()[0]
+
+    @property
+    def version(self) -> int:
+        """Monotonically increasing; bumped by every write that changes something."""
+        return self._read(self._version)
+
+    def __len__(self) -> int:
+        return self._query("SELECT COUNT(*) FROM schedule_items")[0][0]
+
+    def __iter__(self) -> Iterator[dict]:
+        rows = self._query("SELECT data FROM schedule_items ORDER BY date, start_key, id")
+        return (json.loads(data) for (data,) in rows)
+
+    def __contains__(self, item_id: str) -> bool:
+        return bool(self._query("SELECT 1 FROM schedule_items WHERE id = ?", (item_id,)))
+
+    def get(self, item_id: str) -> Optional[dict]:
+        rows = self._query("SELECT data FROM schedule_items WHERE id = ?", (item_id,))
+        return json.loads(rows[0][0]) if rows else None
+
+    def dump_json(self, user: Optional[str] = None) -> Tuple[int, str]:
+        """
+        The version and the stored items as a JSON array, in (date, start)
+        order, optionally for one user. Rows are stored as JSON, so nothing
+        is parsed or re-serialized.
+        """
+
+        def fetch(conn: sqlite3.Connection) -> Tuple[int, str]:
+            rows = self._listed(conn, user)
+            return self._version(conn), "[" + ",".join(data for (data,) in rows) + "]"
+
+        return self._read(fetch)
+
+    def listing(self, user: Optional[str] = None) -> Tuple[int, List[dict]]:
+        """The version and the stored items (optionally one user's), read together."""
+
+        def fetch(conn: sqlite3.Connection) -> Tuple[int, List[dict]]:
+            return self._version(conn), [json.loads(data) for (data,) in self._listed(conn, user)]
+
+        return self._read(fetch)
+
+    @staticmethod
+    def _listed(conn: sqlite3.Connection, user: Optional[str]) -> Iterator[Tuple[str]]:
+        if user is None:
+            return conn.execute("SELECT data FROM schedule_items ORDER BY date, start_key, id")
+        return conn.execute(
+            "SELECT data FROM schedule_items WHERE user = ? ORDER BY date, start_key, id",
+            (user,),
+        )
+
+    def changes_since(self, since: int, user: Optional[str] = None) -> ScheduleChanges:
+        """
+        Items written and ids deleted after version ``since``, optionally only
+        those of ``user`` (an item moved to another user counts as deleted).
+        """
+
+        def fetch(conn: sqlite3.Connection) -> ScheduleChanges:
+            version = self._version(conn)
+            full = since < self._version(conn, "tombstone_floor") or since > version
+            if user is None:
+                rows = conn.execute(
+                    "SELECT data FROM schedule_items WHERE version > ?"
+                    " ORDER BY date, start_key, id",
+                    (-1 if full else since,),
+                )
+                # Ids moved between users are still alive: they come back as items.
+                tombstones = (
+                    "SELECT id FROM schedule_tombstones WHERE version > ?"
+                    " AND id NOT IN (SELECT id FROM schedule_items)"
+                    " GROUP BY id ORDER BY MAX(version), id",
+                    (since,),
+                )
+            else:
+                rows = conn.execute(
+                    "SELECT data FROM schedule_items WHERE user = ? AND version > ?"
+                    " ORDER BY date, start_key, id",
+                    (user, -1 if full else since),
+                )
+                tombstones = (
+                    "SELECT id FROM schedule_tombstones WHERE user = ? AND version > ?"
+                    " ORDER BY version, id",
+                    (user, since),
+                )
+            items = [json.loads(data) for (data,) in rows]
+            deleted = [] if full else [item_id for (item_id,) in conn.execute(*tombstones)]
+            return ScheduleChanges(version=version, items=items, deleted=deleted, full=full)
+
+        return self._read(fetch)
+
+    def for_user(self, user: Optional[str]) -> List[dict]:
+        """Items of one user in (date, start time) order (one index range scan)."""
+        rows = self._query(
+            "SELECT data FROM schedule_items WHERE user = ? ORDER BY date, start_key, id",
+            (user or "",),
+        )
+        return [json.loads(data) for (data,) in rows]
+
+    def clear(self) -> None:
+        def apply(conn: sqlite3.Connection, version: int) -> bool:
+            conn.execute(
+                "INSERT OR REPLACE INTO schedule_tombstones (id, user, version)"
+                " SELECT id, user, ? FROM schedule_items",
+                (version,),
+            )
+            return conn.execute("DELETE FROM schedule_items").rowcount > 0
+
+        self._write(apply)
+
+    @staticmethod
+    def _overlapping(
+        conn: sqlite3.Connection,
+        start: int,
+        end: int,
+        user: Optional[str],
+        date: Optional[str],
+        exclude_id: Optional[str],
+    ) -> List[dict]:
+        sql = "SELECT data FROM schedule_items WHERE user = ?"
+        params: list = [user or ""]
+        if date is not None:
+            # Dated items also clash with the user's recurring (undated) ones.
+            sql += " AND date IN (?, '')"
+            params.append(date)
+        sql += " AND start_minute < ? AND end_minute > ? AND id != ? ORDER BY date, start_key, id"
+        params += [end, start, exclude_id or ""]
+        return [json.loads(data) for (data,) in conn.execute(sql, params)]
+
+    def overlapping(
+        self,
+        start: int,
+        end: int,
+        user: Optional[str] = None,
+        date: Optional[str] = None,
+        exclude_id: Optional[str] = None,
+    ) -> List[dict]:
+        """Items of ``user`` on ``date`` (or recurring) that overlap [start, end)."""
+        with self._lock:
+            return self._overlapping(self._connect(), start, end, user, date, exclude_id)
+
+    def _insert(
+        self, conn: sqlite3.Connection, version: int, item: dict, allow_overlap: bool
+    ) -> bool:
+        interval = _interval(item)
+        if interval and not allow_overlap:
+            conflicts = self._overlapping(
+                conn, *interval, item.get("user"), item.get("date"), item["id"]
+            )
+            if conflicts:
+                raise ScheduleConflict(conflicts)
+        date, start_key, _ = _sort_key(item)
+        conn.execute(
+            "DELETE FROM schedule_tombstones WHERE id = ? AND user = ?",
+            (item["id"], item.get("user") or ""),
+        )
+        conn.execute(
+            "INSERT INTO schedule_items VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                item["id"],
+                item.get("user") or "",
+                date,
+                start_key,
+                interval[0] if interval else None,
+                interval[1] if interval else None,
+                json.dumps(item, ensure_ascii=False),
+                version,
+            ),
+        )
+        return True
+
+    @staticmethod
+    def _bury(conn: sqlite3.Connection, item_id: str, user: str, version: int) -> None:
+        conn.execute(
+            "INSERT OR REPLACE INTO schedule_tombstones (id, user, version) VALUES (?, ?, ?)",
+            (item_id, user, version),
+        )
+
+    def add(self, item: dict, allow_overlap: bool = False) -> dict:
+        """Insert ``item`` (which must carry an id); raises ``ScheduleConflict``."""
+        self._write(lambda conn, version: self._insert(conn, version, item, allow_overlap))
+        return item
+
+    def remove(self, item_id: str) -> Optional[dict]:
+        removed: List[dict] = []
+
+        def apply(conn: sqlite3.Connection, version: int) -> bool:
+            row = conn.execute(
+                "SELECT data, user FROM schedule_items WHERE id = ?", (item_id,)
+            ).fetchone()
+            if row is None:
+                return False
+            removed.append(json.loads(row[0]))
+            conn.execute("DELETE FROM schedule_items WHERE id = ?", (item_id,))
+            self._bury(conn, item_id, row[1], version)
+            return True
+
+        self._write(apply)
+        return removed[0] if removed else None
+
+    def replace(self, item_id: str, item: dict, allow_overlap: bool = False) -> dict:
+        """Swap the stored item for ``item``; nothing changes if the new one conflicts."""
+
+        def apply(conn: sqlite3.Connection, version: int) -> bool:
+            row = conn.execute(
+                "SELECT data, user FROM schedule_items WHERE id = ?", (item_id,)
+            ).fetchone()
+            if row is not None and item["id"] == item_id and json.loads(row[0]) == item:
+                return False  # an identical write keeps the version (and ETag)
+            conn.execute("DELETE FROM schedule_items WHERE id = ?", (item_id,))
+            # The old owner no longer sees the item under this id.
+            if row is not None and (item["id"], item.get("user") or "") != (item_id, row[1]):
+                self._bury(conn, item_id, row[1], version)
+            return self._insert(conn, version, item, allow_overlap)
+
+        self._write(apply)
+        return item
+
+    def free_slots(
+        self,
+        start: int,
+        end: int,
+        min_minutes: int = 0,
+        user: Optional[str] = None,
+        date: Optional[str] = None,
+    ) -> List[Tuple[int, int]]:
+        """Gaps of at least ``min_minutes`` between ``start`` and ``end`` for one scope."""
+        busy = [_interval(item) for item in self.overlapping(start, end, user, date)]
+        return _free_between(busy, start, end, min_minutes)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
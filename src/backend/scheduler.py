@@ -3,10 +3,33 @@ Scheduler module for optimizing task allocation based on available time.
 Now orders tasks inside each gap using travel-time-aware routing.
 """
 
-from datetime import datetime, timedelta
-from typing import Dict, List, Tuple
+import logging
+import time
+from array import array
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
+from .candidates import CandidateIndex
 from .directions import get_travel_time_from_addresses
+from .gap_memo import shared_gap_memo
+from .logs import get_logger, log_event
+from .records import (
+    Event,
+    Placement,
+    Task,
+    events_from_dicts,
+    placement_to_dict,
+    tasks_from_dicts,
+)
+
+logger = get_logger("scheduler")
+
+# Above this many fitting tasks the exact search hands a gap to the greedy packer.
+EXACT_MAX_CANDIDATES = 8
+
+
+class SolverTimeout(Exception):
+    """Raised by a strategy when its wall-clock deadline has passed."""
 
 
 def parse_time(time_str: str) -> datetime:
@@ -29,7 +52,7 @@ def calculate_free_time(schedule_item_1: Dict, schedule_item_2: Dict) -> Dict[st
     gap_total = calculate_time_gap(schedule_item_1["end_time"], schedule_item_2["start_time"])
     travel_time = get_travel_time_from_addresses(
         schedule_item_1["location"], schedule_item_2["location"], include_buffer=True
-    )
+    ) or 0
     real_free_time = gap_total - travel_time
     return {
         "total_gap": gap_total,
@@ -38,38 +61,136 @@ def calculate_free_time(schedule_item_1: Dict, schedule_item_2: Dict) -> Dict[st
     }
 
 
+def _fetch_travel_minutes(key: Tuple[str, str, bool]) -> Optional[int]:
+    start, end, include_buffer = key
+    return get_travel_time_from_addresses(start, end, include_buffer=include_buffer)
+
+
 def _get_travel_minutes_cached(
     start: str,
     end: str,
     cache: Dict[Tuple[str, str, bool], int],
     include_buffer: bool = True,
 ) -> int:
-    """Get travel minutes between two addresses with memoization."""
+    """
+    Get travel minutes between two addresses with memoization.
+
+    Caches with ``get_or_fetch`` (the shared ``TravelCache``) look up and
+    store atomically and never keep a failed lookup. A failure counts as 0
+    minutes for this caller; only request-scoped dicts remember that 0.
+    """
     key = (start, end, include_buffer)
+    get_or_fetch = getattr(cache, "get_or_fetch", None)
+    if get_or_fetch is not None:
+        minutes = get_or_fetch(key, _fetch_travel_minutes)
+        return 0 if minutes is None else minutes
     if key not in cache:
-        cache[key] = get_travel_time_from_addresses(start, end, include_buffer=include_buffer)
+        minutes = _fetch_travel_minutes(key)
+        cache[key] = 0 if minutes is None else minutes
     return cache[key]
 
 
-def _pick_tasks_for_gap(
-    current_item: Dict,
-    next_item: Dict,
-    remaining_tasks: List[Dict],
-    travel_cache: Dict[Tuple[str, str, bool], int],
-) -> List[Dict]:
+def build_travel_matrix(
+    locations: Iterable[str],
+    travel_cache: Optional[Dict[Tuple[str, str, bool], int]] = None,
+    include_buffer: bool = True,
+) -> Dict[Tuple[str, str, bool], int]:
     """
-    Greedy route-aware packing: in a gap, keep choosing the next task whose
-    travel + work still lets you reach the next event, preferring the plan
-    that leaves the least slack and lowest travel penalty.
+    Prefetch travel minutes for every ordered pair of ``locations``.
+
+    The result has the same shape as the per-request travel cache, so it can be
+    handed to ``allocate_tasks`` (or shipped to worker processes) and no solver
+    has to hit the Directions API again. Lookups go through ``travel_cache``
+    when given (e.g. the shared cache), but only the requested pairs are
+    returned.
     """
-    gap_start_time = parse_time(current_item["end_time"])
-    deadline_time = parse_time(next_item["start_time"])
-    current_location = current_item["location"]
+    matrix: Dict[Tuple[str, str, bool], int] = {}
+    source = travel_cache if travel_cache is not None else matrix
+    unique = [loc for loc in dict.fromkeys(locations) if loc]
+    for start in unique:
+        for end in unique:
+            matrix[(start, end, include_buffer)] = _get_travel_minutes_cached(
+                start, end, source, include_buffer
+            )
+    return matrix
 
-    allocated: List[Dict] = []
+
+def _check_deadline(deadline: Optional[float]) -> None:
+    """Raise ``SolverTimeout`` once the wall-clock ``deadline`` has passed."""
+    if deadline is not None and time.time() >= deadline:
+        raise SolverTimeout("solver deadline exceeded")
+
+
+def _route_cost(
+    start_location: str,
+    sequence: List[Task],
+    end_location: str,
+    travel_cache: Dict[Tuple[str, str, bool], int],
+) -> Tuple[int, int]:
+    """Return (work minutes, travel minutes) for visiting ``sequence`` in order."""
+    work = 0
+    travel = 0
+    location = start_location
+    for task in sequence:
+        task_location = task.location or location
+        travel += _get_travel_minutes_cached(location, task_location, travel_cache)
+        work += task.duration
+        location = task_location
+    travel += _get_travel_minutes_cached(location, end_location, travel_cache)
+    return work, travel
+
+
+def _materialize_sequence(
+    gap_start: int,
+    current_location: str,
+    sequence: List[Task],
+    travel_cache: Dict[Tuple[str, str, bool], int],
+) -> List[Placement]:
+    """Turn an ordered list of tasks into timed placements."""
+    allocated: List[Placement] = []
+    for task in sequence:
+        task_location = task.location or current_location
+        start = gap_start + _get_travel_minutes_cached(current_location, task_location, travel_cache)
+        end = start + task.duration
+        allocated.append(Placement(task, start, end, task_location))
+        gap_start = end
+        current_location = task_location
+    return allocated
+
+
+def _feasible_candidates(
+    current_location: str,
+    next_location: str,
+    minutes_available: int,
+    remaining_tasks: List[Task],
+    travel_cache: Dict[Tuple[str, str, bool], int],
+) -> List[Task]:
+    """Tasks that would fit in the gap on their own."""
+    candidates = []
+    for task in remaining_tasks:
+        work, travel = _route_cost(current_location, [task], next_location, travel_cache)
+        if work + travel <= minutes_available:
+            candidates.append(task)
+    return candidates
+
+
+def _greedy_sequence(
+    current_location: str,
+    next_location: str,
+    minutes_available: int,
+    remaining_tasks: List[Task],
+    travel_cache: Dict[Tuple[str, str, bool], int],
+) -> List[Task]:
+    """
+    Greedy route-aware packing: keep choosing the next task whose travel +
+    work still lets you reach the next event, preferring the plan that leaves
+    the least slack and lowest travel penalty. Chosen tasks are removed from
+    ``remaining_tasks`` and returned in visiting order.
+    """
+    sequence: List[Task] = []
+    minutes_until_next = minutes_available
 
     while remaining_tasks:
-        minutes_until_next = int((deadline_time - gap_start_time).total_seconds() / 60)
         if minutes_until_next <= 0:
             break
 
@@ -79,15 +200,15 @@ def _pick_tasks_for_gap(
         best_travel_to_next = 0
 
         for task in remaining_tasks:
-            task_location = task.get("location") or current_location
+            task_location = task.location or current_location
             travel_to_task = _get_travel_minutes_cached(
                 current_location, task_location, travel_cache
             )
             travel_task_to_next = _get_travel_minutes_cached(
-                task_location, next_item["location"], travel_cache
+                task_location, next_location, travel_cache
             )
 
-            total_if_taken = travel_to_task + task["estimated_time"] + travel_task_to_next
+            total_if_taken = travel_to_task + task.duration + travel_task_to_next
             if total_if_taken > minutes_until_next:
                 continue
 
@@ -102,72 +223,483 @@ def _pick_tasks_for_gap(
                 best_travel_to_next = travel_task_to_next
 
         if not best_task:
-            print(f"   ⚠️  경로/시간 제약으로 추가 배치 불가 (남은 {minutes_until_next}분)")
+            log_event(logger, logging.DEBUG, "gap.no_fit", minutes_left=minutes_until_next)
             break
 
-        start_time = gap_start_time + timedelta(minutes=best_travel_to_task)
-        end_time = start_time + timedelta(minutes=best_task["estimated_time"])
-
-        allocated.append(
-            {
-                "name": f"✅ {best_task['task']}",
-                "start_time": start_time.strftime("%H:%M"),
-                "end_time": end_time.strftime("%H:%M"),
-                "location": best_task.get("location", current_location),
-                "type": "task",
-            }
+        log_event(
+            logger,
+            logging.DEBUG,
+            "gap.placed",
+            task=best_task.name,
+            travel_to_task=best_travel_to_task,
+            duration=best_task.duration,
+            travel_to_next=best_travel_to_next,
         )
 
-        print(
-            f"   ✅ '{best_task['task']}' 배치 "
-            f"(이동 {best_travel_to_task}분 + 작업 {best_task['estimated_time']}분 | "
-            f"다음 장소 이동 {best_travel_to_next}분)"
+        sequence.append(best_task)
+        minutes_until_next -= best_travel_to_task + best_task.duration
+        current_location = best_task.location or current_location
+        remaining_tasks.remove(best_task)
+
+    return sequence
+
+
+def _pick_tasks_for_gap(
+    current_item: Event,
+    next_item: Event,
+    remaining_tasks: List[Task],
+    travel_cache: Dict[Tuple[str, str, bool], int],
+    deadline: Optional[float] = None,
+) -> List[Placement]:
+    """Greedy packer for one gap (see ``_greedy_sequence``)."""
+    sequence = _greedy_sequence(
+        current_item.location,
+        next_item.location,
+        next_item.start - current_item.end,
+        remaining_tasks,
+        travel_cache,
+    )
+    return _materialize_sequence(current_item.end, current_item.location, sequence, travel_cache)
+
+
+def _exact_sequence(
+    start_location: str,
+    next_location: str,
+    minutes_available: int,
+    candidates: List[Task],
+    travel_cache: Dict[Tuple[str, str, bool], int],
+    deadline: Optional[float] = None,
+) -> List[Task]:
+    """
+    Enumerate every feasible visiting order of ``candidates`` and return the
+    one with the most work minutes, breaking ties by the least travel.
+    """
+    best: Dict[str, object] = {"score": (0, 0), "sequence": []}
+
+    def search(location: str, elapsed: int, work: int, travel: int, sequence: List[Task]) -> None:
+        _check_deadline(deadline)
+        closing = _get_travel_minutes_cached(location, next_location, travel_cache)
+        if elapsed + closing <= minutes_available:
+            score = (work, -(travel + closing))
+            if score > best["score"]:
+                best["score"] = score
+                best["sequence"] = list(sequence)
+
+        for task in candidates:
+            if any(task is chosen for chosen in sequence):
+                continue
+            task_location = task.location or location
+            leg = _get_travel_minutes_cached(location, task_location, travel_cache)
+            finish = elapsed + leg + task.duration
+            if finish > minutes_available:
+                continue
+            sequence.append(task)
+            search(task_location, finish, work + task.duration, travel + leg, sequence)
+            sequence.pop()
+
+    search(start_location, 0, 0, 0, [])
+    return best["sequence"]  # type: ignore[return-value]
+
+
+def _pick_tasks_exact(
+    current_item: Event,
+    next_item: Event,
+    remaining_tasks: List[Task],
+    travel_cache: Dict[Tuple[str, str, bool], int],
+    deadline: Optional[float] = None,
+) -> List[Placement]:
+    """
+    Exact search for small gaps: enumerate every feasible visiting order of
+    the tasks that fit, maximizing work minutes and then minimizing travel.
+    Falls back to the greedy packer when there are too many candidates.
+    """
+    minutes_available = next_item.start - current_item.end
+    start_location = current_item.location
+    next_location = next_item.location
+    if minutes_available <= 0:
+        return []
+
+    candidates = _feasible_candidates(
+        start_location, next_location, minutes_available, remaining_tasks, travel_cache
+    )
+    if len(candidates) > EXACT_MAX_CANDIDATES:
+        return _pick_tasks_for_gap(current_item, next_item, remaining_tasks, travel_cache, deadline)
+
+    sequence = _exact_sequence(
+        start_location, next_location, minutes_available, candidates, travel_cache, deadline
+    )
+    for task in sequence:
+        remaining_tasks.remove(task)
+    return _materialize_sequence(current_item.end, start_location, sequence, travel_cache)
+
+
+def _knapsack_select(weights: List[int], values: List[int], capacity: int) -> List[int]:
+    """
+    0/1 knapsack over integer minutes. Returns the indices of the items that
+    maximize total value within ``capacity``.
+
+    Uses a single ``array`` row of best values plus one ``bytearray`` of
+    take-flags per item, so a full day (1440 minutes) with hundreds of tasks
+    stays well under a megabyte.
+    """
+    if capacity <= 0 or not weights:
+        return []
+
+    best = array("l", bytes(array("l").itemsize * (capacity + 1)))
+    taken = [bytearray(capacity + 1) for _ in weights]
+
+    for index, (weight, value) in enumerate(zip(weights, values)):
+        if weight > capacity:
+            continue
+        flags = taken[index]
+        for minutes in range(capacity, weight - 1, -1):
+            candidate = best[minutes - weight] + value
+            if candidate > best[minutes]:
+                best[minutes] = candidate
+                flags[minutes] = 1
+
+    chosen: List[int] = []
+    minutes = capacity
+    for index in range(len(weights) - 1, -1, -1):
+        if taken[index][minutes]:
+            chosen.append(index)
+            minutes -= weights[index]
+    chosen.reverse()
+    return chosen
+
+
+def _nearest_neighbor_sequence(
+    start_location: str,
+    tasks: List[Task],
+    travel_cache: Dict[Tuple[str, str, bool], int],
+) -> List[Task]:
+    """Order ``tasks`` by repeatedly visiting the closest unvisited one."""
+    pending = list(tasks)
+    sequence: List[Task] = []
+    location = start_location
+    while pending:
+        task = min(
+            pending,
+            key=lambda t: _get_travel_minutes_cached(location, t.location or location, travel_cache),
         )
+        pending.remove(task)
+        sequence.append(task)
+        location = task.location or location
+    return sequence
 
-        gap_start_time = end_time
-        current_location = best_task.get("location", current_location)
-        remaining_tasks.remove(best_task)
 
-    return allocated
+def _pick_tasks_knapsack(
+    current_item: Event,
+    next_item: Event,
+    remaining_tasks: List[Task],
+    travel_cache: Dict[Tuple[str, str, bool], int],
+    deadline: Optional[float] = None,
+) -> List[Placement]:
+    """
+    Choose the subset of tasks that maximizes scheduled work with a knapsack
+    DP over minutes, then order it and top up any leftover time greedily.
 
+    Each task weighs its duration plus the cheapest way to arrive at it (from
+    the gap start or another candidate); the capacity is the gap minus the
+    cheapest final leg to the next event.
+    """
+    minutes_available = next_item.start - current_item.end
+    start_location = current_item.location
+    next_location = next_item.location
+    if minutes_available <= 0:
+        return []
+
+    candidates = _feasible_candidates(
+        start_location, next_location, minutes_available, remaining_tasks, travel_cache
+    )
+    if not candidates:
+        return []
+
+    locations = [task.location or start_location for task in candidates]
+    weights = []
+    for index, location in enumerate(locations):
+        arrival = _get_travel_minutes_cached(start_location, location, travel_cache)
+        for other_index, other in enumerate(locations):
+            if other_index != index:
+                arrival = min(arrival, _get_travel_minutes_cached(other, location, travel_cache))
+        weights.append(candidates[index].duration + arrival)
+    closing = min(
+        _get_travel_minutes_cached(location, next_location, travel_cache) for location in locations
+    )
+    values = [task.duration for task in candidates]
 
-def allocate_tasks(
-    schedule: List[Dict],
-    todo_list: List[Dict],
-    return_summary: bool = False,
-) -> List[Dict] | Tuple[List[Dict], List[Dict]]:
+    _check_deadline(deadline)
+    subset = [candidates[i] for i in _knapsack_select(weights, values, minutes_available - closing)]
+
+    # The weights are optimistic, so order the subset and drop tasks until
+    # the real route fits.
+    if len(subset) <= EXACT_MAX_CANDIDATES:
+        sequence = _exact_sequence(
+            start_location, next_location, minutes_available, subset, travel_cache, deadline
+        )
+    else:
+        sequence = _nearest_neighbor_sequence(start_location, subset, travel_cache)
+        while sequence and sum(_route_cost(start_location, sequence, next_location, travel_cache)) > minutes_available:
+            sequence.remove(min(sequence, key=lambda t: t.duration))
+
+    for task in sequence:
+        remaining_tasks.remove(task)
+
+    work, travel = _route_cost(start_location, sequence, next_location, travel_cache)
+    last_location = start_location
+    for task in sequence:
+        last_location = task.location or last_location
+    closing_leg = _get_travel_minutes_cached(last_location, next_location, travel_cache)
+    leftover = minutes_available - work - (travel - closing_leg)
+    sequence += _greedy_sequence(last_location, next_location, leftover, remaining_tasks, travel_cache)
+
+    return _materialize_sequence(current_item.end, start_location, sequence, travel_cache)
+
+
+def _pick_tasks_local_search(
+    current_item: Event,
+    next_item: Event,
+    remaining_tasks: List[Task],
+    travel_cache: Dict[Tuple[str, str, bool], int],
+    deadline: Optional[float] = None,
+) -> List[Placement]:
     """
-    Allocate tasks to free time slots, choosing a route that minimizes
-    wasted travel while respecting arrival times for the next event.
+    Start from the greedy packing and improve it with insert, replace,
+    one-for-two and swap moves until no move adds work minutes or saves
+    travel.
+    """
+    minutes_available = next_item.start - current_item.end
+    start_location = current_item.location
+    next_location = next_item.location
+    if minutes_available <= 0:
+        return []
+
+    pool = list(remaining_tasks)
+    sequence = _greedy_sequence(
+        start_location, next_location, minutes_available, pool, travel_cache
+    )
+    unplaced = _feasible_candidates(
+        start_location, next_location, minutes_available, pool, travel_cache
+    )
+
+    def evaluate(candidate: List[Task]) -> Optional[Tuple[int, int]]:
+        work, travel = _route_cost(start_location, candidate, next_location, travel_cache)
+        if work + travel > minutes_available:
+            return None
+        return work, -travel
+
+    current_score = evaluate(sequence) or (0, 0)
+    improved = True
+    while improved:
+        _check_deadline(deadline)
+        improved = False
+        moves: List[Tuple[List[Task], List[Task], List[Task]]] = []
+        for task in unplaced:
+            for position in range(len(sequence) + 1):
+                moves.append((sequence[:position] + [task] + sequence[position:], [task], []))
+            for position, placed in enumerate(sequence):
+                moves.append((sequence[:position] + [task] + sequence[position + 1:], [task], [placed]))
+        # Trade one placed task for two shorter ones.
+        for position, placed in enumerate(sequence):
+            for i, first in enumerate(unplaced):
+                for second in unplaced[i + 1:]:
+                    candidate = sequence[:position] + [first, second] + sequence[position + 1:]
+                    moves.append((candidate, [first, second], [placed]))
+        for i in range(len(sequence)):
+            for j in range(i + 1, len(sequence)):
+                swapped = list(sequence)
+                swapped[i], swapped[j] = swapped[j], swapped[i]
+                moves.append((swapped, [], []))
+
+        for candidate, added, dropped in moves:
+            score = evaluate(candidate)
+            if score is not None and score > current_score:
+                sequence, current_score = candidate, score
+                for task in added:
+                    unplaced.remove(task)
+                unplaced.extend(dropped)
+                improved = True
+                break
+
+    for task in sequence:
+        remaining_tasks.remove(task)
+    return _materialize_sequence(current_item.end, start_location, sequence, travel_cache)
+
+
+GAP_STRATEGIES: Dict[str, Callable[..., List[Placement]]] = {
+    "greedy": _pick_tasks_for_gap,
+    "exact": _pick_tasks_exact,
+    "knapsack": _pick_tasks_knapsack,
+    "local_search": _pick_tasks_local_search,
+}
+
+
+def solve_gap(
+    strategy: str,
+    current_item: Event,
+    next_item: Event,
+    remaining_tasks: List[Task],
+    travel_cache: Dict[Tuple[str, str, bool], int],
+    deadline: Optional[float] = None,
+    index: Optional[CandidateIndex] = None,
+    top_k: Optional[int] = None,
+) -> List[Placement]:
+    """
+    Run one gap strategy. With ``index``/``top_k`` the strategy only sees the
+    K best candidates for this gap; placed tasks are removed from both
+    ``remaining_tasks`` and the index.
+
+    When ``travel_cache`` is versioned (the shared ``TravelCache``), solved
+    gaps are memoized in ``shared_gap_memo`` across requests.
     """
-    optimized_schedule: List[Dict] = []
-    remaining_tasks = todo_list.copy()
-    travel_cache: Dict[Tuple[str, str, bool], int] = {}
+    pick_tasks = GAP_STRATEGIES[strategy]
+    if index is not None and top_k:
+        candidates = index.top(next_item.start - current_item.end, top_k)
+    else:
+        candidates = remaining_tasks
+
+    if getattr(travel_cache, "version", None) is not None and shared_gap_memo.maxsize:
+        placements = shared_gap_memo.solve(
+            strategy,
+            current_item,
+            next_item,
+            candidates,
+            travel_cache,
+            lambda pool, travel: pick_tasks(current_item, next_item, pool, travel, deadline),
+        )
+    else:
+        placements = pick_tasks(current_item, next_item, candidates, travel_cache, deadline)
+        if candidates is remaining_tasks:
+            return placements  # the strategy already removed what it placed
+
+    for placement in placements:
+        remaining_tasks.remove(placement.task)
+        if index is not None:
+            index.discard(placement.task)
+    return placements
+
+
+def iter_schedule(
+    events: List[Event],
+    remaining_tasks: List[Task],
+    strategy: str = "greedy",
+    travel_cache: Optional[Dict[Tuple[str, str, bool], int]] = None,
+    deadline: Optional[float] = None,
+    top_k: Optional[int] = None,
+) -> Iterator[Tuple[Event, List[Placement]]]:
+    """
+    Solve the day gap by gap, yielding each event (in time order) with the
+    placements packed into the gap after it as soon as that gap is solved.
+
+    Placed tasks are removed from ``remaining_tasks`` as it goes, so once the
+    generator is exhausted the list holds the tasks that did not fit.
+    """
+    if strategy not in GAP_STRATEGIES:
+        raise ValueError(f"Unknown strategy: {strategy}")
 
-    sorted_schedule = sorted(schedule, key=lambda x: x.get("start_time", x.get("end_time")))
+    if travel_cache is None:
+        travel_cache = {}
+    index = CandidateIndex(remaining_tasks) if top_k and len(remaining_tasks) > top_k else None
 
-    for i in range(len(sorted_schedule)):
-        optimized_schedule.append(sorted_schedule[i])
+    sorted_events = sorted(events, key=lambda event: event.sort_key)
 
-        if i >= len(sorted_schedule) - 1:
+    for i, current_item in enumerate(sorted_events):
+        if i >= len(sorted_events) - 1:
+            yield current_item, []
             continue
 
-        current_item = sorted_schedule[i]
-        next_item = sorted_schedule[i + 1]
+        next_item = sorted_events[i + 1]
+        if current_item.end is None or next_item.start is None:
+            yield current_item, []
+            continue
 
-        gap_minutes = calculate_time_gap(current_item["end_time"], next_item["start_time"])
-        time_info = calculate_free_time(current_item, next_item)
+        # Purely diagnostic: the direct travel lookup may cost an API call.
+        if logger.isEnabledFor(logging.DEBUG):
+            log_event(
+                logger,
+                logging.DEBUG,
+                "gap.analysis",
+                current=current_item.name,
+                next=next_item.name,
+                gap_minutes=next_item.start - current_item.end,
+                direct_travel=_get_travel_minutes_cached(
+                    current_item.location, next_item.location, travel_cache
+                ),
+            )
 
-        print(f"\n⏱️/🗺️ 간격 분석: {current_item['name']} ➜ {next_item['name']}")
-        print(f"   총 간격: {gap_minutes}분 (직행 시 이동 {time_info['travel_time']}분)")
+        _check_deadline(deadline)
+        yield current_item, solve_gap(
+            strategy, current_item, next_item, remaining_tasks, travel_cache,
+            deadline, index, top_k,
+        )
 
-        allocated = _pick_tasks_for_gap(current_item, next_item, remaining_tasks, travel_cache)
-        optimized_schedule.extend(allocated)
+
+def solve_schedule(
+    events: List[Event],
+    tasks: List[Task],
+    strategy: str = "greedy",
+    travel_cache: Optional[Dict[Tuple[str, str, bool], int]] = None,
+    deadline: Optional[float] = None,
+    top_k: Optional[int] = None,
+) -> Tuple[List[Event | Placement], List[Task]]:
+    """
+    Record-level core of ``allocate_tasks``: returns the day as a list of
+    events and placements in time order, plus the tasks that did not fit.
+
+    ``top_k`` limits every gap to the K most plausible tasks (see
+    ``backend.candidates``); None or 0 offers every task to every gap.
+    """
+    plan: List[Event | Placement] = []
+    remaining_tasks = list(tasks)
+    for event, placements in iter_schedule(
+        events, remaining_tasks, strategy, travel_cache, deadline, top_k
+    ):
+        plan.append(event)
+        plan.extend(placements)
 
     if remaining_tasks:
-        print(f"\n⚠️  배치하지 못한 작업:")
-        for task in remaining_tasks:
-            print(f"   - {task['task']} ({task['estimated_time']}분)")
+        log_event(
+            logger,
+            logging.INFO,
+            "schedule.unplaced",
+            tasks=[f"{task.name} ({task.duration}분)" for task in remaining_tasks],
+        )
+
+    return plan, remaining_tasks
+
+
+def allocate_tasks(
+    schedule: List[Dict],
+    todo_list: List[Dict],
+    return_summary: bool = False,
+    strategy: str = "greedy",
+    travel_cache: Optional[Dict[Tuple[str, str, bool], int]] = None,
+    deadline: Optional[float] = None,
+) -> List[Dict] | Tuple[List[Dict], List[Dict]]:
+    """
+    Allocate tasks to free time slots, choosing a route that minimizes
+    wasted travel while respecting arrival times for the next event.
+
+    ``strategy`` selects the per-gap packer from ``GAP_STRATEGIES``. A
+    prefilled ``travel_cache`` (see ``build_travel_matrix``) avoids API calls,
+    and ``deadline`` is a ``time.time()`` timestamp after which
+    ``SolverTimeout`` is raised.
+
+    This is the dict boundary used by the CLI; ``solve_schedule`` does the
+    work on integer-minute records.
+    """
+    plan, remaining = solve_schedule(
+        events_from_dicts(schedule),
+        tasks_from_dicts(todo_list),
+        strategy=strategy,
+        travel_cache=travel_cache,
+        deadline=deadline,
+    )
+    optimized_schedule = [
+        placement_to_dict(entry) if isinstance(entry, Placement) else entry.source
+        for entry in plan
+    ]
+    remaining_tasks = [task.source for task in remaining]
 
     if return_summary:
         return optimized_schedule, remaining_tasks
@@ -0,0 +1,41 @@
+"""
+Fast JSON encoding for API responses.
+
+Plans are rendered straight to JSON-ready dicts (see ``api._PlanRenderer``),
+so responses don't need FastAPI to validate and serialize the response model
+again. ``FastJSONResponse`` encodes such a payload with orjson when it is
+installed and falls back to the standard library encoder (with Starlette's
+compact settings) otherwise, so the output is the same either way.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson
+    orjson = None
+
+
+def fast_json_available() -> bool:
+    return orjson is not None
+
+
+def dumps(content: Any) -> bytes:
+    """Encode JSON-ready ``content`` (dicts, lists, str, numbers, None)."""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response for trusted, already JSON-ready payloads (no validation)."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,117 @@
+"""
+Stale-while-revalidate cache for slow loaders (LMS login + crawl).
+
+An entry younger than ``fresh_for`` seconds is served as is. An older entry
+is still served immediately, up to ``max_stale`` seconds old, while one
+background refresh replaces it; past that, the caller loads it again. Loads
+of the same key are single-flight: concurrent callers wait for one load
+instead of crawling in parallel. A failed background refresh keeps the old
+entry.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from .logs import get_logger, log_event
+
+logger = get_logger("swr_cache")
+
+
+@dataclass
+class CachedValue:
+    value: Any
+    fetched_at: float
+    stale: bool = False
+
+
+class SwrCache:
+    """Per-key cached loader results with background revalidation."""
+
+    def __init__(self, fresh_for: float, max_stale: float, workers: int = 2):
+        self.fresh_for = fresh_for
+        self.max_stale = max_stale
+        self.workers = workers
+        self._entries: Dict[Hashable, CachedValue] = {}
+        self._loading: Dict[Hashable, Future] = {}
+        self._lock = Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, loader: Callable[[], Any]) -> CachedValue:
+        """The cached value for ``key``, loading or revalidating it as needed."""
+        with self._lock:
+            entry = self._entries.get(key)
+            age = time.time() - entry.fetched_at if entry else None
+            if entry is not None and age < self.fresh_for:
+                self.hits += 1
+                return entry
+            if entry is not None and age < self.max_stale:
+                self.hits += 1
+                self.stale_hits += 1
+                if key not in self._loading:
+                    self._loading[key] = future = Future()
+                    self._background().submit(self._load, key, loader, future, True)
+                return CachedValue(entry.value, entry.fetched_at, stale=True)
+            self.misses += 1
+        return self.refresh(key, loader)
+
+    def refresh(self, key: Hashable, loader: Callable[[], Any]) -> CachedValue:
+        """Load ``key`` now (joining a load already in flight) and return it."""
+        with self._lock:
+            future = self._loading.get(key)
+            owner = future is None
+            if owner:
+                self._loading[key] = future = Future()
+        if owner:
+            self._load(key, loader, future, False)
+        return future.result()
+
+    def _load(self, key: Hashable, loader: Callable[[], Any], future: Future, background: bool):
+        try:
+            entry = CachedValue(loader(), time.time())
+        except Exception as exc:
+            log_event(logger, logging.WARNING, "swr.refresh_failed", key=str(key), error=str(exc))
+            with self._lock:
+                self._loading.pop(key, None)
+            future.set_exception(exc)
+            if not background:
+                raise
+            return
+        with self._lock:
+            self._entries[key] = entry
+            self._loading.pop(key, None)
+        log_event(logger, logging.INFO, "swr.refreshed", key=str(key), background=background)
+        future.set_result(entry)
+
+    def _background(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="ycc-swr"
+            )
+        return self._executor
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "size": len(self._entries),
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,141 @@
+"""
+Process-wide travel-time cache shared by every request.
+
+The scheduler looks travel minutes up through a plain mapping keyed by
+``(start, end, include_buffer)``. ``TravelCache`` implements that mapping with
+LRU eviction so repeated requests (and live re-plans every few minutes) stay
+warm instead of calling the Directions API again.
+
+Failed lookups (the Directions layer returns None) are never stored: the key
+answers None for ``TRAVEL_FAILURE_TTL`` seconds, so a failing route is not
+hammered, and is fetched again afterwards.
+
+``version`` is bumped whenever a stored value changes (overwritten with new
+minutes, or cleared). Evictions don't bump it: once the cache is full nearly
+every miss evicts, and that must not invalidate everything keyed on the
+version. The gap memo checks the entries it used instead, and the result
+cache's TTL bounds a route that was evicted and came back with new minutes.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+from .config import Config
+
+TravelKey = Tuple[str, str, bool]
+
+
+class TravelCache:
+    """Bounded LRU mapping of travel keys to minutes.
+
+    ``hits`` counts reads; ``misses`` counts new keys stored, i.e. lookups
+    that had to call the Directions API; ``failures`` counts lookups answered
+    None because the API failed (now or within the failure TTL).
+    """
+
+    def __init__(self, maxsize: int, failure_ttl: float = Config.TRAVEL_FAILURE_TTL):
+        self.maxsize = maxsize
+        self.failure_ttl = failure_ttl
+        self._entries: "OrderedDict[TravelKey, int]" = OrderedDict()
+        self._failed: Dict[TravelKey, float] = {}
+        self._lock = Lock()
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.failures = 0
+
+    def __contains__(self, key: TravelKey) -> bool:
+        return key in self._entries
+
+    def __getitem__(self, key: TravelKey) -> int:
+        with self._lock:
+            minutes = self._entries[key]
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return minutes
+
+    def get(self, key: TravelKey) -> Optional[int]:
+        """Stored minutes for ``key``, or None (never calls the API)."""
+        with self._lock:
+            minutes = self._entries.get(key)
+            if minutes is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            return minutes
+
+    def get_or_fetch(
+        self, key: TravelKey, fetch: Callable[[TravelKey], Optional[int]]
+    ) -> Optional[int]:
+        """
+        Stored minutes for ``key``, or ``fetch(key)`` them and store the result.
+        The check and the read happen under one lock; ``fetch`` runs outside
+        it. A failed fetch (None) is remembered for ``failure_ttl`` seconds
+        only, and during that time the key answers None without fetching.
+        """
+        with self._lock:
+            minutes = self._entries.get(key)
+            if minutes is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return minutes
+            failed_at = self._failed.get(key)
+            if failed_at is not None and time.monotonic() - failed_at < self.failure_ttl:
+                self.failures += 1
+                return None
+        minutes = fetch(key)
+        if minutes is None:
+            with self._lock:
+                self.failures += 1
+                now = time.monotonic()
+                if len(self._failed) >= self.maxsize:
+                    self._failed = {
+                        k: at for k, at in self._failed.items() if now - at < self.failure_ttl
+                    }
+                self._failed[key] = now
+            return None
+        self[key] = minutes
+        return minutes
+
+    def __setitem__(self, key: TravelKey, minutes: int) -> None:
+        with self._lock:
+            self._failed.pop(key, None)
+            if key not in self._entries:
+                self.misses += 1
+            elif self._entries[key] != minutes:
+                self.version += 1
+            self._entries[key] = minutes
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[TravelKey]:
+        return iter(list(self._entries))
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "failures": self.failures,
+            "size": len(self._entries),
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._failed.clear()
+            self.version += 1
+
+
+shared_travel_cache = TravelCache(Config.TRAVEL_CACHE_SIZE)
@@ -0,0 +1,578 @@
+import json
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "src"))
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from backend import api, cost_planner, scheduler  # noqa: E402
+from backend.metrics import NAVER_ERRORS, shared_metrics  # noqa: E402
+from backend.result_cache import shared_result_cache  # noqa: E402
+from backend.sample_data import LmsSnapshot  # noqa: E402
+from backend.schedule_db import ScheduleConflict, SqliteScheduleStore  # noqa: E402
+from backend.travel_cache import shared_travel_cache  # noqa: E402
+
+
+def fake_travel(start, end, include_buffer=True):
+    return 0 if start == end else 10
+
+
+SCHEDULE = [
+    {"name": "수업 1", "start_time": "09:00", "end_time": "10:00", "location": "A"},
+    {"name": "수업 2", "start_time": "12:00", "end_time": "13:00", "location": "A"},
+    {"name": "알바", "start_time": "15:00", "end_time": "18:00", "location": "B"},
+]
+
+TODOS = [
+    {"task": "강의", "estimated_time": 60, "location": "A"},
+    {"task": "과제", "estimated_time": 90, "location": "B"},
+    {"task": "퀴즈", "estimated_time": 30, "location": "A"},
+]
+
+
+class ApiTestCase(unittest.TestCase):
+
+    def setUp(self):
+        for patcher in (
+            patch.object(scheduler, "get_travel_time_from_addresses", side_effect=fake_travel),
+            patch.object(api, "get_location_coords", return_value=None),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        shared_travel_cache.clear()
+        api._sample_cache.clear()
+        store = SqliteScheduleStore(":memory:")
+        self.addCleanup(store.close)
+        patcher = patch.object(api, "_schedule_store", store)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = TestClient(api.app)
+
+
+class TestSchedulePlan(ApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        api._schedule_store.clear()
+        api._plan_snapshots.clear()
+        self.ids = [self.client.post("/api/schedule", json=item).json()["id"] for item in SCHEDULE]
+
+    def test_plan_requires_todos_first(self):
+        self.assertEqual(self.client.get("/api/schedule/plan").status_code, 404)
+
+    def test_edit_replans_only_adjacent_gaps(self):
+        created = self.client.post("/api/schedule/plan", json={"todos": TODOS}).json()
+        self.assertEqual(created["meta"]["replanned_gaps"], 2)
+
+        cached = self.client.get("/api/schedule/plan").json()
+        self.assertEqual(cached["meta"]["replanned_gaps"], 0)
+        self.assertEqual(cached["optimized_schedule"], created["optimized_schedule"])
+
+        # Moving the last event only touches the 13:00-15:00 gap.
+        moved = dict(SCHEDULE[2], start_time="16:00", end_time="19:00")
+        self.client.put(f"/api/schedule/{self.ids[2]}", json=moved)
+        updated = self.client.get("/api/schedule/plan").json()
+        self.assertEqual(updated["meta"]["reused_gaps"], 1)
+        self.assertEqual(updated["meta"]["replanned_gaps"], 1)
+        self.assertGreater(updated["meta"]["schedule_version"], created["meta"]["schedule_version"])
+        first_gap = [e["name"] for e in created["optimized_schedule"][:3]]
+        self.assertEqual([e["name"] for e in updated["optimized_schedule"][:3]], first_gap)
+
+    def test_plans_are_kept_per_user(self):
+        kim = {"name": "스터디", "start_time": "10:30", "end_time": "11:30", "location": "A",
+               "user": "kim"}
+        self.client.post("/api/schedule", json=kim)
+        mine = self.client.post("/api/schedule/plan", json={"todos": TODOS}).json()
+        theirs = self.client.post("/api/schedule/plan", json={"todos": TODOS, "user": "kim"}).json()
+
+        self.assertEqual([item["name"] for item in theirs["schedule"]], ["스터디"])
+        self.assertNotIn("스터디", [item["name"] for item in mine["schedule"]])
+        self.assertNotIn("스터디", [item["name"] for item in self.client.get("/api/schedule").json()])
+        again = self.client.get("/api/schedule/plan").json()
+        self.assertEqual(again["optimized_schedule"], mine["optimized_schedule"])
+        self.assertEqual(
+            self.client.get("/api/schedule/plan", params={"user": "lee"}).status_code, 404
+        )
+
+
+class TestScheduleStore(ApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        api._schedule_store.clear()
+        for item in SCHEDULE:
+            self.client.post("/api/schedule", json=item)
+
+    def test_overlap_rejected_unless_allowed(self):
+        clash = {"name": "스터디", "start_time": "12:30", "end_time": "13:30", "location": "A"}
+        response = self.client.post("/api/schedule", json=clash)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(len(response.json()["detail"]["conflicts"]), 1)
+        allowed = self.client.post("/api/schedule?allow_overlap=true", json=clash)
+        self.assertEqual(allowed.status_code, 200)
+
+    def test_update_keeps_old_item_on_conflict(self):
+        first = self.client.get("/api/schedule").json()[0]
+        moved = dict(first, start_time="12:30", end_time="13:30")
+        self.assertEqual(self.client.put(f"/api/schedule/{first['id']}", json=moved).status_code, 409)
+        self.assertEqual(self.client.get("/api/schedule").json()[0]["start_time"], "09:00")
+
+    def test_conditional_get_and_delta(self):
+        listed = self.client.get("/api/schedule")
+        etag = listed.headers["etag"]
+        unchanged = self.client.get("/api/schedule", headers={"If-None-Match": etag})
+        self.assertEqual((unchanged.status_code, unchanged.content), (304, b""))
+
+        first, second = listed.json()[:2]
+        self.client.delete(f"/api/schedule/{first['id']}")
+        self.client.put(f"/api/schedule/{second['id']}", json=dict(second, name="수업 2 (보강)"))
+        delta = self.client.get("/api/schedule", params={"since": etag.strip('"')}).json()
+        self.assertFalse(delta["full"])
+        self.assertEqual(delta["deleted"], [first["id"]])
+        self.assertEqual([item["name"] for item in delta["items"]], ["수업 2 (보강)"])
+        self.assertEqual(
+            self.client.get("/api/schedule", headers={"If-None-Match": etag}).status_code, 200
+        )
+
+    def test_delta_for_user_hides_other_users(self):
+        kim = self.client.post("/api/schedule", json={"name": "스터디", "user": "kim"}).json()
+        lee = self.client.post("/api/schedule", json={"name": "알바", "user": "lee"}).json()
+        since = self.client.get("/api/schedule").headers["etag"].strip('"')
+        self.client.delete(f"/api/schedule/{lee['id']}")
+        self.client.put(f"/api/schedule/{kim['id']}", json=dict(kim, user="lee"))
+        self.client.post("/api/schedule", json={"name": "동아리", "user": "lee"})
+
+        delta = self.client.get("/api/schedule", params={"since": since, "user": "kim"}).json()
+        self.assertEqual((delta["items"], delta["deleted"]), ([], [kim["id"]]))
+        delta = self.client.get("/api/schedule", params={"since": since, "user": "lee"}).json()
+        self.assertEqual(sorted(item["name"] for item in delta["items"]), ["동아리", "스터디"])
+        self.assertEqual(delta["deleted"], [lee["id"]])
+
+    def test_deleting_missing_item_keeps_etag(self):
+        etag = self.client.get("/api/schedule").headers["etag"]
+        self.assertEqual(self.client.delete("/api/schedule/missing").status_code, 404)
+        self.assertEqual(self.client.get("/api/schedule").headers["etag"], etag)
+
+    def test_identical_update_keeps_etag(self):
+        listed = self.client.get("/api/schedule")
+        first = listed.json()[0]
+        self.assertEqual(self.client.put(f"/api/schedule/{first['id']}", json=first).status_code, 200)
+        self.assertEqual(self.client.get("/api/schedule").headers["etag"], listed.headers["etag"])
+
+    def test_free_slots(self):
+        slots = self.client.get(
+            "/api/schedule/free-slots", params={"start": "08:00", "end": "20:00", "min_minutes": 90}
+        ).json()
+        self.assertEqual(
+            [(slot["start_time"], slot["end_time"]) for slot in slots],
+            [("10:00", "12:00"), ("13:00", "15:00"), ("18:00", "20:00")],
+        )
+
+
+class TestSqliteScheduleStore(unittest.TestCase):
+
+    def test_workers_share_one_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = str(Path(tmp) / "schedule.db")
+            first, second = SqliteScheduleStore(path), SqliteScheduleStore(path)
+            self.addCleanup(first.close)
+            self.addCleanup(second.close)
+            first.add({"id": "a", "user": "kim", "name": "수업", "start_time": "09:00",
+                       "end_time": "10:00", "date": "2026-10-20"})
+            second.add({"id": "b", "user": "kim", "name": "매일", "start_time": "11:00",
+                        "end_time": "12:00"})
+
+            self.assertEqual([item["id"] for item in first.for_user("kim")], ["b", "a"])
+            self.assertEqual(first.version, second.version)
+            with self.assertRaises(ScheduleConflict):
+                first.add({"id": "c", "user": "kim", "name": "스터디", "start_time": "11:30",
+                           "end_time": "12:30", "date": "2026-10-20"})
+            self.assertNotIn("c", second)
+            self.assertEqual(second.free_slots(540, 780, user="kim", date="2026-10-20"),
+                             [(600, 660), (720, 780)])
+
+
+class TestLiveReplan(ApiTestCase):
+
+    def test_freezes_past_and_starts_from_position(self):
+        response = self.client.post(
+            "/api/replan/live",
+            json={
+                "schedule": SCHEDULE,
+                "todos": TODOS,
+                "now": "13:30",
+                "position": {"lat": 37.5, "lng": 127.0},
+            },
+        ).json()
+        names = [entry["name"] for entry in response["optimized_schedule"]]
+        # Past events are kept as-is, and the gap before 10:00-12:00 is not re-planned.
+        self.assertEqual(names[:2], ["수업 1", "수업 2"])
+        self.assertEqual(response["meta"]["replanned_gaps"], 1)
+        self.assertEqual(response["meta"]["planned_from"], "13:30")
+        first_task = response["optimized_schedule"][2]
+        self.assertEqual(first_task["start_time"], "13:40")
+
+    def test_in_progress_event_anchors_gap(self):
+        response = self.client.post(
+            "/api/replan/live",
+            json={"schedule": SCHEDULE, "todos": TODOS, "now": "12:15", "location": "B"},
+        ).json()
+        tasks = [e for e in response["optimized_schedule"] if e.get("type") == "task"]
+        self.assertGreaterEqual(tasks[0]["start_time"], "13:00")
+
+
+class TestResultCache(ApiTestCase):
+
+    def test_reordered_request_is_served_from_cache(self):
+        first = self.client.post("/api/optimize", json={"schedule": SCHEDULE, "todos": TODOS}).json()
+        shuffled = {
+            "schedule": [dict(item, id=str(i)) for i, item in enumerate(reversed(SCHEDULE))],
+            "todos": list(reversed(TODOS)),
+        }
+        with patch.object(api, "solve_schedule") as solve:
+            second = self.client.post("/api/optimize", json=shuffled).json()
+        solve.assert_not_called()
+
+        self.assertIsNone(first["meta"]["cached"])
+        self.assertTrue(second["meta"]["cached"])
+        self.assertEqual(
+            [(e["name"], e["start_time"]) for e in second["optimized_schedule"]],
+            [(e["name"], e["start_time"]) for e in first["optimized_schedule"]],
+        )
+        self.assertEqual(
+            [e.get("id") for e in second["optimized_schedule"] if e["type"] != "task"],
+            ["2", "1", "0"],
+        )
+
+    def test_robustness_reported_per_event(self):
+        body = self.client.post(
+            "/api/optimize", json={"schedule": SCHEDULE, "todos": TODOS, "robustness": True}
+        ).json()
+        report = body["meta"]["robustness"]
+        self.assertEqual([risk["name"] for risk in report["events"]], ["수업 2", "알바"])
+        self.assertTrue(0.0 <= report["on_time_probability"] <= 1.0)
+
+    def test_different_solver_misses(self):
+        self.client.post("/api/optimize", json={"schedule": SCHEDULE, "todos": TODOS})
+        other = self.client.post(
+            "/api/optimize", json={"schedule": SCHEDULE, "todos": TODOS, "solver": "knapsack"}
+        ).json()
+        self.assertIsNone(other["meta"]["cached"])
+
+    def test_rendered_payload_matches_response_model(self):
+        response = self.client.post("/api/optimize", json={"schedule": SCHEDULE, "todos": TODOS})
+        body = response.json()
+        self.assertEqual(api.OptimizeResponse.model_validate(body).model_dump(mode="json"), body)
+        self.assertIn("수업 1", response.text)  # not \u-escaped
+
+    def test_lean_view_refers_to_todos_by_index(self):
+        request = {"schedule": SCHEDULE, "todos": TODOS}
+        full = self.client.post("/api/optimize", json=request).json()
+        lean = self.client.post("/api/optimize?view=lean", json=request).json()
+
+        self.assertEqual(list(lean), ["optimized_schedule", "remaining_todos", "meta", "insights"])
+        for full_item, lean_item in zip(full["optimized_schedule"], lean["optimized_schedule"]):
+            index = lean_item.pop("todo_index", None)
+            self.assertEqual(lean_item, full_item)
+            if full_item["type"] == "task":
+                self.assertIn(TODOS[index]["task"], full_item["name"])
+        self.assertEqual(
+            [TODOS[i]["task"] for i in lean["remaining_todos"]],
+            [todo["task"] for todo in full["remaining_todos"]],
+        )
+
+        picked = self.client.post("/api/optimize?fields=meta,insights", json=request).json()
+        self.assertEqual(list(picked), ["meta", "insights"])
+        self.assertEqual(
+            self.client.post("/api/optimize?fields=nope", json=request).status_code, 400
+        )
+
+    def test_large_responses_are_gzipped(self):
+        todos = [dict(TODOS[i % 3], task=f"할 일 {i}") for i in range(40)]
+        response = self.client.post(
+            "/api/optimize",
+            json={"schedule": SCHEDULE, "todos": todos},
+            headers={"Accept-Encoding": "gzip"},
+        )
+        self.assertEqual(response.headers["content-encoding"], "gzip")
+        self.assertEqual(len(response.json()["todos"]), 40)
+
+
+class TestCostPlanner(ApiTestCase):
+
+    def test_default_budget_prefetches(self):
+        body = self.client.post("/api/optimize", json={"schedule": SCHEDULE, "todos": TODOS}).json()
+        cost = body["meta"]["cost"]
+        self.assertEqual(cost["strategy"], "prefetch")
+        self.assertEqual(cost["directions_worst"], 2)  # both directions, no self-pairs
+
+    def test_small_budget_only_estimates(self):
+        with patch.object(cost_planner, "coordinates_for", return_value=None), \
+                patch.object(scheduler, "get_travel_time_from_addresses") as directions:
+            body = self.client.post(
+                "/api/optimize", json={"schedule": SCHEDULE, "todos": TODOS, "call_budget": 2}
+            ).json()
+        directions.assert_not_called()
+        self.assertEqual(body["meta"]["cost"]["strategy"], "estimate")
+        self.assertEqual(len(shared_travel_cache), 0)
+
+    def test_over_budget_is_rejected(self):
+        response = self.client.post(
+            "/api/optimize", json={"schedule": SCHEDULE, "todos": TODOS, "call_budget": 0}
+        )
+        self.assertEqual(response.status_code, 413)
+
+    def test_cached_plan_does_not_bypass_budget(self):
+        body = {"schedule": SCHEDULE, "todos": TODOS}
+        for _ in range(2):  # the second request is served from the result cache
+            self.assertEqual(self.client.post("/api/optimize", json=body).status_code, 200)
+        response = self.client.post("/api/optimize", json=dict(body, call_budget=0))
+        self.assertEqual(response.status_code, 413)
+
+
+class TestOptimizeStream(ApiTestCase):
+
+    def test_ndjson_matches_optimize(self):
+        body = {"schedule": SCHEDULE, "todos": TODOS}
+        response = self.client.post("/api/optimize/stream", json=body)
+        messages = [json.loads(line) for line in response.text.splitlines()]
+        self.assertEqual([m["type"] for m in messages], ["locations", "gap", "gap", "gap", "summary"])
+
+        streamed = []
+        for message in messages[1:-1]:
+            streamed += [message["event"]] + message["placements"]
+        direct = self.client.post("/api/optimize", json=body).json()
+        self.assertEqual(
+            [(e["name"], e["start_time"]) for e in streamed],
+            [(e["name"], e["start_time"]) for e in direct["optimized_schedule"]],
+        )
+        self.assertEqual(messages[-1]["insights"], direct["insights"])
+
+    def test_sse_framing(self):
+        response = self.client.post(
+            "/api/optimize/stream", params={"format": "sse"},
+            json={"schedule": SCHEDULE, "todos": TODOS},
+        )
+        self.assertTrue(response.headers["content-type"].startswith("text/event-stream"))
+        self.assertTrue(response.text.startswith("event: locations\ndata: "))
+
+
+class TestJobs(ApiTestCase):
+
+    def test_job_result_matches_direct_call(self):
+        submitted = self.client.post("/api/jobs/optimize", json={"schedule": SCHEDULE, "todos": TODOS})
+        self.assertEqual(submitted.status_code, 202)
+        job = self.client.get(f"/api/jobs/{submitted.json()['id']}", params={"wait": 5}).json()
+        self.assertEqual(job["status"], "done")
+        direct = self.client.post("/api/optimize", json={"schedule": SCHEDULE, "todos": TODOS}).json()
+        self.assertEqual(job["result"]["optimized_schedule"], direct["optimized_schedule"])
+
+    def test_failed_job_reports_error(self):
+        submitted = self.client.post("/api/jobs/optimize", json={"schedule": [], "todos": TODOS})
+        job = self.client.get(f"/api/jobs/{submitted.json()['id']}", params={"wait": 5}).json()
+        self.assertEqual((job["status"], job["error_status"]), ("failed", 400))
+
+    def test_full_queue_is_rejected(self):
+        with patch.object(api.shared_job_queue, "max_queued", 0):
+            response = self.client.post("/api/jobs/optimize", json={"schedule": SCHEDULE, "todos": TODOS})
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(self.client.get("/api/jobs/unknown").status_code, 404)
+
+
+class TestSampleCache(ApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        snapshot = LmsSnapshot(
+            schedule=[dict(item, date="2026-10-20") for item in SCHEDULE],
+            tasks=[dict(todo, estimated_time=30) for todo in TODOS],
+        )
+        patcher = patch.object(api, "crawl_lms", return_value=snapshot)
+        self.crawl = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_one_crawl_serves_sample_and_live_tasks(self):
+        sample = self.client.get("/api/sample").json()
+        live = self.client.get("/api/tasks/live").json()
+        self.assertEqual(self.crawl.call_count, 1)
+        self.assertFalse(sample["meta"]["stale"])
+        self.assertEqual(live["count"], 3)
+        self.assertEqual(len(sample["schedule"]), 3)
+
+    def test_stale_copy_served_while_refreshing(self):
+        first = self.client.get("/api/sample").json()
+        with patch.object(api._sample_cache, "fresh_for", 0):
+            stale = self.client.get("/api/sample").json()
+            self.assertTrue(stale["meta"]["stale"])
+            self.assertEqual(stale["meta"]["fetched_at"], first["meta"]["fetched_at"])
+            api._sample_cache.refresh(api._SAMPLE_ACCOUNT, lambda: None)  # waits for the refresh
+        self.assertEqual(self.crawl.call_count, 2)
+
+    def test_manual_refresh(self):
+        self.client.get("/api/sample")
+        refreshed = self.client.post("/api/sample/refresh").json()
+        self.assertEqual(self.crawl.call_count, 2)
+        self.assertEqual(refreshed["tasks"], 3)
+
+
+class TestCommonFreeTime(ApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        api._schedule_store.clear()
+        for user, start, end, location in (
+            ("민수", "09:00", "12:00", "A"),
+            ("민수", "15:00", "18:00", "A"),
+            ("지은", "10:00", "13:00", "B"),
+            ("지은", "19:00", "21:00", "B"),
+        ):
+            self.client.post("/api/schedule", json={
+                "name": "수업", "user": user, "location": location,
+                "start_time": start, "end_time": end, "date": "2026-03-02",
+            })
+
+    def _windows(self, **extra):
+        payload = {"users": ["민수", "지은"], "start_date": "2026-03-02", "days": 1, **extra}
+        return self.client.post("/api/schedule/common-free-time", json=payload)
+
+    def test_windows_subtract_travel_to_meeting_point(self):
+        windows = self._windows(location="A").json()["windows"]
+        self.assertEqual(
+            [(w["start_time"], w["end_time"]) for w in windows],
+            [("13:10", "15:00"), ("08:00", "09:00"), ("18:00", "18:50"), ("21:10", "22:00")],
+        )
+        self.assertTrue(all(w["absent"] == [] for w in windows))
+
+    def test_max_absent_includes_partial_windows(self):
+        windows = self._windows(max_absent=1, limit=50).json()["windows"]
+        self.assertIn(
+            ("12:00", "13:00", ["민수"], ["지은"]),
+            [(w["start_time"], w["end_time"], w["available"], w["absent"]) for w in windows],
+        )
+
+    def test_unknown_user_is_404(self):
+        response = self.client.post(
+            "/api/schedule/common-free-time", json={"users": ["민수", "없음"], "days": 1}
+        )
+        self.assertEqual(response.status_code, 404)
+
+
+class TestBatchOptimize(ApiTestCase):
+
+    def test_streams_one_line_per_user(self):
+        payload = {
+            "users": [
+                {"user": "kim", "schedule": SCHEDULE, "todos": TODOS},
+                {"user": "lee", "schedule": SCHEDULE[1:], "todos": TODOS[:1]},
+                {"user": "park", "schedule": [], "todos": TODOS},
+            ],
+        }
+        response = self.client.post("/api/optimize/batch", json=payload)
+        self.assertEqual(response.headers["content-type"], "application/x-ndjson")
+        lines = {line["user"]: line for line in map(json.loads, response.text.splitlines())}
+
+        self.assertEqual(lines["park"]["status"], "error")
+        self.assertEqual(lines["kim"]["status"], "ok")
+        single = self.client.post("/api/optimize", json={"schedule": SCHEDULE, "todos": TODOS}).json()
+        self.assertEqual(
+            [(e["name"], e["start_time"]) for e in lines["kim"]["result"]["optimized_schedule"]],
+            [(e["name"], e["start_time"]) for e in single["optimized_schedule"]],
+        )
+        lee_tasks = [e for e in lines["lee"]["result"]["optimized_schedule"] if e["type"] == "task"]
+        self.assertEqual(len(lee_tasks), 1)
+
+
+class TestWeekPlanner(ApiTestCase):
+
+    def test_dated_and_recurring_events(self):
+        schedule = SCHEDULE[:2] + [
+            {"name": "세미나", "date": "2026-10-21", "start_time": "14:00",
+             "end_time": "15:00", "location": "A"},
+        ]
+        todos = [
+            {"task": "보고서", "estimated_time": 100, "location": "A",
+             "deadline": "2026-10-21 23:59"},
+            {"task": "퀴즈", "estimated_time": 60, "location": "A",
+             "deadline": "2026-10-20 12:00"},
+        ]
+        response = self.client.post(
+            "/api/optimize/week",
+            json={"schedule": schedule, "todos": todos, "start_date": "2026-10-20", "days": 2},
+        ).json()
+        tasks = {e["name"]: (e["date"], e["start_time"]) for e in response["optimized_schedule"]
+                 if e.get("type") == "task"}
+        self.assertEqual(tasks["✅ 퀴즈"], ("2026-10-20", "10:00"))
+        # Monday's gap only has 60 minutes left, so the report moves to Tuesday.
+        self.assertEqual(tasks["✅ 보고서"], ("2026-10-21", "10:00"))
+        self.assertEqual(response["meta"]["horizon_days"], 2)
+        self.assertEqual(len(response["schedule"]), 5)
+
+
+class TestMetrics(ApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+        patcher = patch.object(shared_metrics, "directory", tmp.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _sample(self, text, series):
+        for line in text.splitlines():
+            if line.startswith(series + " "):
+                return float(line.rsplit(" ", 1)[1])
+        return None
+
+    def test_endpoint_latency_and_cache_counters(self):
+        self.client.post("/api/optimize", json={"schedule": SCHEDULE, "todos": TODOS})
+        self.client.post("/api/optimize", json={"schedule": SCHEDULE, "todos": TODOS})
+        text = self.client.get("/metrics").text
+
+        self.assertIn("# TYPE ycc_http_request_duration_seconds histogram", text)
+        self.assertGreaterEqual(self._sample(
+            text,
+            'ycc_http_request_duration_seconds_count{method="POST",route="/api/optimize",status="200"}',
+        ), 2)
+        self.assertIsNotNone(self._sample(
+            text, 'ycc_scheduler_phase_duration_seconds_bucket{phase="solve",le="+Inf"}'
+        ))
+        self.assertGreaterEqual(self._sample(text, 'ycc_cache_hits_total{cache="result"}'), 1)
+        self.assertIsNotNone(self._sample(text, 'ycc_queue_depth{queue="jobs",state="queued"}'))
+
+    def test_workers_are_summed(self):
+        series = 'ycc_naver_errors_total{api="directions",status="503"}'
+        before = self._sample(self.client.get("/metrics").text, series) or 0
+        shared_metrics.inc(NAVER_ERRORS, 2, api="directions", status=503)
+        for name, written_at, errors in (("other-1", time.time(), 3), ("gone-2", 0, 100)):
+            worker = {
+                "written_at": written_at,
+                "counters": [[NAVER_ERRORS, {"api": "directions", "status": "503"}, errors]],
+                "gauges": [["ycc_queue_depth", {"queue": "jobs", "state": name}, 7]],
+                "histograms": [],
+            }
+            (self.dir / f"{name}.json").write_text(json.dumps(worker))
+
+        text = self.client.get("/metrics").text
+        self.assertEqual(self._sample(text, series), before + 5)
+        self.assertIn('state="other-1"', text)
+        self.assertNotIn('state="gone-2"', text)
+        self.assertEqual(sorted(path.name for path in self.dir.iterdir()), ["other-1.json"])
+
+    def test_collected_counters_survive_cache_clear(self):
+        self.client.post("/api/optimize", json={"schedule": SCHEDULE, "todos": TODOS})
+        self.client.post("/api/optimize", json={"schedule": SCHEDULE, "todos": TODOS})
+        series = 'ycc_cache_hits_total{cache="result"}'
+        before = self._sample(self.client.get("/metrics").text, series)
+        self.assertGreaterEqual(before, 1)
+        shared_result_cache.clear()
+        self.assertEqual(self._sample(self.client.get("/metrics").text, series), before)
+
+if __name__ == "__main__":
+    unittest.main()
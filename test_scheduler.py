@@ -0,0 +1,407 @@
+import io
+import json
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "src"))
+
+from backend import scheduler  # noqa: E402
+from backend import clustering  # noqa: E402
+from backend import geocoding  # noqa: E402
+from backend.candidates import CandidateIndex  # noqa: E402
+from backend.gap_memo import shared_gap_memo  # noqa: E402
+from backend.robustness import analyze_plan, choose_robust_plan, robustness_available  # noqa: E402
+from backend.horizon import plan_horizon  # noqa: E402
+from backend.logs import configure_logging  # noqa: E402
+from backend.portfolio import solve_portfolio  # noqa: E402
+from backend.travel_cache import shared_travel_cache  # noqa: E402
+from backend.records import (  # noqa: E402
+    Event,
+    Placement,
+    Task,
+    events_from_dicts,
+    format_minutes,
+    parse_minutes,
+    tasks_from_dicts,
+)
+
+TRAVEL = {
+    frozenset(["A"]): 0,
+    frozenset(["A", "B"]): 10,
+    frozenset(["A", "C"]): 20,
+    frozenset(["B", "C"]): 15,
+}
+
+
+def fake_travel(start, end, include_buffer=True):
+    return TRAVEL[frozenset([start, end])] if start != end else 0
+
+
+SCHEDULE = [
+    {"name": "수업", "start_time": "09:00", "end_time": "10:00", "location": "A"},
+    {"name": "알바", "start_time": "12:00", "end_time": "14:00", "location": "A"},
+]
+
+
+class TestScheduler(unittest.TestCase):
+
+    def setUp(self):
+        patcher = patch.object(scheduler, "get_travel_time_from_addresses", side_effect=fake_travel)
+        self.travel = patcher.start()
+        self.addCleanup(patcher.stop)
+        shared_travel_cache.clear()
+
+    def test_greedy_respects_next_event(self):
+        todos = [
+            {"task": "강의", "estimated_time": 60, "location": "A"},
+            {"task": "과제", "estimated_time": 90, "location": "B"},
+        ]
+        optimized, remaining = scheduler.allocate_tasks(SCHEDULE, todos, return_summary=True)
+        tasks = [entry for entry in optimized if entry.get("type") == "task"]
+        self.assertEqual(tasks[0]["start_time"], "10:10")
+        self.assertLessEqual(tasks[-1]["end_time"], "12:00")
+        self.assertEqual(len(tasks) + len(remaining), 2)
+
+    def test_exact_beats_greedy_on_small_gap(self):
+        # Greedy grabs the 100-minute task (least slack); the two 60-minute
+        # tasks together fill the whole 120-minute gap.
+        todos = [
+            {"task": "긴 작업", "estimated_time": 100, "location": "A"},
+            {"task": "작업 1", "estimated_time": 60, "location": "A"},
+            {"task": "작업 2", "estimated_time": 60, "location": "A"},
+        ]
+        greedy, _ = scheduler.allocate_tasks(SCHEDULE, todos, return_summary=True)
+        exact, remaining = scheduler.allocate_tasks(
+            SCHEDULE, todos, return_summary=True, strategy="exact"
+        )
+        local, _ = scheduler.allocate_tasks(
+            SCHEDULE, todos, return_summary=True, strategy="local_search"
+        )
+        self.assertEqual(sum(e.get("type") == "task" for e in greedy), 1)
+        self.assertEqual(sum(e.get("type") == "task" for e in exact), 2)
+        self.assertEqual(sum(e.get("type") == "task" for e in local), 2)
+        self.assertEqual([t["task"] for t in remaining], ["긴 작업"])
+
+    def test_knapsack_fills_gap(self):
+        todos = [
+            {"task": "긴 작업", "estimated_time": 100, "location": "A"},
+            {"task": "작업 1", "estimated_time": 60, "location": "A"},
+            {"task": "작업 2", "estimated_time": 60, "location": "A"},
+        ]
+        optimized, remaining = scheduler.allocate_tasks(
+            SCHEDULE, todos, return_summary=True, strategy="knapsack"
+        )
+        tasks = [entry for entry in optimized if entry.get("type") == "task"]
+        self.assertEqual([t["start_time"] for t in tasks], ["10:00", "11:00"])
+        self.assertEqual([t["task"] for t in remaining], ["긴 작업"])
+
+    def test_knapsack_select_maximizes_value(self):
+        chosen = scheduler._knapsack_select([50, 40, 30, 30], [50, 40, 30, 30], 100)
+        self.assertEqual(sum([50, 40, 30, 30][i] for i in chosen), 100)
+        self.assertEqual(scheduler._knapsack_select([10], [10], 0), [])
+
+    def test_expired_deadline_raises(self):
+        with self.assertRaises(scheduler.SolverTimeout):
+            scheduler.allocate_tasks(SCHEDULE, [], deadline=0)
+
+    def test_portfolio_reports_winner(self):
+        todos = [
+            {"task": "긴 작업", "estimated_time": 100, "location": "A"},
+            {"task": "작업 1", "estimated_time": 60, "location": "A"},
+            {"task": "작업 2", "estimated_time": 60, "location": "A"},
+        ]
+        result = solve_portfolio(
+            events_from_dicts(SCHEDULE), tasks_from_dicts(todos), deadline_ms=5000
+        )
+        self.assertIn(result.winner, ("knapsack", "exact", "local_search"))
+        statuses = {outcome.strategy: outcome.status for outcome in result.outcomes}
+        self.assertEqual(statuses["greedy"], "ok")
+        self.assertEqual([task.source for task in result.remaining], [todos[0]])
+
+    def test_minute_conversion_round_trip(self):
+        self.assertEqual(parse_minutes("09:05"), 545)
+        self.assertEqual(parse_minutes("09:05:30"), 545)
+        self.assertIsNone(parse_minutes(None))
+        self.assertEqual(format_minutes(545), "09:05")
+        self.assertEqual(format_minutes(24 * 60 + 30), "00:30")
+
+    def test_allocate_returns_original_dicts(self):
+        todos = [{"task": "강의", "estimated_time": 30, "location": "A", "deadline": "x"}]
+        optimized, remaining = scheduler.allocate_tasks(SCHEDULE, todos, return_summary=True)
+        self.assertIs(optimized[0], SCHEDULE[0])
+        self.assertIs(optimized[-1], SCHEDULE[1])
+        self.assertEqual(remaining, [])
+
+
+class TestLogging(unittest.TestCase):
+
+    def setUp(self):
+        self.addCleanup(configure_logging, "OFF")
+        self.events = [Event("수업", 540, 600, "A"), Event("알바", 720, 780, "B")]
+
+    def test_diagnostics_skipped_when_off(self):
+        configure_logging("OFF")
+        travel = {("A", "C", True): 20, ("C", "B", True): 15}
+        scheduler.solve_schedule(self.events, [Task("과제", 30, "C")], travel_cache=travel)
+        self.assertNotIn(("A", "B", True), travel)
+
+    def test_debug_emits_json_events(self):
+        stream = io.StringIO()
+        configure_logging("DEBUG", json_format=True, stream=stream)
+        travel = {("A", "B", True): 10, ("A", "C", True): 20, ("C", "B", True): 15}
+        scheduler.solve_schedule(self.events, [Task("과제", 30, "C")], travel_cache=travel)
+        events = [json.loads(line) for line in stream.getvalue().splitlines()]
+        analysis = next(e for e in events if e["event"] == "gap.analysis")
+        self.assertEqual((analysis["gap_minutes"], analysis["direct_travel"]), (120, 10))
+        self.assertIn("gap.placed", [e["event"] for e in events])
+
+
+class TestCandidateIndex(unittest.TestCase):
+
+    def test_top_prefers_urgent_then_best_fit(self):
+        urgent = Task("급함", 60, "A", deadline=700)
+        later = Task("나중", 30, "A", deadline=2000)
+        too_long = Task("너무 김", 200, "A", deadline=600)
+        fillers = [Task(f"작업 {minutes}", minutes, "A") for minutes in (20, 50, 90, 150)]
+        index = CandidateIndex([later, too_long, urgent] + fillers)
+
+        self.assertEqual(index.top(100, 4), [urgent, later, fillers[2], fillers[1]])
+        index.discard(urgent)
+        self.assertEqual(index.top(100, 2), [later, fillers[2]])
+
+    def test_large_dated_backlog_matches_full_scan(self):
+        # Mostly long, already-urgent tasks: a linear scan would wade through them.
+        tasks = [Task(f"과제 {i}", 30 + (i * 37) % 300, "A", deadline=i % 500) for i in range(5000)]
+        tasks += [Task(f"작업 {i}", 5 + i % 120, "A") for i in range(500)]
+        index = CandidateIndex(tasks)
+        placed = set()
+
+        for step in range(200):
+            minutes, k = 20 + (step * 13) % 150, 1 + step % 8
+            expected = [
+                task for task in sorted(
+                    (task for task in tasks if task.deadline is not None),
+                    key=lambda task: (task.deadline, -task.duration),
+                )
+                if task.duration <= minutes and id(task) not in placed
+            ][:k]
+            undated = [
+                task for task in sorted(
+                    (task for task in tasks if task.deadline is None),
+                    key=lambda task: task.duration,
+                )
+                if task.duration <= minutes and id(task) not in placed
+            ]
+            expected += undated[::-1][:k - len(expected)]
+            picked = index.top(minutes, k)
+            self.assertEqual(picked, expected)
+            for task in picked[:2]:
+                index.discard(task)
+                placed.add(id(task))
+
+    def test_solve_schedule_with_top_k_places_same_tasks(self):
+        patcher = patch.object(scheduler, "get_travel_time_from_addresses", side_effect=fake_travel)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        shared_travel_cache.clear()
+
+        tasks = [Task(f"작업 {i}", 10 + i, "A") for i in range(30)]
+        plan, remaining = scheduler.solve_schedule(
+            events_from_dicts(SCHEDULE), list(tasks), travel_cache={}, top_k=5
+        )
+        placed = [entry.task for entry in plan if isinstance(entry, Placement)]
+        self.assertTrue(placed)
+        self.assertLessEqual(sum(task.duration for task in placed), 120)
+        self.assertEqual(len(placed) + len(remaining), len(tasks))
+
+
+class TestGapMemo(unittest.TestCase):
+
+    def setUp(self):
+        patcher = patch.object(scheduler, "get_travel_time_from_addresses", side_effect=fake_travel)
+        self.travel = patcher.start()
+        self.addCleanup(patcher.stop)
+        shared_travel_cache.clear()
+        shared_gap_memo.clear()
+
+    def _solve(self, tasks):
+        return scheduler.solve_schedule(
+            events_from_dicts(SCHEDULE), tasks, travel_cache=shared_travel_cache
+        )
+
+    def test_same_gap_is_reused_across_orderings(self):
+        first, _ = self._solve([Task("과제", 60, "B"), Task("강의", 30, "A")])
+        second, remaining = self._solve([Task("강의 복습", 30, "A"), Task("리포트", 60, "B")])
+
+        self.assertEqual(shared_gap_memo.stats()["hits"], 1)
+        self.assertEqual(remaining, [])
+        placed = [(p.task.name, p.start, p.end) for p in second if isinstance(p, Placement)]
+        expected = {"강의": "강의 복습", "과제": "리포트"}
+        self.assertEqual(
+            placed,
+            [(expected[p.task.name], p.start, p.end) for p in first if isinstance(p, Placement)],
+        )
+
+    def test_changed_travel_entry_invalidates(self):
+        self._solve([Task("과제", 60, "B")])
+        shared_travel_cache[("A", "B", True)] = 45
+        plan, _ = self._solve([Task("과제", 60, "B")])
+
+        self.assertEqual(shared_gap_memo.stats()["hits"], 0)
+        self.assertEqual([p.start for p in plan if isinstance(p, Placement)], [645])
+
+    def test_unrelated_eviction_keeps_memo(self):
+        shared_travel_cache[("X", "Y", True)] = 5
+        shared_travel_cache[("X", "Z", True)] = 5
+        self._solve([Task("과제", 60, "B")])
+        version = shared_travel_cache.version
+        with patch.object(shared_travel_cache, "maxsize", len(shared_travel_cache)):
+            shared_travel_cache[("Y", "Z", True)] = 5  # evicts X→Y
+            shared_travel_cache[("Z", "Y", True)] = 5  # evicts X→Z
+        self._solve([Task("과제", 60, "B")])
+
+        self.assertEqual(shared_travel_cache.stats()["evictions"], 2)
+        self.assertEqual(shared_travel_cache.version, version)
+        self.assertEqual(shared_gap_memo.stats()["hits"], 1)
+
+
+class TestTravelCache(unittest.TestCase):
+
+    def setUp(self):
+        shared_travel_cache.clear()
+        shared_gap_memo.clear()
+
+    def test_failed_lookup_is_not_stored(self):
+        with patch.object(scheduler, "get_travel_time_from_addresses", return_value=None) as api:
+            self.assertEqual(scheduler._get_travel_minutes_cached("A", "B", shared_travel_cache), 0)
+            self.assertEqual(scheduler._get_travel_minutes_cached("A", "B", shared_travel_cache), 0)
+            scheduler.solve_schedule(
+                events_from_dicts(SCHEDULE), [Task("과제", 60, "B")], travel_cache=shared_travel_cache
+            )
+        # Each failed pair is fetched once, then answered None until the TTL ends.
+        self.assertEqual([call.args for call in api.call_args_list].count(("A", "B")), 1)
+        self.assertNotIn(("A", "B", True), shared_travel_cache)
+        self.assertEqual(shared_gap_memo.stats()["size"], 0)
+
+        with patch.object(shared_travel_cache, "failure_ttl", 0), \
+                patch.object(scheduler, "get_travel_time_from_addresses", side_effect=fake_travel):
+            self.assertEqual(scheduler._get_travel_minutes_cached("A", "B", shared_travel_cache), 10)
+        self.assertEqual(shared_travel_cache[("A", "B", True)], 10)
+
+
+class TestGeocodeCache(unittest.TestCase):
+
+    def test_least_recently_used_address_is_dropped(self):
+        response = MagicMock(status_code=200)
+        response.json.return_value = {"addresses": [{"x": "127.0", "y": "37.5"}]}
+        geocoding._geocode_cache.clear()
+        self.addCleanup(geocoding._geocode_cache.clear)
+        with patch.object(geocoding.requests, "get", return_value=response) as get, \
+                patch.object(geocoding.Config, "GEOCODE_CACHE_SIZE", 2):
+            for address in ("신촌역", "강남역", "신촌역", "판교역", "신촌역", "강남역"):
+                self.assertEqual(geocoding.get_location_coords(address), "127.0,37.5")
+
+        self.assertEqual(list(geocoding._geocode_cache), ["신촌역", "강남역"])
+        self.assertEqual(get.call_count, 4)  # 강남역 was dropped for 판교역, then fetched again
+
+
+@unittest.skipUnless(robustness_available(), "numpy not installed")
+class TestRobustness(unittest.TestCase):
+
+    def _plan(self, duration):
+        task = Task("과제", duration, "A")
+        return [
+            Event("수업", 540, 600, "A"),
+            Placement(task, 600, 600 + duration, "A"),
+            Event("알바", 720, 780, "A"),
+        ]
+
+    def test_tight_plan_is_riskier(self):
+        tight = analyze_plan(self._plan(118), travel_cache={})
+        loose = analyze_plan(self._plan(60), travel_cache={})
+        self.assertGreater(tight.events[0].late_probability, 0.3)
+        self.assertLess(loose.events[0].late_probability, 0.01)
+        self.assertEqual(tight.events[0].event.name, "알바")
+
+    def test_choose_prefers_on_time_plan(self):
+        best, reports = choose_robust_plan([self._plan(118), self._plan(60)], travel_cache={})
+        self.assertEqual(best, 1)
+        self.assertEqual(len(reports), 2)
+
+
+class TestClustering(unittest.TestCase):
+
+    COORDS = {
+        "신촌": {"lat": 37.5598, "lng": 126.9425},
+        "연대 도서관": {"lat": 37.5640, "lng": 126.9370},
+        "판교역": {"lat": 37.3948, "lng": 127.1112},
+        "분당구 불정로 6": {"lat": 37.3950, "lng": 127.1117},
+    }
+
+    def setUp(self):
+        patcher = patch.object(clustering, "coordinates_for", side_effect=self.COORDS.get)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_tasks_grouped_by_area(self):
+        tasks = [Task(name, 30, name) for name in self.COORDS] + [Task("어디서든", 30, None)]
+        clusters = clustering.cluster_tasks(tasks, k=2)
+        groups = sorted(sorted(task.name for task in members) for members in clusters.members)
+        self.assertEqual(groups, [["분당구 불정로 6", "판교역"], ["신촌", "연대 도서관"]])
+        self.assertEqual([task.name for task in clusters.unlocated], ["어디서든"])
+
+    def test_gap_only_sees_nearby_cluster(self):
+        events = [Event("수업", 540, 600, "신촌"), Event("동아리", 720, 780, "신촌")]
+        tasks = [Task("판교 회의", 30, "판교역"), Task("도서관 과제", 60, "연대 도서관")]
+        travel = {}
+        for a in self.COORDS:
+            for b in self.COORDS:
+                for buffer in (True, False):
+                    travel[(a, b, buffer)] = 0 if a == b else 10
+        plan, remaining, count = clustering.solve_clustered(events, tasks, travel_cache=travel, k=2)
+        placed = [entry.task.name for entry in plan if isinstance(entry, Placement)]
+        self.assertEqual(count, 2)
+        self.assertEqual(placed, ["도서관 과제"])
+        self.assertEqual([task.name for task in remaining], ["판교 회의"])
+
+
+class TestHorizon(unittest.TestCase):
+
+    def setUp(self):
+        patcher = patch.object(scheduler, "get_travel_time_from_addresses", side_effect=fake_travel)
+        self.travel = patcher.start()
+        self.addCleanup(patcher.stop)
+        shared_travel_cache.clear()
+
+    def test_earliest_deadline_goes_first_across_days(self):
+        day = 24 * 60
+        events = []
+        for offset in (0, day):
+            events.append(Event("수업", offset + 540, offset + 600, "A"))
+            events.append(Event("알바", offset + 660, offset + 720, "A"))
+        relaxed = Task("다음주 과제", 60, "A", deadline=3 * day)
+        urgent = Task("오늘 과제", 60, "A", deadline=700)
+        late = Task("지난 과제", 30, "A", deadline=500)
+
+        plan, remaining = plan_horizon(events, [relaxed, urgent, late])
+        placements = [entry for entry in plan if isinstance(entry, Placement)]
+        self.assertEqual([(p.task.name, p.start) for p in placements],
+                         [("오늘 과제", 600), ("다음주 과제", day + 600)])
+        self.assertEqual(remaining, [late])
+
+    def test_gap_only_looks_up_tasks_that_fit(self):
+        events = [Event("수업", 540, 600, "A"), Event("알바", 660, 720, "A")]
+        backlog = [Task(f"긴 과제 {i}", 120, "C", deadline=5000) for i in range(50)]
+        short = Task("짧은 과제", 30, "B", deadline=6000)
+
+        plan, remaining = plan_horizon(events, backlog + [short], travel_cache={})
+        self.assertEqual([p.task for p in plan if isinstance(p, Placement)], [short])
+        self.assertEqual(remaining, backlog)
+        looked_up = {call.args[:2] for call in self.travel.call_args_list}
+        self.assertEqual(looked_up, {("A", "B"), ("B", "A")})
+
+
+if __name__ == "__main__":
+    unittest.main()